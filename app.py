@@ -1,43 +1,126 @@
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, send_from_directory, make_response
+import gzip
+import hashlib
+import json
+import mimetypes
+import re
 import subprocess
 import sys
 import os
+import tempfile
 import time
-from datetime import datetime
+import uuid
+
+import assets
+import jobs
+import launch_schema
+import memo
+import metrics
+import output_watch
+import ratelimit
+from launch_log import LaunchLogger, LaunchLogProxy
+from supervisor import ProcessSupervisor
 
 app = Flask(__name__)
 
+# /launch hands work to this manager and returns a job id straight away.
+# Renders and compute are capped per type so a burst of clicks queues up
+# instead of forking an interpreter per request. A running job may wait for a
+# process slot (SUPERVISOR caps), so there are enough threads for every type
+# at its limit and a waiting type never starves the others.
+JOB_MANAGER = jobs.JobManager(
+    store=jobs.JobStore(max_jobs=1000, ttl=600),
+    max_workers=12,
+    type_limits={"planet3d": 2, "qiskit_math": 2},
+    default_limit=2,
+    max_pending=32,
+)
+# Every child started by /launch goes through the supervisor: it caps live
+# processes per game, reaps them when they exit and applies rlimits. Renders
+# and compute get CPU-time limits; interactive games only a memory cap.
+SUPERVISOR = ProcessSupervisor(
+    max_per_type={"planet3d": 2, "qiskit_math": 2},
+    default_max=3,
+    limits={
+        "planet3d": {"cpu_seconds": 120, "memory_bytes": 2 * 1024 ** 3},
+        "qiskit_math": {"cpu_seconds": 60, "memory_bytes": 2 * 1024 ** 3},
+        "snake": {"memory_bytes": 1024 ** 3},
+        "tictactoe": {"memory_bytes": 1024 ** 3},
+    },
+)
+# Structured JSON launch events, written off the request path (see launch_log.py)
+LAUNCH_LOG = LaunchLogger(os.path.join(app.root_path, 'launch_events.log'))
+SUPERVISOR.add_exit_callback(lambda rec: LAUNCH_LOG.event(
+    "exit", job_id=rec["tag"], game=rec["type"], pid=rec["pid"],
+    exit_code=rec["returncode"], runtime_s=round(rec["finished"] - rec["started"], 3)))
+LAUNCH_OUTPUT_TIMEOUT = 120.0
+# a launch job waits this long for its game to drop below the process cap
+SPAWN_WAIT_TIMEOUT = 60.0
+SSE_HEARTBEAT = 15.0
+# Identical qiskit/planet requests share one in-flight job, and finished results
+# are memoized (see memo.py). Interactive games are never coalesced.
+INFLIGHT = memo.SingleFlight()
+RESULT_CACHE = memo.MemoCache(max_entries=512, max_bytes=8 * 1024 * 1024, ttl=300)
+# /launch rate limits: per client IP and per game (across clients), then a global
+# budget on the estimated CPU-seconds of in-flight jobs (see ratelimit.py).
+# Under `serve` with several workers, serve_worker_started() switches them to
+# one store shared by all workers.
+LIMIT_STORE = ratelimit.MemoryStore(max_keys=10000)
+IP_LIMITER = ratelimit.TokenBucketLimiter(LIMIT_STORE, rate=1.0, burst=10, prefix="ip")
+GAME_LIMITER = ratelimit.TokenBucketLimiter(LIMIT_STORE, rate=5.0, burst=20, prefix="game")
+ADMISSION = ratelimit.AdmissionController(LIMIT_STORE, budget=120.0)
+# logical game name -> script started by /launch (fields: launch_schema.SCHEMAS)
+LAUNCH_SCRIPTS = {
+    "tictactoe": "tictactoe.py",
+    "snake": "snake.py",
+    "basic_calculator": "calculator.py",
+    "scientific_calculator": "calculator_scientific.py",
+    "qiskit_math": "qiskitquantum.py",
+    "planet3d": "planet3d.py",
+}
+# qiskit results without a requested --out-file are captured here and deleted after reading
+# (a private, unpredictably named directory, created per server start)
+LAUNCH_CAPTURE_DIR = tempfile.mkdtemp(prefix="app_launch_capture_")
+
+# Prometheus metrics exposed at /metrics (see metrics.py). Observations go to
+# per-thread shards, so recording them on the request path takes no lock.
+METRICS = metrics.Registry()
+REQUEST_SECONDS = METRICS.histogram(
+    "http_request_duration_seconds", "Request latency by route and method", ("route", "method"))
+REQUESTS = METRICS.counter("http_requests", "Requests by route, method and status", ("route", "method", "status"))
+SPAWN_SECONDS = METRICS.histogram("launch_spawn_seconds", "Time to start a launched process", ("game",))
+OUTPUT_WAIT_SECONDS = METRICS.histogram(
+    "launch_output_wait_seconds", "Time from spawn until the output file is ready", ("game", "state"),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+LAUNCHES = METRICS.counter("launches", "Launch jobs by game and outcome", ("game", "outcome"))
+TEMPLATE_SECONDS = METRICS.histogram("template_render_seconds", "Index template render time", ("page",))
+QISKIT_COMPUTE_SECONDS = METRICS.histogram(
+    "qiskit_compute_seconds", "qiskitquantum compute time per operation (reported by the child)", ("op",))
+METRICS.gauge("launch_jobs", "Launch jobs running or waiting for a slot",
+              lambda: JOB_MANAGER.queue_depth(), labelname="state")
+METRICS.gauge("launch_processes", "Live child processes by game", lambda: SUPERVISOR.counts(), labelname="game")
+METRICS.gauge("admission_inflight_cpu_seconds", "Estimated CPU-seconds of admitted, unfinished launch jobs",
+              lambda: ADMISSION.in_flight())
+METRICS.gauge("launch_memo", "Memoized launch results (entries, bytes, hits, misses)",
+              lambda: RESULT_CACHE.stats(), labelname="stat")
+
+# Build resized/fingerprinted static assets once at startup (see assets.py);
+# url_for('static', ...) is rewritten through this manifest.
+ASSET_MANIFEST = assets.load_or_build(app.static_folder)
+# Built files never change under the same name, so browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
   <meta charset="utf-8">
   <title>My first website</title>
-  <link rel="icon" href="{{ url_for('static', filename='icon.png') }}" type="image/png">
+  <link rel="icon" href="{{ url_for('static', filename='icon.png', size='32x32') }}">
+  <link rel="stylesheet" href="{{ url_for('static', filename='index.css') }}">
   <style>
-    body {
-      margin: 0;
-      min-height: 100vh;
-      font-family: 'Poppins', 'Segoe UI', system-ui, -apple-system, Roboto, "Helvetica Neue", Arial;
-      background-image: url("{{ url_for('static', filename='images.jpg') }}");
-      background-position: center;
-      background-size: cover;
-      background-repeat: no-repeat;
-      background-color: rgba(0,0,0,0.25);
-      color: #111827;
-      display: flex;
-      align-items: center;
-      justify-content: center;
-      padding: 40px;
-    }
-    .card{max-width:520px;margin:0 auto;background:#fff;padding:20px;border-radius:12px;box-shadow:0 6px 22px rgba(0,0,0,0.08)}
-    label{display:block;margin-top:10px;color:#333}
-    input,select,button,textarea{width:100%;padding:10px;border-radius:8px;border:1px solid #ddd;margin-top:8px;box-sizing:border-box}
-    button.primary{background:#0aa1ff;color:#fff;border:none;margin-top:12px}
-    .info{margin-top:14px;padding:12px;background:#0b1720;color:#fff;border-radius:10px;text-align:center}
-    .q-section{display:none;background:#f6f9fb;padding:10px;border-radius:8px;margin-top:8px}
-    .inline{display:flex;gap:8px}
-    .inline > * {flex:1}
+    /* only the part that needs url_for stays inline */
+    body{background-image:url("{{ url_for('static', filename='images.jpg', size='web') }}")}
   </style>
 </head>
 <body>
@@ -137,7 +220,7 @@ HTML_TEMPLATE = """
 
         <div style="margin-top:8px">
           <label>Save qiskit result to file (optional)</label>
-          <input name="q_outfile" id="q_outfile" placeholder="e.g. static/q_result.json" value="{{ q_outfile if submitted else '' }}">
+          <input name="q_outfile" id="q_outfile" placeholder="e.g. q_result.json (saved to /static/generated)" value="{{ q_outfile if submitted else '' }}">
         </div>
       </div>
 
@@ -154,13 +237,18 @@ HTML_TEMPLATE = """
           </select>
 
           <div style="width:140px;margin-left:8px;">
-            <img id="planetPreview" alt="planet preview" style="width:100%;height:100px;object-fit:cover;border-radius:8px;border:1px solid #ddd;" src="{{ url_for('static', filename=('planet_' ~ (planet_type if submitted else 'earth') ~ '.png')) }}">
+            {% set preview_file = 'planet_' ~ (planet_type if submitted else 'earth') ~ '.png' %}
+            <img id="planetPreview" alt="planet preview" width="140" height="100" style="width:100%;height:100px;object-fit:cover;border-radius:8px;border:1px solid #ddd;" src="{{ url_for('static', filename=preview_file, size='140x100') }}" srcset="{{ url_for('static', filename=preview_file, size='280x200') }} 2x">
           </div>
         </div>
 
         <div id="planetGallery" style="margin-top:10px;display:flex;gap:8px;flex-wrap:wrap;">
           {% for p in ['earth','mars','jupiter','venus','moon'] %}
-            <img class="thumb" data-planet="{{ p }}" title="{{ p }}" src="{{ url_for('static', filename=('planet_' ~ p ~ '.png')) }}" style="width:64px;height:64px;object-fit:cover;border-radius:8px;border:1px solid #ddd;cursor:pointer" onclick="selectPlanetFromThumb('{{ p }}')">
+            {% set thumb_file = 'planet_' ~ p ~ '.png' %}
+            <img class="thumb" data-planet="{{ p }}" title="{{ p }}" width="64" height="64" loading="lazy"
+                 src="{{ url_for('static', filename=thumb_file, size='64x64') }}" srcset="{{ url_for('static', filename=thumb_file, size='128x128') }} 2x"
+                 data-preview="{{ url_for('static', filename=thumb_file, size='140x100') }}" data-preview2x="{{ url_for('static', filename=thumb_file, size='280x200') }}"
+                 style="width:64px;height:64px;object-fit:cover;border-radius:8px;border:1px solid #ddd;cursor:pointer" onclick="selectPlanetFromThumb('{{ p }}')">
           {% endfor %}
         </div>
 
@@ -176,7 +264,7 @@ HTML_TEMPLATE = """
         </div>
 
         <label style="margin-top:8px">Output filename (optional)</label>
-        <input name="planet_outfile" id="planet_outfile" placeholder="e.g. myplanet.png (saved to /static)" value="{{ planet_outfile if submitted else '' }}">
+        <input name="planet_outfile" id="planet_outfile" placeholder="e.g. myplanet.png (saved to /static/generated)" value="{{ planet_outfile if submitted else '' }}">
       </div>
 
       <button class="primary" type="submit">Submit</button>
@@ -221,102 +309,91 @@ HTML_TEMPLATE = """
     {% endif %}
   </div>
 
-  <script>
-    function onGameChange(){
-      const sel = document.getElementById('gameSelect').value;
-      document.getElementById('qiskitSection').style.display = (sel === 'qiskit_math') ? 'block' : 'none';
-      document.getElementById('planet3dSection').style.display = (sel === 'planet3d') ? 'block' : 'none';
-    }
-    function onQOpChange(){
-      const op = document.getElementById('q_op').value;
-      document.getElementById('state2Block').style.display = (op === 'fidelity' || op === 'inner') ? 'block' : 'none';
-      document.getElementById('pauliBlock').style.display = (op === 'expectation') ? 'block' : 'none';
-      document.getElementById('qftBlock').style.display = (op === 'qft') ? 'block' : 'none';
-    }
-    function onStateTypeChange(idx){
-      const type = document.getElementById('q_state'+idx+'_type').value;
-      document.getElementById('q_state'+idx+'_predef').style.display = (type === 'predefined') ? 'block' : 'none';
-      document.getElementById('q_state'+idx+'_raw').style.display = (type === 'raw') ? 'block' : 'none';
-    }
-
-    // Planet preview helpers
-    function onPlanetChange(){
-      const sel = document.getElementById('planet_type');
-      const planet = sel ? sel.value : 'earth';
-      const preview = document.getElementById('planetPreview');
-      if(preview) preview.src = '/static/planet_' + planet + '.png';
-      // highlight selected thumb
-      document.querySelectorAll('.thumb').forEach(t => t.style.boxShadow = (t.dataset.planet === planet) ? '0 0 0 3px rgba(10,161,255,0.15)' : '');
-    }
-    function selectPlanetFromThumb(p){
-      const sel = document.getElementById('planet_type');
-      if(sel) sel.value = p; onPlanetChange();
-    }
-
-    // initialize visibility based on server-rendered values
-    try{ onGameChange(); onQOpChange(); onStateTypeChange(1); onStateTypeChange(2); onPlanetChange(); }catch(e){}
-
-    async function launchExternal(){
-      try{
-        const gameEl = document.getElementById('payload_game');
-        const gameKeyEl = document.getElementById('payload_game_key');
-        const nameEl = document.getElementById('payload_name');
-        const ageEl = document.getElementById('payload_age');
-        const countryEl = document.getElementById('payload_country');
-
-        if(!gameEl){ alert('No submission data found. Please submit the form first.'); return; }
-
-        const payload = {
-          game: (gameKeyEl && gameKeyEl.value) ? gameKeyEl.value : (gameEl.value || 'tictactoe'),
-          name: nameEl ? nameEl.value : '',
-          age: ageEl ? ageEl.value : '',
-          country: countryEl ? countryEl.value : ''
-        };
-
-        // qiskit-specific fields (if present)
-        const qop = document.getElementById('payload_q_op');
-        if(qop && qop.value){
-          payload.q_op = qop.value;
-          payload.q_state1_type = document.getElementById('payload_q_state1_type').value;
-          payload.q_state1_pre = document.getElementById('payload_q_state1_pre').value;
-          payload.q_state1_raw_val = document.getElementById('payload_q_state1_raw_val').value;
-          payload.q_state2_type = document.getElementById('payload_q_state2_type').value;
-          payload.q_state2_pre = document.getElementById('payload_q_state2_pre').value;
-          payload.q_state2_raw_val = document.getElementById('payload_q_state2_raw_val').value;
-          payload.q_pauli = document.getElementById('payload_q_pauli').value;
-          payload.q_nqubits = document.getElementById('payload_q_nqubits').value;
-          payload.q_state_raw_for_qft = document.getElementById('payload_q_state_raw_for_qft').value;
-          payload.q_outfile = document.getElementById('q_outfile') ? document.getElementById('q_outfile').value : '';
-        }
-
-        // planet3d-specific fields (if present)
-        const ptype = document.getElementById('payload_planet_type');
-        if(ptype && ptype.value){
-          payload.planet_type = ptype.value;
-          payload.planet_rotation = document.getElementById('payload_planet_rotation').value;
-          payload.planet_save = document.getElementById('payload_planet_save').value;
-          payload.planet_outfile = document.getElementById('payload_planet_outfile').value;
-        }
-
-        const res = await fetch('/launch', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify(payload)
-        });
-        const body = await res.json();
-        if(body.ok){
-          const label = gameEl ? gameEl.value : payload.game;
-          alert(label + ' launched (check your desktop).');
-        } else {
-          alert('Launch failed: ' + (body.error || 'unknown'));
-        }
-      }catch(e){ alert('Request failed: ' + e.message); }
-    }
-  </script>
+  <script src="{{ url_for('static', filename='qmath.js') }}"></script>
+  <script src="{{ url_for('static', filename='index.js') }}"></script>
 </body>
 </html>
 """
 
+@app.url_defaults
+def asset_url_defaults(endpoint, values):
+    """Point url_for('static', filename=..., size=...) at the built asset."""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = assets.lookup(ASSET_MANIFEST, values['filename'], values.pop('size', None))
+
+
+def serve_static(filename):
+    """Static file view: built assets are immutable and served precompressed."""
+    if not filename.startswith(assets.BUILD_DIR + '/'):
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    accepted = request.accept_encodings
+    encoding = None
+    for enc, ext in (('br', '.br'), ('gzip', '.gz')):
+        if accepted[enc] and os.path.isfile(os.path.join(app.static_folder, filename + ext)):
+            encoding = enc
+            filename = filename + ext
+            break
+
+    resp = send_from_directory(app.static_folder, filename, mimetype=mimetype,
+                               conditional=True, etag=True, max_age=IMMUTABLE_MAX_AGE)
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    resp.vary.add('Accept-Encoding')
+    if encoding:
+        resp.content_encoding = encoding
+    return resp
+
+
+app.view_functions['static'] = serve_static
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(resp):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # label by the URL rule, not the path, so /jobs/<id> stays one series
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=request.method)
+        REQUESTS.inc(route=route, method=request.method, status=resp.status_code)
+    return resp
+
+
+# Compile the page once; render_template() accepts the Template object directly.
+INDEX_TEMPLATE = app.jinja_env.from_string(HTML_TEMPLATE)
+# The unsubmitted GET page only depends on the template and asset manifest, so it
+# is rendered once (on the first request, which provides url_for's context).
+_index_get_cache = {}
+
+
+def index_get_response():
+    """Serve the pre-rendered GET page with an ETag (and gzip when accepted)."""
+    if not _index_get_cache:
+        with TEMPLATE_SECONDS.time(page='get'):
+            body = render_template(INDEX_TEMPLATE, submitted=False, name='', age='', country='',
+                                   game='tictactoe').encode('utf-8')
+        _index_get_cache.update(body=body,
+                                gzip=gzip.compress(body, compresslevel=9, mtime=0),
+                                etag=hashlib.sha256(body).hexdigest()[:16])
+
+    use_gzip = bool(request.accept_encodings['gzip'])
+    resp = make_response(_index_get_cache['gzip' if use_gzip else 'body'])
+    resp.mimetype = 'text/html'
+    if use_gzip:
+        resp.content_encoding = 'gzip'
+    resp.vary.add('Accept-Encoding')
+    # browsers revalidate every time but get a 304 while the page is unchanged
+    resp.cache_control.no_cache = True
+    resp.set_etag(_index_get_cache['etag'] + ('-gz' if use_gzip else ''))
+    return resp.make_conditional(request)
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
@@ -358,105 +435,65 @@ def index():
         else:
           game_label = game
 
-        return render_template_string(HTML_TEMPLATE,
-                                      submitted=True,
-                                      name=name,
-                                      age=age,
-                                      country=country,
-                                      game=game,
-                                      game_label=game_label,
-                                      q_op=q_op,
-                                      q_state1_type=q_state1_type,
-                                      q_state1_pre=q_state1_pre,
-                                      q_state1_raw_val=q_state1_raw_val,
-                                      q_state2_type=q_state2_type,
-                                      q_state2_pre=q_state2_pre,
-                                      q_state2_raw_val=q_state2_raw_val,
-                                      q_pauli=q_pauli,
-                                      q_nqubits=q_nqubits,
-                                      q_state_raw_for_qft=q_state_raw_for_qft,
-                                      planet_type=planet_type,
-                                      planet_rotation=planet_rotation,
-                                      planet_save=planet_save,
-                                      planet_outfile=planet_outfile)
-    return render_template_string(HTML_TEMPLATE, submitted=False, name='', age='', country='', game='tictactoe')
+        render_started = time.perf_counter()
+        page = render_template(INDEX_TEMPLATE,
+                               submitted=True,
+                               name=name,
+                               age=age,
+                               country=country,
+                               game=game,
+                               game_label=game_label,
+                               q_op=q_op,
+                               q_state1_type=q_state1_type,
+                               q_state1_pre=q_state1_pre,
+                               q_state1_raw_val=q_state1_raw_val,
+                               q_state2_type=q_state2_type,
+                               q_state2_pre=q_state2_pre,
+                               q_state2_raw_val=q_state2_raw_val,
+                               q_pauli=q_pauli,
+                               q_nqubits=q_nqubits,
+                               q_state_raw_for_qft=q_state_raw_for_qft,
+                               planet_type=planet_type,
+                               planet_rotation=planet_rotation,
+                               planet_save=planet_save,
+                               planet_outfile=planet_outfile)
+        TEMPLATE_SECONDS.observe(time.perf_counter() - render_started, page='post')
+        return page
+    return index_get_response()
 
 @app.route("/launch", methods=["POST"])
 def launch():
     """
     Launch the selected script or run a qiskit math command as a separate
-    background process. Expects JSON with game and optional qiskit fields.
+    background process. Expects JSON with game and optional qiskit fields,
+    validated against launch_schema.SCHEMAS before anything is spawned.
     """
-    data = request.get_json(silent=True) or {}
-    game = data.get("game", "tictactoe")
-    name = data.get("name", "")
-    age = data.get("age", "")
-    country = data.get("country", "")
-
-    # allow specific scripts (map logical name -> filename)
-    allowed = {
-      "tictactoe": "tictactoe.py",
-      "snake": "snake.py",
-      "basic_calculator": "calculator.py",
-      "scientific_calculator": "calculator_scientific.py",
-      "qiskit_math": "qiskitquantum.py",
-      "planet3d": "planet3d.py",
-    }
-    if game not in allowed:
-      return jsonify({"ok": False, "error": "unsupported game"}), 400
-
-    script_path = os.path.join(app.root_path, allowed[game])
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    try:
+        req = launch_schema.parse_launch(data, app.static_folder)
+    except launch_schema.ValidationError as e:
+        return jsonify({"ok": False, "error": str(e), "errors": e.errors}), 400
+    game = req["game"]
+    fields = req["fields"]
+    cost = req["cost"]
+
+    script_path = os.path.join(app.root_path, LAUNCH_SCRIPTS[game])
     if not os.path.isfile(script_path):
         return jsonify({"ok": False, "error": f"script not found: {script_path}"}), 404
 
-    try:
-        # If launching qiskit_math, build CLI args from q_* payload fields
-        if game == "qiskit_math":
-            q_op = data.get("q_op", "fidelity")
-            args = [sys.executable, script_path, "--cmd", q_op]
-
-            # helper to read state (predefined vs raw)
-            def state_arg(prefix):
-                t = data.get(f"{prefix}_type", "predefined")
-                if t == "predefined":
-                    return data.get(f"{prefix}_pre", "0")
-                return data.get(f"{prefix}_raw_val", "")
-
-            if q_op in ("fidelity", "inner"):
-                s1 = state_arg('q_state1')
-                s2 = state_arg('q_state2')
-                args += ["--state1", s1, "--state2", s2]
-            elif q_op == "bloch":
-                s1 = state_arg('q_state1')
-                args += ["--state", s1]
-            elif q_op == "expectation":
-                s1 = state_arg('q_state1')
-                pauli = data.get('q_pauli', 'Z')
-                args += ["--state", s1, "--pauli", pauli]
-            elif q_op == "qft":
-                n = int(data.get('q_nqubits') or 1)
-                args += ["--nqubits", str(n)]
-                raw = data.get('q_state_raw_for_qft', '')
-                if raw:
-                    args += ["--state", raw]
-
-            # optional outfile for qiskit CLI
-            q_out = data.get('q_outfile', '').strip()
-            if q_out:
-                args += ["--out-file", q_out]
-                expected_out = q_out
-            else:
-                expected_out = None
+    # refuse jobs that would hit the child's rlimits anyway
+    limits = SUPERVISOR.limits.get(game, {})
+    for resource_name, unit in (("memory_bytes", "bytes"), ("cpu_seconds", "CPU-s")):
+        limit = limits.get(resource_name)
+        if limit and cost[resource_name] > limit:
+            LAUNCHES.inc(game=game, outcome="too_large")
+            return jsonify({"ok": False, "cost": cost,
+                            "error": f"job too large: needs ~{cost[resource_name]:.3g} {unit}, limit {limit:.3g}"}), 422
 
-            # keep name/age/country as context if needed
-            args += [str(name or ""), str(age or ""), str(country or "")]
-        elif game == "planet3d":
-            # Launch planet3d.py with NO CLI arguments — let the script run its builtin demo/defaults.
-            # This intentionally ignores the planet3d form fields and starts the script without flags.
-            args = [sys.executable, script_path]
-        else:
-            # Build process args for normal scripts: pass name, age, country as argv
-            args = [sys.executable, script_path, str(name or ""), str(age or ""), str(country or "")]
+    try:
+        args, expected_out, capture, memo_parts = launch_args(req, script_path)
 
         # On Windows open in new console window; run detached (background)
         popen_kwargs = {"cwd": app.root_path, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
@@ -465,47 +502,354 @@ def launch():
         else:
           popen_kwargs["close_fds"] = True
 
-        # write debug log of the exact command we will run
-        try:
-            with open(os.path.join(app.root_path, 'launch_debug.log'), 'a', encoding='utf-8') as lf:
-                lf.write(f"{datetime.utcnow().isoformat()} - launching: {args}\n")
-        except Exception:
-            pass
-
-        proc = subprocess.Popen(args, **popen_kwargs)
-
-        # if we know an expected output file, poll briefly for its creation so the UI can link to it
-        saved = None
-        expected = None
-        # planet3d sets outp variable earlier when save_flag == 'on'
-        if locals().get('outp'):
-            expected = locals().get('outp')
-        # qiskit may set expected_out above
-        if locals().get('expected_out'):
-            expected = locals().get('expected_out')
-
-        if expected:
-            abs_expected = expected if os.path.isabs(expected) else os.path.join(app.root_path, expected)
-            for _ in range(30):
-                if os.path.exists(abs_expected):
-                    saved = expected
-                    break
-                time.sleep(0.1)
-
-        # log pid
-        try:
-            with open(os.path.join(app.root_path, 'launch_debug.log'), 'a', encoding='utf-8') as lf:
-                lf.write(f"{datetime.utcnow().isoformat()} - pid: {proc.pid} - expected_out: {expected}\n")
-        except Exception:
-            pass
-
-        resp = {"ok": True}
-        if saved:
-            resp['saved'] = saved
-        return jsonify(resp)
+        if memo_parts is None:
+            # if we know an expected output file, the job waits for it so the UI can link to it
+            job_id = start_launch(request.remote_addr, cost["cpu_seconds"], game, run_launch_job,
+                                  game, args, popen_kwargs, expected_out, capture)
+            return jsonify({"ok": True, "job_id": job_id, "status_url": f"/jobs/{job_id}"}), 202
+
+        key = memo.canonical_key(*memo_parts)
+        cached = cached_launch_result(key)
+        if cached is not None:
+            job = JOB_MANAGER.store.create(game)
+            JOB_MANAGER.store.update(job["id"], status="done", result=dict(cached, cached=True),
+                                     started=time.time(), finished=time.time())
+            LAUNCHES.inc(game=game, outcome="memo_hit")
+            return jsonify({"ok": True, "job_id": job["id"], "status_url": f"/jobs/{job['id']}", "cached": True}), 202
+
+        # cache hits (above) and duplicates of a running job pass no gate; only a
+        # request that really starts a job spends rate-limit tokens and CPU budget
+        job_id, started = INFLIGHT.join(key, lambda: start_launch(
+            request.remote_addr, cost["cpu_seconds"], game, run_memoized_launch_job,
+            key, game, args, popen_kwargs, expected_out, capture))
+        if not started:
+            LAUNCHES.inc(game=game, outcome="coalesced")
+        return jsonify({"ok": True, "job_id": job_id, "status_url": f"/jobs/{job_id}",
+                        "coalesced": not started}), 202
+    except ratelimit.RateLimited as e:
+        LAUNCHES.inc(game=game, outcome="rate_limited")
+        return too_many_requests(str(e), e.retry_after)
+    except ratelimit.Rejected as e:
+        LAUNCHES.inc(game=game, outcome="over_budget")
+        return too_many_requests(str(e), e.retry_after)
+    except jobs.QueueFull as e:
+        LAUNCHES.inc(game=game, outcome="queue_full")
+        return jsonify({"ok": False, "error": f"{e}, try again shortly"}), 503
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
+
+def launch_args(req, script_path):
+    """Build the child argv from a validated request.
+
+    Returns (args, expected_out, capture, memo_parts): the output file the job
+    waits for (qiskit, and planet3d when saving), whether that file is a private
+    capture to read back and delete, and the canonical description of the
+    computation for coalescing (None means never coalesce).
+    """
+    game, fields, info = req["game"], req["fields"], req["info"]
+    context = [fields["name"], fields["age"], fields["country"]]
+
+    if game == "qiskit_math":
+        q_op = fields["q_op"]
+        args = [sys.executable, script_path, "--cmd", q_op]
+        if q_op in ("fidelity", "inner"):
+            args += ["--state1", info["state1"], "--state2", info["state2"]]
+        elif q_op == "bloch":
+            args += ["--state", info["state"]]
+        elif q_op == "expectation":
+            args += ["--state", info["state"], "--pauli", fields["q_pauli"]]
+        elif q_op == "qft":
+            if "state" in info:
+                args += ["--state", info["state"]]
+            else:
+                args += ["--nqubits", str(fields["q_nqubits"])]
+        memo_parts = [game] + args[2:] + [fields["q_outfile"]]
+        # without a requested outfile the result is captured in a private temp file
+        capture = fields["q_outfile"] is None
+        if capture:
+            os.makedirs(LAUNCH_CAPTURE_DIR, exist_ok=True)
+            expected_out = os.path.join(LAUNCH_CAPTURE_DIR, uuid.uuid4().hex + ".json")
+        else:
+            expected_out = fields["q_outfile"]
+            os.makedirs(os.path.join(app.static_folder, launch_schema.GENERATED_DIR), exist_ok=True)
+        # keep name/age/country as context if needed
+        return args + ["--out-file", expected_out] + context, expected_out, capture, memo_parts
+
+    if game == "planet3d" and info["render"]:
+        # Saving: render the chosen planet into static/generated/
+        planet, rotation = fields["planet_type"], fields["planet_rotation"]
+        expected_out = (fields["planet_outfile"]
+                        or f"static/{launch_schema.GENERATED_DIR}/planet3d_{planet}_{rotation:g}.png")
+        os.makedirs(os.path.join(app.static_folder, launch_schema.GENERATED_DIR), exist_ok=True)
+        args = [sys.executable, script_path, "--planet", planet, "--rotation", f"{rotation:g}",
+                "--out-file", expected_out]
+        return args, expected_out, False, [game] + args[2:]
+
+    if game == "planet3d":
+        # Launch planet3d.py with NO CLI arguments — let the script run its builtin demo/defaults.
+        # This intentionally ignores the other planet3d form fields and starts the script without flags.
+        return [sys.executable, script_path], None, False, None
+
+    # Build process args for normal scripts: pass name, age, country as argv
+    return [sys.executable, script_path] + context, None, False, None
+
+
+def too_many_requests(message, retry_after):
+    resp = jsonify({"ok": False, "error": message, "retry_after": round(retry_after, 1)})
+    resp.status_code = 429
+    resp.headers["Retry-After"] = ratelimit.retry_after_header(retry_after)
+    return resp
+
+
+def start_launch(client, cost, game, fn, *args):
+    """Pass the launch gates, then submit `fn(*args)` as a job; returns the job id.
+
+    The gates, in order: the per-client and per-game rate limits and the
+    CPU budget. Raises ratelimit.RateLimited or ratelimit.Rejected, and
+    jobs.QueueFull when the game's job queue is full. A game at its process
+    cap is not a rejection: the job waits for a slot (see run_launch_job).
+    """
+    wait = IP_LIMITER.check(client) or GAME_LIMITER.check(game)
+    if wait:
+        raise ratelimit.RateLimited("too many launches, slow down", wait)
+    return submit_admitted(cost, game, fn, *args)
+
+
+def submit_admitted(cost, game, fn, *args):
+    """Reserve `cost` of the CPU budget and submit `fn(*args)` as a job that releases it.
+
+    Raises ratelimit.Rejected when the budget is exhausted.
+    """
+    ADMISSION.admit(cost)
+    try:
+        return JOB_MANAGER.submit(game, run_and_release, cost, fn, *args)
+    except Exception:
+        ADMISSION.release(cost)
+        raise
+
+
+def run_and_release(cost, fn, *args):
+    try:
+        return fn(*args)
+    finally:
+        ADMISSION.release(cost)
+
+
+def cached_launch_result(key):
+    """Memoized result for `key`, unless its saved file has changed since."""
+    entry = RESULT_CACHE.get(key)
+    if entry is None:
+        return None
+    result, path, signature = entry
+    if path is not None and output_watch.file_signature(path) != signature:
+        # the file was deleted or overwritten by another request
+        RESULT_CACHE.discard(key)
+        return None
+    return result
+
+
+def run_memoized_launch_job(key, game, args, popen_kwargs, expected, capture):
+    """run_launch_job, then memoize the result and release the in-flight key."""
+    try:
+        result = run_launch_job(game, args, popen_kwargs, expected, capture)
+        output = result.get("output")
+        if game == "qiskit_math" and (not isinstance(output, dict) or "error" in output):
+            # failures are not memoized: the next identical launch tries again
+            return result
+        path = None
+        if "saved" in result:
+            path = expected if os.path.isabs(expected) else os.path.join(app.root_path, expected)
+        RESULT_CACHE.put(key, (result, path, output_watch.file_signature(path) if path else None))
+        return result
+    finally:
+        INFLIGHT.finish(key)
+
+
+def run_launch_job(game, args, popen_kwargs, expected, capture=False):
+    """Job body for /launch: spawn the process and wait for its output file.
+
+    Returns {"pid": ..., "saved": path, "output": ...}; "saved" is only present
+    when an output file was expected and "output" when it was a qiskit JSON
+    result. With `capture` the file is a private temp file: it is read into
+    "output" and removed. Raises if the process exits or the timeout passes
+    before the file appears, or if the game is at its process cap.
+    """
+    job_id = jobs.current_job_id()
+    LAUNCH_LOG.event("launch", job_id=job_id, game=game, args=args[1:], expected_out=expected)
+    abs_expected = None
+    baseline = None
+    if expected:
+        abs_expected = expected if os.path.isabs(expected) else os.path.join(app.root_path, expected)
+        baseline = output_watch.file_signature(abs_expected)
+
+    started = time.perf_counter()
+    try:
+        proc = SUPERVISOR.spawn(game, args, tag=job_id, wait=SPAWN_WAIT_TIMEOUT, **popen_kwargs)
+    except Exception as exc:
+        LAUNCH_LOG.event("error", job_id=job_id, game=game, error=str(exc))
+        LAUNCHES.inc(game=game, outcome="spawn_error")
+        raise
+    spawned = time.perf_counter()
+    SPAWN_SECONDS.observe(spawned - started, game=game)
+    LAUNCH_LOG.event("spawned", job_id=job_id, game=game, pid=proc.pid,
+                     spawn_ms=round((spawned - started) * 1000, 3))
+    result = {"pid": proc.pid}
+
+    if expected:
+        state = output_watch.wait_for_output(abs_expected, LAUNCH_OUTPUT_TIMEOUT, proc=proc, baseline=baseline)
+        waited = time.perf_counter() - spawned
+        LAUNCH_LOG.event("output", job_id=job_id, game=game, state=state, output_ms=round(waited * 1000, 3))
+        OUTPUT_WAIT_SECONDS.observe(waited, game=game, state=state)
+        LAUNCHES.inc(game=game, outcome=state)
+        if state == output_watch.EXITED:
+            raise RuntimeError(f"process exited with code {proc.returncode} before writing {expected}")
+        if state == output_watch.TIMEOUT:
+            raise TimeoutError(f"no output at {expected} after {LAUNCH_OUTPUT_TIMEOUT:.0f}s")
+        if game == "qiskit_math":
+            result["output"] = read_qiskit_output(abs_expected)
+        if capture:
+            try:
+                os.remove(abs_expected)
+            except OSError:
+                pass
+        else:
+            result["saved"] = expected
+    else:
+        LAUNCHES.inc(game=game, outcome="spawned")
+    return result
+
+
+def read_qiskit_output(path):
+    """Load a qiskitquantum result file and record its compute time metric."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        return None
+    try:
+        QISKIT_COMPUTE_SECONDS.observe(float(result['compute_ms']) / 1000.0, op=result['operation'])
+    except (KeyError, TypeError, ValueError):
+        # error results carry no timing
+        pass
+    # name/age/country are not part of the memo key, so they must not be shared
+    result.pop('context', None)
+    return result
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/processes")
+def processes():
+    """Live child processes started by /launch (pid, type, runtime, RSS)."""
+    return jsonify({"ok": True, "counts": SUPERVISOR.counts(), "processes": SUPERVISOR.snapshot()})
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    """Return a launch job's current status/result as JSON."""
+    job = JOB_MANAGER.store.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "unknown or expired job"}), 404
+    return jsonify({"ok": True, "job": job})
+
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    """Server-Sent Events stream of a job's status until it finishes."""
+    job = JOB_MANAGER.store.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "unknown or expired job"}), 404
+
+    def stream(job):
+        while True:
+            yield f"event: status\ndata: {json.dumps(job)}\n\n"
+            if job["status"] in jobs.TERMINAL_STATES:
+                return
+            version = job["version"]
+            while True:
+                job = JOB_MANAGER.store.wait(job_id, version, timeout=SSE_HEARTBEAT)
+                if job is None:
+                    return
+                if job["version"] != version:
+                    break
+                # comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+
+    resp = Response(stream(job), mimetype="text/event-stream")
+    resp.cache_control.no_cache = True
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+def warm_caches():
+    """Render the cached GET page ahead of the first request (used before forking workers)."""
+    with app.test_request_context('/'):
+        index_get_response()
+
+
+# `serve` with several workers: these objects live in its shared-state process
+# (forked from the master, so each entry returns that process's copy of the
+# global). Limits, process caps, the admission budget and memoized results
+# then hold across workers, and one process writes the launch log, so its
+# rotation does not race. Job records stay in the worker that runs the job;
+# job ids carry the worker slot and serve forwards /jobs/<id> to its owner.
+# Single-flight stays per worker: identical launches on two workers at once
+# both run, but the second one after a finish is a cache hit.
+SERVE_SHARED = {
+    "limit_store": lambda: LIMIT_STORE,
+    "result_cache": lambda: RESULT_CACHE,
+    "launch_log": (lambda: LAUNCH_LOG, LaunchLogProxy),
+}
+JOB_OWNER = re.compile(r"/jobs/w(\d+)-")
+
+
+def serve_owner(pid):
+    return f"pid{pid}"
+
+
+def serve_worker_started(slot, workers, shared):
+    """Switch this worker to the shared state (serve's on_worker_start hook)."""
+    global RESULT_CACHE, LAUNCH_LOG
+    store = shared["limit_store"]
+    owner = serve_owner(os.getpid())
+    JOB_MANAGER.store.id_prefix = f"w{slot}-"
+    # the pending-job bound is for the whole server
+    JOB_MANAGER.max_pending = max(1, JOB_MANAGER.max_pending // workers)
+    IP_LIMITER.store = GAME_LIMITER.store = store
+    ADMISSION.use_store(store, owner)
+    SUPERVISOR.share(store, owner)
+    RESULT_CACHE = shared["result_cache"]
+    LAUNCH_LOG = shared["launch_log"]
+
+
+def serve_worker_exited(pid, shared):
+    """Give back the budget and process slots an exited worker still held."""
+    store = shared["limit_store"]
+    ADMISSION.reclaim(store, serve_owner(pid))
+    ProcessSupervisor.reclaim(store, serve_owner(pid), LAUNCH_SCRIPTS)
+
+
+def serve_route(path):
+    """Slot of the worker that owns `path` (a job URL), or None."""
+    match = JOB_OWNER.match(path)
+    return int(match.group(1)) if match else None
+
+
 if __name__ == "__main__":
-    # Run on localhost only (this launches processes on this machine).
-    app.run(debug=True)
+    # `python -m app serve [--workers N] [--bind HOST:PORT] [--debug]` runs the
+    # multi-worker production server (see serve.py). Plain `python app.py` keeps
+    # the dev server; its debugger/reloader is opt-in with --debug.
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # serve.py must see this module, not a second import of app.py
+        sys.modules.setdefault("app", sys.modules[__name__])
+        import serve
+        serve.main(app, sys.argv[2:], warm=warm_caches, shared=SERVE_SHARED,
+                   on_worker_start=serve_worker_started, on_worker_exit=serve_worker_exited,
+                   route=serve_route)
+    else:
+        # Run on localhost only (this launches processes on this machine).
+        app.run(debug="--debug" in sys.argv[1:])
@@ -0,0 +1,204 @@
+"""assets.py — build step for the files under static/.
+
+Produces, inside static/build/:
+- WebP variants of the page images at the sizes the page displays them
+- fingerprinted copies (content hash in the filename) of every asset
+- gzip-precompressed copies of text assets (plus brotli when available)
+- manifest.json mapping logical names to the built files
+
+The Flask app loads the manifest at startup and rewrites
+url_for('static', filename=..., size=...) through `lookup`, so templates keep
+referring to the original filenames. Built names change whenever the source
+changes, which is what makes it safe to serve them as immutable.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+BUILD_DIR = 'build'
+MANIFEST_NAME = 'manifest.json'
+WEBP_QUALITY = 80
+
+PLANETS = ['earth', 'mars', 'jupiter', 'venus', 'moon']
+
+# source file -> display sizes (w, h) to emit as WebP; None re-encodes at the
+# native size. Each size the page uses is listed at 1x and 2x.
+IMAGE_VARIANTS = {
+    'images.jpg': [None],
+    'icon.png': [(32, 32), (64, 64)],
+}
+for _p in PLANETS:
+    IMAGE_VARIANTS[f'planet_{_p}.png'] = [(64, 64), (128, 128), (140, 100), (280, 200)]
+
+# text assets that are fingerprinted and precompressed
+TEXT_ASSETS = ['index.css', 'index.js', 'qmath.js']
+
+COMPRESSIBLE_EXTS = ('.css', '.js', '.json', '.svg', '.txt', '.html')
+
+# Optional dependencies: Pillow for image variants, brotli for .br copies
+try:
+    from PIL import Image, ImageOps
+    HAS_PIL = True
+except Exception:
+    HAS_PIL = False
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except Exception:
+    HAS_BROTLI = False
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _size_key(size):
+    return f"{size[0]}x{size[1]}"
+
+
+def variant_key(filename, size=None):
+    """Manifest key for `filename` at `size` ('WxH' string or (w, h)); None = original."""
+    if size is None:
+        return filename
+    if not isinstance(size, str):
+        size = _size_key(size)
+    return f"{filename}@{size}"
+
+
+def _write_if_missing(path, data):
+    if os.path.isfile(path):
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _precompress(path, data):
+    """Write .gz (and .br) siblings for a compressible built file."""
+    if not path.endswith(COMPRESSIBLE_EXTS):
+        return
+    _write_if_missing(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    if HAS_BROTLI:
+        _write_if_missing(path + '.br', brotli.compress(data))
+
+
+def _webp_variant(src_path, size):
+    """Return WebP bytes for the image at `src_path`, cover-cropped to `size`."""
+    import io
+
+    with Image.open(src_path) as img:
+        img.load()
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if img.mode in ('LA', 'P', 'PA') or 'transparency' in img.info else 'RGB')
+        if size is not None:
+            img = ImageOps.fit(img, size, Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, 'WEBP', quality=WEBP_QUALITY, method=6)
+        return out.getvalue()
+
+
+def build_assets(static_dir):
+    """Build every configured asset into static/build and write the manifest.
+
+    Outputs are named by a hash of the source bytes plus the variant size, so
+    unchanged sources are skipped on rebuild. Built files that are no longer
+    referenced are removed. Returns the manifest dict.
+    """
+    build_dir = os.path.join(static_dir, BUILD_DIR)
+    os.makedirs(build_dir, exist_ok=True)
+    manifest = {}
+
+    def emit(key, name, data):
+        path = os.path.join(build_dir, name)
+        _write_if_missing(path, data)
+        _precompress(path, data)
+        manifest[key] = f"{BUILD_DIR}/{name}"
+
+    for filename in list(IMAGE_VARIANTS) + TEXT_ASSETS:
+        src_path = os.path.join(static_dir, filename)
+        if not os.path.isfile(src_path):
+            continue
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        digest = _digest(data)
+        stem, ext = os.path.splitext(filename)
+        emit(filename, f"{stem}.{digest}{ext}", data)
+
+        for size in (IMAGE_VARIANTS.get(filename, []) if HAS_PIL else []):
+            label = 'web' if size is None else _size_key(size)
+            name = f"{stem}.{label}.{digest}.webp"
+            if os.path.isfile(os.path.join(build_dir, name)):
+                # already built from identical source bytes; skip the re-encode
+                manifest[variant_key(filename, label)] = f"{BUILD_DIR}/{name}"
+            else:
+                emit(variant_key(filename, label), name, _webp_variant(src_path, size))
+
+    # drop stale outputs from earlier builds
+    keep = {os.path.basename(p) for p in manifest.values()}
+    keep |= {k + '.gz' for k in keep} | {k + '.br' for k in keep} | {MANIFEST_NAME}
+    for name in os.listdir(build_dir):
+        if name not in keep and not name.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(build_dir, name))
+            except OSError:
+                pass
+
+    _write_manifest(build_dir, manifest)
+    return manifest
+
+
+def _write_manifest(build_dir, manifest):
+    path = os.path.join(build_dir, MANIFEST_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def load_manifest(static_dir):
+    """Return the manifest from static/build, or {} if there is none."""
+    try:
+        with open(os.path.join(static_dir, BUILD_DIR, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_or_build(static_dir):
+    """Build assets (cheap when nothing changed); fall back to any existing manifest.
+
+    Without Pillow only fingerprinted copies are produced (no WebP variants).
+    On a read-only checkout the last manifest on disk is used, and with no
+    manifest url_for falls back to the original files.
+    """
+    try:
+        return build_assets(static_dir)
+    except Exception:
+        return load_manifest(static_dir)
+
+
+def lookup(manifest, filename, size=None):
+    """Map a logical static filename (and optional size) to its built path.
+
+    Falls back to the fingerprinted original when the size has no variant,
+    and to `filename` itself when the file is not in the manifest.
+    """
+    if size is not None:
+        built = manifest.get(variant_key(filename, size))
+        if built:
+            return built
+    return manifest.get(filename, filename)
+
+
+if __name__ == '__main__':
+    base = os.path.dirname(os.path.abspath(__file__))
+    result = build_assets(os.path.join(base, 'static'))
+    total = 0
+    for key, built in sorted(result.items()):
+        nbytes = os.path.getsize(os.path.join(base, 'static', built))
+        total += nbytes
+        print(f"{key:32} -> {built} ({nbytes} bytes)")
+    print(f"{len(result)} assets, {total} bytes")
@@ -0,0 +1,148 @@
+"""game_startup.py — fast start-up helpers shared by the pygame games.
+
+Provided:
+- init_pygame(): initialize only the display and font modules. pygame.init()
+  also starts audio, joystick and the rest, none of which the games use
+- font(size, bold): pygame's bundled font at `size`, loaded once per size. System
+  font lookups (SysFont) scan the installed fonts, or run fc-list, on
+  every start
+- cached_icon(name, source, draw_fallback): a window icon kept scaled in
+  .icon_cache/, so later starts load one tiny BMP; the source image is only
+  decoded again when it changes
+- first_frame(): called by the games after their first frame is shown
+
+The start-up benchmark launches each game the way /launch does and measures
+the time until its first frame is on screen (with GAME_STARTUP_BENCH set,
+first_frame() reports and exits):
+
+    python game_startup.py [--runs N] [--display]
+"""
+import os
+import sys
+
+import pygame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ICON_CACHE_DIR = os.path.join(BASE_DIR, ".icon_cache")
+BENCH_ENV = "GAME_STARTUP_BENCH"
+FIRST_FRAME_MARKER = "first-frame"
+_BENCH = bool(os.environ.get(BENCH_ENV))
+
+_fonts = {}
+_icons = {}
+
+
+def init_pygame():
+    """Initialize the display and font modules only (safe to call repeatedly)."""
+    pygame.display.init()
+    pygame.font.init()
+
+
+def font(size, bold=False):
+    """pygame's default (bundled) font at `size` (synthetic bold if `bold`), created once."""
+    f = _fonts.get((size, bold))
+    if f is None:
+        f = _fonts[(size, bold)] = pygame.font.Font(None, size)
+        f.set_bold(bold)
+    return f
+
+
+def static_path(name):
+    """static/<name> next to this file, else under the current directory."""
+    path = os.path.join(BASE_DIR, "static", name)
+    if not os.path.isfile(path):
+        path = os.path.join(os.getcwd(), "static", name)
+    return path
+
+
+def cached_icon(name, source=None, draw_fallback=None, size=32):
+    """`size` x `size` icon surface, from the cache when it is newer than `source`.
+
+    `source` is an image path (may be missing); `draw_fallback(size)` makes a
+    surface when there is no usable source. Returns None if neither works.
+    """
+    icon = _icons.get((name, size))
+    if icon is not None:
+        return icon
+    cache_path = os.path.join(ICON_CACHE_DIR, f"{name}_{size}.bmp")
+    source_mtime = os.path.getmtime(source) if source and os.path.isfile(source) else None
+    try:
+        if os.path.isfile(cache_path) and (source_mtime is None or os.path.getmtime(cache_path) >= source_mtime):
+            icon = pygame.image.load(cache_path)
+    except (OSError, pygame.error):
+        icon = None
+    if icon is None:
+        if source_mtime is not None:
+            try:
+                icon = pygame.transform.smoothscale(pygame.image.load(source).convert_alpha(), (size, size))
+            except pygame.error:
+                icon = None
+        if icon is None and draw_fallback is not None:
+            icon = draw_fallback(size)
+        if icon is not None:
+            try:
+                os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+                pygame.image.save(icon, cache_path)
+            except (OSError, pygame.error):
+                pass
+    if icon is not None:
+        _icons[(name, size)] = icon
+    return icon
+
+
+def first_frame():
+    """Mark the first frame as shown; exits here when run by the start-up benchmark."""
+    if _BENCH:
+        sys.stdout.write(FIRST_FRAME_MARKER + "\n")
+        sys.stdout.flush()
+        os._exit(0)
+
+
+# the positional name, age and country that /launch appends (app.launch_args)
+LAUNCH_CONTEXT = ["Ada", "36", "UK"]
+# name -> script arguments, as launched from the web page
+BENCH_GAMES = {
+    "snake (menu)": ["snake.py"] + LAUNCH_CONTEXT,
+    "snake (--ai greedy)": ["snake.py", "--ai", "greedy"] + LAUNCH_CONTEXT,
+    "tictactoe": ["tictactoe.py"] + LAUNCH_CONTEXT,
+}
+
+
+def time_to_first_frame(args, runs=5, display=False):
+    """Seconds from spawning `python args...` to its first frame, one per run."""
+    import subprocess
+    import time
+
+    env = dict(os.environ, **{BENCH_ENV: "1"})
+    if not display:
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable] + args, cwd=BASE_DIR, env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        elapsed = None
+        for line in proc.stdout:
+            if line.strip() == FIRST_FRAME_MARKER:
+                elapsed = time.perf_counter() - start
+                break
+        proc.stdout.close()
+        if proc.wait(timeout=30) != 0 or elapsed is None:
+            raise RuntimeError(f"{' '.join(args)} exited before its first frame")
+        times.append(elapsed)
+    return times
+
+
+if __name__ == "__main__":
+    import argparse
+    import statistics
+
+    parser = argparse.ArgumentParser(description="game_startup - time to first frame of the pygame games")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--display", action="store_true", help="open real windows instead of SDL's dummy driver")
+    args = parser.parse_args()
+
+    for label, script_args in BENCH_GAMES.items():
+        times = time_to_first_frame(script_args, args.runs, args.display)
+        print(f"{label:22} median {1000 * statistics.median(times):6.0f} ms   min {1000 * min(times):6.0f} ms")
@@ -0,0 +1,195 @@
+"""jobs.py — background job subsystem used by the Flask app.
+
+Classes provided:
+- JobStore: bounded, thread-safe in-memory job records with TTL eviction
+- JobManager: runs jobs on a bounded thread pool with a per-type
+  concurrency limit and a bounded per-type queue; callers get a job id back
+  immediately
+- QueueFull: raised by JobManager.submit when a type's queue is full
+
+A job record is a plain dict:
+    {"id", "type", "status", "created", "started", "finished",
+     "result", "error", "version"}
+where status moves queued -> running -> done | failed. `version` increases on
+every change so pollers and Server-Sent-Event streams can wait for news
+instead of re-reading on a timer.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+TERMINAL_STATES = ("done", "failed")
+
+_current = threading.local()
+
+
+class QueueFull(RuntimeError):
+    """Raised when a job type already has its maximum number of queued jobs."""
+
+
+def current_job_id():
+    """Id of the job running on this thread, or None outside a job."""
+    return getattr(_current, "job_id", None)
+
+
+class JobStore:
+    """In-memory job records, bounded by count and expired by age.
+
+    Finished jobs are dropped `ttl` seconds after they finish. If the store
+    is still over `max_jobs`, the oldest finished records go first. Queued and
+    running jobs are never evicted (JobManager bounds how many there are).
+    """
+
+    def __init__(self, max_jobs=1000, ttl=600.0, id_prefix=""):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        # prepended to every new job id (a server worker marks the jobs it owns)
+        self.id_prefix = id_prefix
+        self._jobs = OrderedDict()
+        self._cond = threading.Condition()
+
+    def create(self, job_type):
+        job = {
+            "id": self.id_prefix + uuid.uuid4().hex,
+            "type": job_type,
+            "status": "queued",
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "result": None,
+            "error": None,
+            "version": 0,
+        }
+        with self._cond:
+            self._evict()
+            self._jobs[job["id"]] = job
+        return dict(job)
+
+    def update(self, job_id, **fields):
+        """Apply `fields` to a job and wake anyone waiting on it."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            job["version"] += 1
+            self._cond.notify_all()
+            return dict(job)
+
+    def get(self, job_id):
+        """Return a snapshot (copy) of the job, or None if unknown/evicted."""
+        with self._cond:
+            self._evict()
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_id, version, timeout=None):
+        """Block until the job's version differs from `version` (or timeout).
+
+        Returns the job snapshot, or None if the job does not exist.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job["version"] != version:
+                    return dict(job) if job is not None else None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return dict(job)
+                self._cond.wait(remaining)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._jobs)
+
+    def _evict(self):
+        # caller holds the lock
+        now = time.time()
+        expired = [jid for jid, job in self._jobs.items()
+                   if job["finished"] is not None and now - job["finished"] > self.ttl]
+        for jid in expired:
+            del self._jobs[jid]
+        excess = len(self._jobs) - self.max_jobs + 1
+        if excess > 0:
+            oldest = [jid for jid, job in self._jobs.items() if job["status"] in TERMINAL_STATES][:excess]
+            for jid in oldest:
+                del self._jobs[jid]
+
+
+class JobManager:
+    """Run callables as jobs on a bounded pool with per-type concurrency caps.
+
+    `type_limits` maps job type -> max jobs of that type running at once
+    (types not listed use `default_limit`). Jobs over their cap wait in a
+    per-type FIFO of at most `max_pending` jobs without occupying a pool
+    thread; submit() raises QueueFull when that FIFO is full.
+    """
+
+    def __init__(self, store=None, max_workers=4, type_limits=None, default_limit=2, max_pending=32):
+        self.store = store if store is not None else JobStore()
+        self.type_limits = dict(type_limits or {})
+        self.default_limit = default_limit
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._running = defaultdict(int)
+        self._pending = defaultdict(deque)
+
+    def submit(self, job_type, fn, *args, **kwargs):
+        """Queue `fn(*args, **kwargs)` as a job and return its id immediately.
+
+        The function's return value becomes the job result; an exception
+        marks the job failed with its message as the error. Raises QueueFull
+        (without creating a record) if `job_type` has `max_pending` jobs waiting.
+        """
+        with self._lock:
+            if self._running[job_type] < self.type_limits.get(job_type, self.default_limit):
+                self._running[job_type] += 1
+                start = True
+            elif len(self._pending[job_type]) < self.max_pending:
+                start = False
+            else:
+                raise QueueFull(f"too many {job_type} jobs queued ({self.max_pending})")
+            # created under the lock so a job is queued in submission order
+            job = self.store.create(job_type)
+            item = (job["id"], job_type, fn, args, kwargs)
+            if not start:
+                self._pending[job_type].append(item)
+        if start:
+            self._executor.submit(self._run, *item)
+        return job["id"]
+
+    def queue_depth(self):
+        """Return {"running": n, "pending": n} summed over all job types."""
+        with self._lock:
+            return {"running": sum(self._running.values()),
+                    "pending": sum(len(q) for q in self._pending.values())}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id, job_type, fn, args, kwargs):
+        self.store.update(job_id, status="running", started=time.time())
+        _current.job_id = job_id
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self.store.update(job_id, status="failed", error=str(exc), finished=time.time())
+        else:
+            self.store.update(job_id, status="done", result=result, finished=time.time())
+        finally:
+            _current.job_id = None
+            self._start_next(job_type)
+
+    def _start_next(self, job_type):
+        with self._lock:
+            queue = self._pending[job_type]
+            if queue:
+                item = queue.popleft()
+            else:
+                self._running[job_type] -= 1
+                return
+        self._executor.submit(self._run, *item)
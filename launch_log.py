@@ -0,0 +1,173 @@
+"""launch_log.py — structured launch telemetry for the web app.
+
+LaunchLogger writes one JSON object per line. Writes go through a
+QueueHandler, so the request/job thread only enqueues a record. A
+QueueListener thread formats them and writes to a size-rotated file
+(RotatingFileHandler).
+
+The writer thread does not survive fork() (e.g. `python -m app serve` workers).
+A forked child starts its own writer on its first event. Several processes
+must not write one log though: their rotations race. `serve` with several
+workers hosts one LaunchLogger in its shared-state process and the workers
+log through a LaunchLogProxy, so there is a single writer.
+
+Event shapes (all carry "ts" and "event"):
+- launch:  job_id, game, args, expected_out
+- spawned: job_id, game, pid, spawn_ms
+- output:  job_id, game, state, output_ms
+- exit:    job_id, game, pid, exit_code, runtime_s
+- error:   job_id, game, error
+
+Run `python launch_log.py [--log FILE]` for p50/p95/p99 latencies per game.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import threading
+import time
+from multiprocessing.managers import BaseProxy
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launch_events.log")
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.msg, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record as-is; JSON encoding happens on the listener thread."""
+
+    def prepare(self, record):
+        return record
+
+
+class LaunchLogger:
+    """Queue-backed JSON-lines event log with size-based rotation."""
+
+    def __init__(self, path=DEFAULT_LOG, max_bytes=5 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self._file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self._file_handler.setFormatter(_JsonFormatter())
+        self._queue_handler = _DeferredQueueHandler(None)
+        self._logger = logging.getLogger(f"launch_events.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(self._queue_handler)
+        self._start_lock = threading.Lock()
+        self._listener = None
+        self._pid = None
+        self._start()
+        atexit.register(self.close)
+
+    def _start(self):
+        # fresh queue + writer thread for this process
+        q = queue.SimpleQueue()
+        self._queue_handler.queue = q
+        self._listener = logging.handlers.QueueListener(q, self._file_handler)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def event(self, name, **fields):
+        """Enqueue one event; never raises into the caller."""
+        try:
+            if self._pid != os.getpid():
+                with self._start_lock:
+                    if self._pid != os.getpid():
+                        self._start()
+            # a LaunchLogProxy stamps the time in the calling process
+            fields.setdefault("ts", round(time.time(), 3))
+            fields["event"] = name
+            self._logger.info(fields)
+        except Exception:
+            pass
+
+    def close(self):
+        """Flush queued events and stop the writer thread (safe to call twice)."""
+        with self._start_lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+
+
+class LaunchLogProxy(BaseProxy):
+    """Proxy for a LaunchLogger hosted by a multiprocessing manager; event() never raises."""
+
+    _exposed_ = ("event",)
+
+    def event(self, name, **fields):
+        try:
+            fields["ts"] = round(time.time(), 3)
+            self._callmethod("event", (name,), fields)
+        except Exception:
+            pass
+
+
+def read_events(path=DEFAULT_LOG):
+    """Yield events from `path` and its rotated backups, oldest file first."""
+    backups = []
+    n = 1
+    while os.path.exists(f"{path}.{n}"):
+        backups.append(f"{path}.{n}")
+        n += 1
+    for p in list(reversed(backups)) + [path]:
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_stats(events, fields=("spawn_ms", "output_ms")):
+    """Return {game: {field: {"count", "p50", "p95", "p99"}}} from events."""
+    samples = {}
+    for ev in events:
+        for field in fields:
+            if ev.get(field) is not None:
+                samples.setdefault(ev.get("game"), {}).setdefault(field, []).append(float(ev[field]))
+    stats = {}
+    for game, per_field in samples.items():
+        for field, values in per_field.items():
+            values.sort()
+            stats.setdefault(game, {})[field] = {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="launch_log CLI - latency percentiles per game")
+    parser.add_argument("--log", default=DEFAULT_LOG, help="launch events log (rotated backups are included)")
+    parser.add_argument("--json", action="store_true", help="print the stats as JSON")
+    args = parser.parse_args()
+
+    stats = latency_stats(read_events(args.log))
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"{'game':24} {'metric':10} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for game in sorted(stats, key=str):
+            for field, s in sorted(stats[game].items()):
+                print(f"{str(game):24} {field:10} {s['count']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f}")
@@ -0,0 +1,312 @@
+"""launch_schema.py — declarative validation and cost estimation for /launch.
+
+Each game has a schema: a dict of field name -> field spec. parse_launch()
+validates and normalizes the JSON body with it, runs the game's cross-field
+checks, and estimates what the job will cost, all before anything is spawned.
+
+Field specs:
+- Str(max_len, pattern, default)
+- Choice(options, default)
+- Int(min, max, default) / Float(min, max, default)
+- OutputPath(extensions): a file name, always written to static/generated/ so
+  a launch can never overwrite the app's own static files
+
+parse_launch(data, static_dir) returns a dict:
+    {"game", "fields": {...normalized...}, "info": {...derived...},
+     "cost": {"cpu_seconds", "memory_bytes"}}
+and raises ValidationError (with per-field messages in .errors) otherwise.
+"""
+import math
+import os
+import re
+
+# launch outputs live here, under static/
+GENERATED_DIR = "generated"
+PLANETS = ['earth', 'mars', 'jupiter', 'venus', 'moon']
+QISKIT_OPS = ['fidelity', 'bloch', 'expectation', 'inner', 'qft']
+PREDEFINED_STATES = {'0': 1, '1': 1, '+': 1, '-': 1}  # name -> qubits
+MAX_QUBITS = 16
+MAX_AMPLITUDES = 2 ** MAX_QUBITS
+# longest accepted raw state text: a generous 48 characters per amplitude
+MAX_STATE_TEXT = 48 * MAX_AMPLITUDES
+
+# Cost model (CPU-seconds / bytes) for one launched process.
+INTERPRETER_COST = {"cpu_seconds": 0.3, "memory_bytes": 80 * 1024 ** 2}
+PLANET_RENDER_COST = {"cpu_seconds": 2.0, "memory_bytes": 300 * 1024 ** 2}
+INTERACTIVE_COST = {"cpu_seconds": 0.5, "memory_bytes": 100 * 1024 ** 2}
+# dense 2^n x 2^n QFT matrix, measured end to end for 10-13 qubits: 0.27-0.40 us
+# of CPU (building the matrix dominates) and ~33 bytes of peak RSS per entry;
+# the estimate takes the slow end, e.g. 12 qubits -> ~7 CPU-s
+QFT_SECONDS_PER_ENTRY = 4e-7
+QFT_BYTES_PER_ENTRY = 40
+# Pauli-string matrix built by a kron chain: ~2 ns and ~24 bytes per entry
+PAULI_SECONDS_PER_ENTRY = 2e-9
+PAULI_BYTES_PER_ENTRY = 24
+# parsing/normalizing a state keeps a few complex copies of it
+STATE_BYTES_PER_AMPLITUDE = 64
+
+
+class ValidationError(ValueError):
+    """The launch request is invalid; `errors` maps field -> message."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{k}: {v}" for k, v in errors.items()))
+        self.errors = errors
+
+
+class Str:
+    def __init__(self, max_len=100, pattern=None, default=""):
+        self.max_len = max_len
+        self.pattern = re.compile(pattern) if pattern else None
+        self.default = default
+
+    def parse(self, value, static_dir):
+        if value is None:
+            return self.default
+        if not isinstance(value, (str, int, float)):
+            raise ValueError("must be a string")
+        text = str(value).strip()
+        if len(text) > self.max_len:
+            raise ValueError(f"longer than {self.max_len} characters")
+        if self.pattern is not None and not self.pattern.fullmatch(text):
+            raise ValueError("has an invalid format")
+        return text or self.default
+
+
+class Choice:
+    def __init__(self, options, default):
+        self.options = list(options)
+        self.default = default
+
+    def parse(self, value, static_dir):
+        if value is None or value == "":
+            return self.default
+        if value not in self.options:
+            raise ValueError(f"must be one of {', '.join(self.options)}")
+        return value
+
+
+class Int:
+    def __init__(self, min, max, default=None):
+        self.min = min
+        self.max = max
+        self.default = default
+
+    def parse(self, value, static_dir):
+        if value is None or value == "":
+            return self.default
+        try:
+            number = int(str(value).strip())
+        except ValueError:
+            raise ValueError("must be an integer")
+        if not self.min <= number <= self.max:
+            raise ValueError(f"must be between {self.min} and {self.max}")
+        return number
+
+
+class Float(Int):
+    def parse(self, value, static_dir):
+        if value is None or value == "":
+            return self.default
+        try:
+            number = float(str(value).strip())
+        except ValueError:
+            raise ValueError("must be a number")
+        if not math.isfinite(number) or not self.min <= number <= self.max:
+            raise ValueError(f"must be between {self.min:g} and {self.max:g}")
+        return number
+
+
+class OutputPath:
+    """A file name in static/generated/; returns 'static/generated/<name>'.
+
+    A leading 'static/' or 'static/generated/' is accepted and dropped, but
+    the rest must be a plain file name (no directories).
+    """
+
+    def __init__(self, extensions):
+        self.extensions = tuple(extensions)
+
+    def parse(self, value, static_dir):
+        text = Str(max_len=200).parse(value, static_dir).replace("\\", "/")
+        if not text:
+            return None
+        for prefix in ("static/", GENERATED_DIR + "/"):
+            if text.startswith(prefix):
+                text = text[len(prefix):]
+        if "/" in text or text.startswith("."):
+            raise ValueError(f"must be a file name (outputs are saved to static/{GENERATED_DIR}/)")
+        if os.path.splitext(text)[1].lower() not in self.extensions:
+            raise ValueError(f"must end in {', '.join(self.extensions)}")
+        return f"static/{GENERATED_DIR}/{text}"
+
+
+COMMON_FIELDS = {
+    "name": Str(max_len=100),
+    # only passed to the games as context
+    "age": Str(max_len=20),
+    "country": Str(max_len=60),
+}
+
+SCHEMAS = {
+    "tictactoe": {},
+    "snake": {},
+    "basic_calculator": {},
+    "scientific_calculator": {},
+    "qiskit_math": {
+        "q_op": Choice(QISKIT_OPS, "fidelity"),
+        "q_state1_type": Choice(["predefined", "raw"], "predefined"),
+        "q_state1_pre": Choice(list(PREDEFINED_STATES), "0"),
+        "q_state1_raw_val": Str(max_len=MAX_STATE_TEXT),
+        "q_state2_type": Choice(["predefined", "raw"], "predefined"),
+        "q_state2_pre": Choice(list(PREDEFINED_STATES), "0"),
+        "q_state2_raw_val": Str(max_len=MAX_STATE_TEXT),
+        "q_pauli": Str(max_len=MAX_QUBITS, pattern=r"[IXYZixyz]*", default="Z"),
+        "q_nqubits": Int(1, MAX_QUBITS),
+        "q_state_raw_for_qft": Str(max_len=MAX_STATE_TEXT),
+        "q_outfile": OutputPath([".json"]),
+    },
+    "planet3d": {
+        "planet_type": Choice(PLANETS, "earth"),
+        "planet_rotation": Float(0.0, 360.0, 0.0),
+        "planet_save": Choice(["on", "off"], "off"),
+        "planet_outfile": OutputPath([".png", ".jpg", ".jpeg", ".svg", ".pdf"]),
+    },
+}
+
+
+def parse_amplitudes(text):
+    """Normalize a raw state ('a,b,...' of Python complex literals); returns (text, count)."""
+    parts = [p.strip() for p in text.split(",") if p.strip()]
+    if not parts:
+        raise ValueError("no amplitudes given")
+    if len(parts) > MAX_AMPLITUDES:
+        raise ValueError(f"more than {MAX_AMPLITUDES} amplitudes")
+    nonzero = False
+    for p in parts:
+        try:
+            c = complex(p)
+        except ValueError:
+            raise ValueError(f"invalid amplitude {p[:20]!r}")
+        if not (math.isfinite(c.real) and math.isfinite(c.imag)):
+            raise ValueError("amplitudes must be finite")
+        nonzero = nonzero or c != 0
+    if not nonzero:
+        raise ValueError("zero vector is not a valid state")
+    return ",".join(parts), len(parts)
+
+
+def _qubits(count):
+    """Qubits for `count` amplitudes, or None if it is not a power of two."""
+    n = count.bit_length() - 1
+    return n if count == 1 << n else None
+
+
+def _check_qiskit(fields, errors):
+    op = fields["q_op"]
+    fields["q_pauli"] = fields["q_pauli"].upper()
+    info = {}
+
+    def state(prefix):
+        if fields[f"{prefix}_type"] == "predefined":
+            return fields[f"{prefix}_pre"], 2
+        raw = fields[f"{prefix}_raw_val"]
+        if not raw:
+            raise ValueError("raw amplitudes are required")
+        return parse_amplitudes(raw)
+
+    try:
+        if op in ("fidelity", "inner"):
+            info["state1"], n1 = state("q_state1")
+            try:
+                info["state2"], n2 = state("q_state2")
+            except ValueError as exc:
+                errors["q_state2_raw_val"] = str(exc)
+                return info
+            if n1 != n2:
+                errors["q_state2"] = f"has {n2} amplitudes but state 1 has {n1}"
+            info["dim"] = n1
+        elif op in ("bloch", "expectation"):
+            info["state"], dim = state("q_state1")
+            n = _qubits(dim)
+            if op == "bloch" and dim != 2:
+                errors["q_state1"] = "bloch needs a single-qubit state (2 amplitudes)"
+            if op == "expectation":
+                if n is None:
+                    errors["q_state1"] = f"{dim} amplitudes is not a power of two"
+                elif len(fields["q_pauli"]) != n:
+                    errors["q_pauli"] = f"needs {n} characters for a {n}-qubit state"
+                if not fields["q_pauli"]:
+                    errors["q_pauli"] = "is required"
+            info["dim"] = dim
+        elif op == "qft":
+            n = fields["q_nqubits"]
+            if fields["q_state_raw_for_qft"]:
+                info["state"], dim = parse_amplitudes(fields["q_state_raw_for_qft"])
+                if _qubits(dim) is None:
+                    errors["q_state_raw_for_qft"] = f"{dim} amplitudes is not a power of two"
+                elif n is not None and dim != 2 ** n:
+                    errors["q_state_raw_for_qft"] = f"{dim} amplitudes do not match {n} qubits"
+                n = _qubits(dim)
+            if n is None and "q_state_raw_for_qft" not in errors:
+                errors["q_nqubits"] = "is required without a state"
+            info["dim"] = 2 ** (n or 0)
+    except ValueError as exc:
+        errors.setdefault("q_state1_raw_val" if op != "qft" else "q_state_raw_for_qft", str(exc))
+    return info
+
+
+def _check_planet(fields, errors):
+    return {"render": fields["planet_save"] == "on"}
+
+
+CROSS_CHECKS = {"qiskit_math": _check_qiskit, "planet3d": _check_planet}
+
+
+def estimate_cost(game, fields, info):
+    """{"cpu_seconds", "memory_bytes"} one launch is expected to use."""
+    cpu = INTERPRETER_COST["cpu_seconds"]
+    mem = INTERPRETER_COST["memory_bytes"]
+    if game == "qiskit_math":
+        dim = info.get("dim", 2)
+        entries = dim * dim
+        op = fields["q_op"]
+        if op == "qft":
+            cpu += entries * QFT_SECONDS_PER_ENTRY
+            mem += entries * QFT_BYTES_PER_ENTRY
+        elif op == "expectation":
+            cpu += entries * PAULI_SECONDS_PER_ENTRY
+            mem += entries * PAULI_BYTES_PER_ENTRY
+        mem += dim * STATE_BYTES_PER_AMPLITUDE * 2
+    elif game == "planet3d":
+        cpu += PLANET_RENDER_COST["cpu_seconds"]
+        mem += PLANET_RENDER_COST["memory_bytes"]
+    else:
+        cpu += INTERACTIVE_COST["cpu_seconds"]
+        mem += INTERACTIVE_COST["memory_bytes"]
+    return {"cpu_seconds": round(cpu, 3), "memory_bytes": int(mem)}
+
+
+def parse_launch(data, static_dir):
+    """Validate and normalize a /launch body; raises ValidationError."""
+    if not isinstance(data, dict):
+        raise ValidationError({"body": "must be a JSON object"})
+    game = data.get("game", "tictactoe")
+    if game not in SCHEMAS:
+        raise ValidationError({"game": "unsupported game"})
+
+    fields = {}
+    errors = {}
+    for name, spec in list(COMMON_FIELDS.items()) + list(SCHEMAS[game].items()):
+        try:
+            fields[name] = spec.parse(data.get(name), static_dir)
+        except ValueError as exc:
+            errors[name] = str(exc)
+    if errors:
+        raise ValidationError(errors)
+
+    check = CROSS_CHECKS.get(game)
+    info = check(fields, errors) if check else {}
+    if errors:
+        raise ValidationError(errors)
+    return {"game": game, "fields": fields, "info": info, "cost": estimate_cost(game, fields, info)}
@@ -0,0 +1,117 @@
+"""memo.py — request coalescing and result memoization for launch jobs.
+
+Provided:
+- canonical_key(*parts): stable SHA-256 of JSON-serialisable parts, so that
+  equal requests hash equally regardless of dict ordering
+- SingleFlight: maps a key to the one in-flight job computing it. Identical
+  requests that arrive while it runs join that job instead of starting another
+- MemoCache: thread-safe LRU cache with a TTL, bounded by entry count and by
+  the total encoded size of the stored values
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(*parts):
+    """Hex SHA-256 of `parts` encoded as canonical JSON (sorted keys, no spaces)."""
+    text = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def value_size(value):
+    """Bytes a value is accounted as: the length of its JSON encoding."""
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+class SingleFlight:
+    """Track the in-flight job for each key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def join(self, key, start):
+        """Return (job_id, started). Calls `start()` only if no job runs for `key`.
+
+        `start()` runs under the lock, so two identical requests cannot both
+        start a job; it should only enqueue work, never wait for it.
+        """
+        with self._lock:
+            job_id = self._inflight.get(key)
+            if job_id is not None:
+                return job_id, False
+            job_id = self._inflight[key] = start()
+            return job_id, True
+
+    def finish(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._inflight)
+
+
+class MemoCache:
+    """LRU + TTL cache bounded by `max_entries` and `max_bytes` of stored values.
+
+    A value bigger than `max_bytes` on its own is not stored.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=8 * 1024 * 1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = value_size(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+        return True
+
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _drop(self, key):
+        # caller holds the lock
+        _value, size, _expires = self._entries.pop(key)
+        self.bytes -= size
@@ -0,0 +1,210 @@
+"""metrics.py — low-overhead counters/histograms rendered in Prometheus text format.
+
+Metric types:
+- Counter(name, help, labelnames)
+- Histogram(name, help, labelnames, buckets)
+- Gauge(name, help, fn): value(s) computed at scrape time from a callback
+
+Counters and histograms keep one shard per thread. The hot path only touches
+its own thread's dicts, so it takes no lock. A scrape sums the shards. Reads
+may be a moment behind concurrent writers, which is fine for monitoring.
+Shards of threads that have exited are folded into a base shard (when a new
+thread registers or at scrape time), so a thread-per-request server keeps
+one shard per live thread, not one per request ever served.
+"""
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Base for metrics whose state lives in per-thread shards."""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        # totals of threads that have exited
+        self._base = {}
+        # [(thread, shard)] of threads that may still be writing
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            # only taken once per thread, never on the hot path afterwards
+            with self._shards_lock:
+                self._fold_dead()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_dead(self):
+        # caller holds _shards_lock; a dead thread's shard no longer changes
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._merge(self._base, shard)
+        self._shards = live
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _all_shards(self):
+        with self._shards_lock:
+            self._fold_dead()
+            return [self._base] + [shard for _, shard in self._shards]
+
+    def _merge(self, into, shard):
+        raise NotImplementedError
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def _merge(self, into, shard):
+        for key, value in list(shard.items()):
+            into[key] = into.get(key, 0) + value
+
+    def collect(self):
+        totals = {}
+        for shard in self._all_shards():
+            self._merge(totals, shard)
+        for key in sorted(totals):
+            yield f"{self.name}_total{_labels_text(self.labelnames, key)} {_fmt(totals[key])}"
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [per-bucket counts (+Inf last), sum]
+            state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def time(self, **labels):
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+    def _merge(self, into, shard):
+        for key, (counts, total) in list(shard.items()):
+            acc = into.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            for i, c in enumerate(counts):
+                acc[0][i] += c
+            acc[1] += total
+
+    def collect(self):
+        merged = {}
+        for shard in self._all_shards():
+            self._merge(merged, shard)
+        for key in sorted(merged):
+            counts, total = merged[key]
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                yield f"{self.name}_bucket{_labels_text(self.labelnames, key, ('le', _fmt(bound)))} {running}"
+            yield f"{self.name}_sum{_labels_text(self.labelnames, key)} {_fmt(total)}"
+            yield f"{self.name}_count{_labels_text(self.labelnames, key)} {running}"
+
+
+class _Timer:
+    def __init__(self, hist, labels):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self._start, **self.labels)
+        return False
+
+
+class Gauge:
+    """Scrape-time gauge; `fn()` returns a number or a {label_value: number} dict."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, fn, labelname=None):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.labelname = labelname
+
+    def collect(self):
+        value = self.fn()
+        if isinstance(value, dict):
+            for label in sorted(value, key=str):
+                yield f"{self.name}{_labels_text((self.labelname,), (label,))} {_fmt(value[label])}"
+        else:
+            yield f"{self.name} {_fmt(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, fn, labelname=None):
+        return self.register(Gauge(name, help_text, fn, labelname))
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                lines.extend(metric.collect())
+            except Exception:
+                # a broken gauge callback must not take the whole scrape down
+                continue
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,117 @@
+"""output_watch.py — wait for a launched job's output file to be complete.
+
+wait_for_output(path, timeout, proc=None) returns as soon as `path` has been
+fully written. On Linux it uses an inotify watch on the parent directory
+(through ctypes, no extra dependency) and wakes on IN_MOVED_TO (the child
+wrote a temp file and atomically renamed it into place) or IN_CLOSE_WRITE (the
+child wrote the file directly and closed it). Elsewhere, or if inotify is
+unavailable, it falls back to polling for the file.
+
+The job scripts (planet3d.py, qiskitquantum.py) write to a temp name and
+os.replace() it, so a partially written file is never visible at `path`.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+READY = "ready"
+EXITED = "exited"
+TIMEOUT = "timeout"
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_EVENT_HEADER = struct.Struct("iIII")
+# how often to check whether the child died while we wait for its file
+PROC_CHECK_INTERVAL = 0.25
+POLL_INTERVAL = 0.1
+
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.inotify_init1  # missing on very old C libraries
+    except (OSError, AttributeError):
+        _libc = None
+
+
+def _inotify_watch(directory):
+    """Return an inotify fd watching `directory`, or None if unavailable."""
+    if _libc is None:
+        return None
+    fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    wd = _libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+    if wd < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _names_in(buf):
+    """Yield the file names in a buffer of raw inotify events."""
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(buf):
+        _wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+        offset += _EVENT_HEADER.size
+        yield buf[offset:offset + length].rstrip(b"\0")
+        offset += length
+
+
+def _process_exited(proc):
+    return proc is not None and proc.poll() is not None
+
+
+def file_signature(path):
+    """(inode, mtime_ns, size) of `path`, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def wait_for_output(path, timeout, proc=None, baseline=None):
+    """Block until `path` is complete, `proc` exits, or `timeout` passes.
+
+    `baseline` is file_signature(path) taken before the child was started;
+    a file still matching it is a leftover from an earlier run and does not
+    count. Returns READY, EXITED or TIMEOUT. If the process exits right after
+    producing the file, READY wins.
+    """
+    def produced():
+        sig = file_signature(path)
+        return sig is not None and sig != baseline
+
+    directory = os.path.dirname(os.path.abspath(path))
+    name = os.fsencode(os.path.basename(path))
+    deadline = time.monotonic() + timeout
+    fd = _inotify_watch(directory) if os.path.isdir(directory) else None
+    try:
+        # the file may already be there, or have landed before the watch existed
+        while not produced():
+            if _process_exited(proc):
+                return READY if produced() else EXITED
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return TIMEOUT
+            if fd is None:
+                time.sleep(min(POLL_INTERVAL, remaining))
+                continue
+            wait = min(remaining, PROC_CHECK_INTERVAL) if proc is not None else remaining
+            readable, _, _ = select.select([fd], [], [], wait)
+            if readable:
+                try:
+                    buf = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if name in _names_in(buf):
+                    return READY
+        return READY
+    finally:
+        if fd is not None:
+            os.close(fd)
@@ -3,7 +3,59 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.colors import LightSource
 
-def create_planet_3d(planet_type='earth', rotation=0, save_fig=False):
+from planet_textures import load_texture, sample_texture
+
+# Render presets: (dpi, pixels per mesh cell). Lower quality means a coarser
+# sphere grid and a smaller dpi for the same output size.
+QUALITY_PRESETS = {
+    'low': (72, 8),
+    'medium': (100, 4),
+    'high': (150, 2),
+}
+# Outputs smaller than this (shortest side, px) are rendered as bare thumbnails
+# without axes, title or colorbar.
+THUMBNAIL_MAX_PX = 400
+# --thumbnails writes here (git-ignored), never over the tracked static/planet_<name>.png
+# sources that the asset pipeline resizes from
+THUMBNAIL_DIR = 'static/generated'
+
+
+def parse_size(text):
+    """Parse a 'WxH' string (e.g. '140x100') into an (int, int) tuple."""
+    try:
+        w, h = (int(p) for p in str(text).lower().split('x'))
+    except ValueError:
+        raise ValueError(f"invalid size {text!r}, expected WxH (e.g. 64x64)")
+    if w <= 0 or h <= 0:
+        raise ValueError(f"invalid size {text!r}, width and height must be positive")
+    return w, h
+
+
+def render_settings(size=None, quality='medium'):
+    """Choose figure size, dpi and sphere resolution for a target output size.
+
+    With no `size` the historical defaults are kept (10x10 in at 150 dpi with a
+    100x100 sphere grid). With `size` as (width, height) pixels the figure is
+    laid out to produce exactly that many pixels and the mesh is only as fine
+    as the sphere's on-screen diameter needs.
+    """
+    if size is None:
+        return {'figsize': (10, 10), 'dpi': 150, 'resolution': 100, 'thumbnail': False}
+    if quality not in QUALITY_PRESETS:
+        raise ValueError(f"unknown quality {quality!r}, expected one of {sorted(QUALITY_PRESETS)}")
+    w, h = size
+    dpi, px_per_cell = QUALITY_PRESETS[quality]
+    resolution = int(min(100, max(12, min(w, h) // px_per_cell)))
+    return {
+        'figsize': (w / dpi, h / dpi),
+        'dpi': dpi,
+        'resolution': resolution,
+        'thumbnail': min(w, h) < THUMBNAIL_MAX_PX,
+    }
+
+
+def create_planet_3d(planet_type='earth', rotation=0, save_fig=False, size=None, quality='medium',
+                     textured=True):
     """
     Create a 3D visualization of a planet.
     
@@ -15,15 +67,25 @@ def create_planet_3d(planet_type='earth', rotation=0, save_fig=False):
         Rotation angle in degrees for the planet
     save_fig : bool
         Whether to save the figure
+    size : tuple or None
+        Target output size in pixels (width, height); None keeps the
+        full-size 10x10 inch figure
+    quality : str
+        'low', 'medium' or 'high'; trades mesh density and dpi for speed
+    textured : bool
+        Colour the surface from the planet's procedural albedo/height maps
+        (see planet_textures); False uses the flat colormap over z
     """
+    settings = render_settings(size, quality)
     
     # Create figure and 3D axis
-    fig = plt.figure(figsize=(10, 10))
+    fig = plt.figure(figsize=settings['figsize'], dpi=settings['dpi'])
     ax = fig.add_subplot(111, projection='3d')
     
     # Create sphere
-    u = np.linspace(0, 2 * np.pi, 100)
-    v = np.linspace(0, np.pi, 100)
+    n = settings['resolution']
+    u = np.linspace(0, 2 * np.pi, n)
+    v = np.linspace(0, np.pi, n)
     x = np.outer(np.cos(u), np.sin(v))
     y = np.outer(np.sin(u), np.sin(v))
     z = np.outer(np.ones(np.size(u)), np.cos(v))
@@ -48,42 +110,80 @@ def create_planet_3d(planet_type='earth', rotation=0, save_fig=False):
         x = x_rot
         z = z_rot
     
-    # Plot surface with coloring
-    surf = ax.plot_surface(x, y, z, cmap=colormap, 
-                          linewidth=0, antialiased=True, 
-                          rstride=2, cstride=2, alpha=0.9)
+    # Plot surface with coloring (only needed to drive the colorbar, so
+    # thumbnails skip it and draw the lit surface alone)
+    if not settings['thumbnail']:
+        surf = ax.plot_surface(x, y, z, cmap=colormap, 
+                              linewidth=0, antialiased=True, 
+                              rstride=2, cstride=2, alpha=0.9)
     
     # Add lighting effect with LightSource
     ls = LightSource(azdeg=45, altdeg=45)
-    rgb = ls.shade(z, cmap=colormap)
-    ax.plot_surface(x, y, z, facecolors=rgb, shade=False)
-    
-    # Set labels and title
-    ax.set_xlabel('X')
-    ax.set_ylabel('Y')
-    ax.set_zlabel('Z')
-    ax.set_title(f'3D {planet_type.capitalize()} Planet', fontsize=16, fontweight='bold')
+    if textured:
+        # Texture lookup uses the unrotated (u, v) so the surface turns with the sphere
+        albedo, heightmap = load_texture(planet_type)
+        base_rgb = sample_texture(albedo, u[:, None], v[None, :]) / 255.0
+        relief = sample_texture(heightmap, u[:, None], v[None, :]).astype(float)
+        rgb = ls.shade_rgb(base_rgb, elevation=z + 0.1 * relief, blend_mode='soft')
+    else:
+        rgb = ls.shade(z, cmap=colormap)
+    ax.plot_surface(x, y, z, facecolors=rgb, shade=False, rcount=n, ccount=n)
     
     # Set equal aspect ratio
-    ax.set_box_aspect([1, 1, 1])
     max_range = 1
     ax.set_xlim([-max_range, max_range])
     ax.set_ylim([-max_range, max_range])
     ax.set_zlim([-max_range, max_range])
     
-    # Add colorbar
-    fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label='Height')
+    if settings['thumbnail']:
+        # Bare planet filling the whole canvas
+        ax.set_position([0, 0, 1, 1])
+        ax.set_axis_off()
+        ax.set_box_aspect([1, 1, 1], zoom=1.4)
+    else:
+        # Set labels and title
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.set_zlabel('Z')
+        ax.set_title(f'3D {planet_type.capitalize()} Planet', fontsize=16, fontweight='bold')
+        ax.set_box_aspect([1, 1, 1])
+    
+        # Add colorbar
+        fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label='Height')
     
     # Set viewing angle
     ax.view_init(elev=20, azim=45)
     
     if save_fig:
-        plt.savefig(f'{planet_type}_3d.png', dpi=150, bbox_inches='tight')
+        save_planet_figure(fig, f'{planet_type}_3d.png', size=size)
         print(f"Saved {planet_type}_3d.png")
     
     return fig, ax
 
 
+def save_planet_figure(fig, outp, size=None):
+    """Save a figure from create_planet_3d, creating parent directories.
+
+    Figures rendered for an explicit `size` are written at exactly that many
+    pixels; full-size figures keep the tight 150 dpi export. The file appears
+    at `outp` atomically.
+    """
+    import os
+
+    d = os.path.dirname(outp)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    # write under a temp name and rename, so a watcher never sees a half-written file
+    fmt = os.path.splitext(outp)[1].lstrip('.').lower() or 'png'
+    tmp = f"{outp}.{os.getpid()}.tmp"
+    if size is None:
+        fig.savefig(tmp, format=fmt, dpi=150, bbox_inches='tight')
+    else:
+        fig.savefig(tmp, format=fmt, dpi=fig.dpi)
+    os.replace(tmp, outp)
+    return outp
+
+
 def create_multiple_planets():
     """Create a figure showing multiple planets"""
     fig = plt.figure(figsize=(16, 12))
@@ -126,10 +226,123 @@ def create_multiple_planets():
     
     fig.suptitle('3D Planet Visualization', fontsize=16, fontweight='bold')
     plt.tight_layout()
-    
+
     return fig
 
 
+def _init_render_worker():
+    """Pool initializer: force the non-interactive Agg backend in each worker."""
+    plt.switch_backend('Agg')
+
+
+def render_job(job):
+    """Render a single planet job to disk and return a small result dict.
+
+    A job is a dict with 'planet', 'rotation' and 'out_file' keys, plus
+    optional 'size' ('WxH' or [w, h]), 'quality' and 'textured'. Errors are
+    reported in the result (key 'error') instead of raised, so one bad job
+    does not abort a whole batch.
+    """
+    import os
+    import time
+
+    result = {'planet': None, 'rotation': None, 'out_file': None}
+    start = time.perf_counter()
+    try:
+        if not isinstance(job, dict):
+            raise ValueError(f'job must be an object, got {type(job).__name__}')
+        planet = job.get('planet', 'earth')
+        outp = job.get('out_file') or os.path.join('static', f"{planet}_{job.get('rotation', 0)}_3d.png")
+        result.update(planet=planet, rotation=job.get('rotation', 0), out_file=outp)
+        rotation = float(job.get('rotation', 0) or 0)
+        result['rotation'] = rotation
+        size = job.get('size')
+        if isinstance(size, str):
+            size = parse_size(size)
+        elif size is not None:
+            size = tuple(size)
+        fig, ax = create_planet_3d(planet_type=planet, rotation=rotation, save_fig=False,
+                                   size=size, quality=job.get('quality', 'medium'),
+                                   textured=job.get('textured', True))
+        save_planet_figure(fig, outp, size=size)
+        plt.close(fig)
+    except Exception as exc:
+        result['error'] = str(exc)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def render_many(jobs, workers=None):
+    """Render independent planet jobs across a process pool.
+
+    Yields each job's result dict as soon as it finishes (completion order,
+    not submission order); 'index' is the job's position in `jobs`.
+    `workers` defaults to the number of CPUs.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    jobs = list(jobs)
+    if not jobs:
+        return
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+        futures = {pool.submit(render_job, job): idx for idx, job in enumerate(jobs)}
+        for fut in as_completed(futures):
+            res = fut.result()
+            res['index'] = futures[fut]
+            yield res
+
+
+def composite_grid(paths, out_file, cols=None, cell_size=None, background=(255, 255, 255)):
+    """Paste rendered images into a single grid image using Pillow.
+
+    Images are placed row-major in the order given. `cell_size` (w, h)
+    defaults to the size of the first image; other images are resized to it.
+    """
+    import math
+    import os
+    from PIL import Image
+
+    paths = list(paths)
+    if not paths:
+        raise ValueError('composite_grid needs at least one image')
+    cols = cols or math.ceil(math.sqrt(len(paths)))
+    rows = math.ceil(len(paths) / cols)
+
+    grid = None
+    for idx, path in enumerate(paths):
+        with Image.open(path) as img:
+            img = img.convert('RGB')
+            if cell_size is None:
+                cell_size = img.size
+            if img.size != tuple(cell_size):
+                img = img.resize(cell_size, Image.LANCZOS)
+            if grid is None:
+                grid = Image.new('RGB', (cols * cell_size[0], rows * cell_size[1]), background)
+            r, c = divmod(idx, cols)
+            grid.paste(img, (c * cell_size[0], r * cell_size[1]))
+
+    d = os.path.dirname(out_file)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    grid.save(out_file)
+    return out_file
+
+
+def load_jobs_file(path):
+    """Read a jobs file: a JSON list of jobs, or an object with a 'jobs' list."""
+    import json
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('jobs', [])
+    if not isinstance(data, list):
+        raise ValueError('jobs file must contain a list of jobs')
+    return data
+
+
 if __name__ == '__main__':
     import argparse
     import os
@@ -141,6 +354,14 @@ if __name__ == '__main__':
     parser.add_argument('--out-file', help='path to save the generated image (e.g. static/myplanet.png)')
     parser.add_argument('--multiple', action='store_true', help='create multiple-planets grid')
     parser.add_argument('--show', action='store_true', help='display the figure interactively')
+    parser.add_argument('--jobs', help='JSON file with a list of render jobs to run in parallel')
+    parser.add_argument('--workers', type=int, help='worker processes for --jobs (default: CPU count)')
+    parser.add_argument('--grid-out', help='with --jobs: also composite all results into this grid image')
+    parser.add_argument('--grid-cols', type=int, help='with --grid-out: number of grid columns')
+    parser.add_argument('--size', type=parse_size, help='output size in pixels as WxH (e.g. 64x64); renders a bare thumbnail below 400 px')
+    parser.add_argument('--quality', choices=sorted(QUALITY_PRESETS), default='medium', help='mesh density / dpi preset used with --size')
+    parser.add_argument('--flat', action='store_true', help='use the plain colormap instead of the procedural surface texture')
+    parser.add_argument('--thumbnails', action='store_true', help=f'render {THUMBNAIL_DIR}/planet_<name>.png for every planet at --size (default 140x100)')
     parser.add_argument('name', nargs='?', help='optional context name')
     parser.add_argument('age', nargs='?', help='optional context age')
     parser.add_argument('country', nargs='?', help='optional context country')
@@ -156,22 +377,37 @@ if __name__ == '__main__':
             plt.show()
         except Exception:
             # running headless or non-interactive backend — fall back to saving a file
-            outp = os.path.join('static', f"{args.planet}_3d.png")
-            os.makedirs(os.path.dirname(outp), exist_ok=True)
-            fig.savefig(outp, dpi=150, bbox_inches='tight')
-            print(outp)
+            print(save_planet_figure(fig, os.path.join('static', f"{args.planet}_3d.png")))
         sys.exit(0)
 
+    # Batch mode: fan jobs out across a process pool, stream results as JSON lines
+    if args.jobs or args.thumbnails:
+        import json
+
+        if args.jobs:
+            jobs = load_jobs_file(args.jobs)
+        else:
+            thumb_size = list(args.size or (140, 100))
+            jobs = [{'planet': p, 'rotation': args.rotation, 'size': thumb_size, 'quality': args.quality,
+                     'textured': not args.flat, 'out_file': os.path.join(THUMBNAIL_DIR, f'planet_{p}.png')}
+                    for p in ['earth', 'mars', 'jupiter', 'venus', 'moon']]
+        done = {}
+        for res in render_many(jobs, workers=args.workers):
+            done[res['index']] = res
+            print(json.dumps(res), flush=True)
+        failed = sum(1 for res in done.values() if 'error' in res)
+        if args.grid_out:
+            # composite in job order, skipping jobs that failed
+            paths = [done[i]['out_file'] for i in sorted(done) if 'error' not in done[i]]
+            if paths:
+                print(composite_grid(paths, args.grid_out, cols=args.grid_cols))
+        sys.exit(1 if failed else 0)
+
     # Multiple-planet mode
     if args.multiple:
         fig = create_multiple_planets()
         if args.out_file:
-            outp = args.out_file
-            d = os.path.dirname(outp)
-            if d:
-                os.makedirs(d, exist_ok=True)
-            fig.savefig(outp, dpi=150, bbox_inches='tight')
-            print(outp)
+            print(save_planet_figure(fig, args.out_file))
             sys.exit(0)
         if args.show:
             plt.show()
@@ -180,14 +416,10 @@ if __name__ == '__main__':
         sys.exit(0)
 
     # Single-planet mode
-    fig, ax = create_planet_3d(planet_type=args.planet, rotation=args.rotation, save_fig=False)
+    fig, ax = create_planet_3d(planet_type=args.planet, rotation=args.rotation, save_fig=False,
+                               size=args.size, quality=args.quality, textured=not args.flat)
     if args.out_file:
-        outp = args.out_file
-        d = os.path.dirname(outp)
-        if d:
-            os.makedirs(d, exist_ok=True)
-        fig.savefig(outp, dpi=150, bbox_inches='tight')
-        print(outp)
+        print(save_planet_figure(fig, args.out_file, size=args.size))
         sys.exit(0)
 
     if args.show:
@@ -0,0 +1,259 @@
+"""planet_textures.py — procedural planet surfaces built from vectorized noise.
+
+Functions provided:
+- value_noise(width, height, freq, rng)
+- fractal_noise(width, height, seed, octaves=5)
+- generate_texture(planet, width, height)
+- load_texture(planet, width, height) (disk-cached)
+- sample_texture(texture, u, v)
+
+Textures are equirectangular: columns span longitude 0..2*pi and rows span
+colatitude 0..pi, so the renderer can look them up with the same (u, v)
+parameters it uses to build the sphere. Albedo is stored as uint8 RGB and the
+height map as float16 in [0, 1], which keeps a 512x256 texture under 1 MB on
+disk before compression.
+"""
+import os
+import numpy as np
+
+TEXTURE_VERSION = 1
+DEFAULT_TEXTURE_SIZE = (512, 256)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.texture_cache')
+
+# Per-planet generation settings. 'palette' is a list of (height, (r, g, b))
+# stops the height map is mapped through.
+PLANET_TEXTURES = {
+    'earth': {
+        'seed': 3,
+        'octaves': 6,
+        'base_freq': 4,
+        'palette': [(0.0, (10, 30, 90)), (0.52, (30, 90, 170)), (0.55, (200, 190, 140)),
+                    (0.62, (60, 130, 50)), (0.78, (100, 90, 60)), (0.9, (240, 240, 240))],
+        'ice_caps': 0.12,
+    },
+    'mars': {
+        'seed': 4,
+        'octaves': 6,
+        'base_freq': 3,
+        'palette': [(0.0, (90, 40, 20)), (0.4, (160, 70, 35)), (0.7, (200, 110, 60)),
+                    (1.0, (230, 170, 120))],
+        'ice_caps': 0.05,
+    },
+    'jupiter': {
+        'seed': 5,
+        'octaves': 4,
+        'base_freq': 6,
+        'palette': [(0.0, (120, 80, 50)), (0.35, (190, 140, 100)), (0.6, (235, 215, 180)),
+                    (0.8, (210, 170, 120)), (1.0, (250, 240, 225))],
+        'bands': 14,
+    },
+    'venus': {
+        'seed': 6,
+        'octaves': 5,
+        'base_freq': 2,
+        'palette': [(0.0, (170, 120, 50)), (0.5, (220, 180, 100)), (1.0, (250, 230, 170))],
+    },
+    'moon': {
+        'seed': 7,
+        'octaves': 6,
+        'base_freq': 5,
+        'palette': [(0.0, (60, 60, 60)), (0.5, (140, 140, 140)), (1.0, (215, 215, 210))],
+        'craters': 60,
+    },
+}
+
+
+def _smoothstep(t):
+    return t * t * (3.0 - 2.0 * t)
+
+
+def value_noise(width, height, freq, rng):
+    """Return a (height, width) value-noise field in [0, 1].
+
+    Random values sit on a lattice of `freq` cells around the equator (half as
+    many pole to pole) and are blended with a smoothstep. The field wraps in
+    longitude so the texture has no seam at u = 0 / 2*pi.
+    """
+    gx = max(1, int(freq))
+    gy = max(1, gx // 2)
+    lattice = rng.random((gy + 1, gx))
+
+    xs = np.arange(width) * (gx / width)
+    x0 = np.floor(xs).astype(np.intp)
+    sx = _smoothstep(xs - x0)
+    x0 %= gx
+    x1 = (x0 + 1) % gx
+
+    ys = np.linspace(0.0, gy, height)
+    y0 = np.minimum(np.floor(ys).astype(np.intp), gy - 1)
+    sy = _smoothstep(ys - y0)[:, None]
+    y1 = y0 + 1
+
+    top = lattice[y0][:, x0] * (1 - sx) + lattice[y0][:, x1] * sx
+    bottom = lattice[y1][:, x0] * (1 - sx) + lattice[y1][:, x1] * sx
+    return top * (1 - sy) + bottom * sy
+
+
+def fractal_noise(width, height, seed, octaves=5, base_freq=4, persistence=0.5, lacunarity=2.0):
+    """Sum `octaves` layers of value noise (fBm) and rescale to [0, 1]."""
+    rng = np.random.default_rng(seed)
+    total = np.zeros((height, width))
+    amp = 1.0
+    freq = float(base_freq)
+    for _ in range(octaves):
+        total += amp * value_noise(width, height, freq, rng)
+        amp *= persistence
+        freq *= lacunarity
+    lo, hi = total.min(), total.max()
+    return (total - lo) / (hi - lo) if hi > lo else total * 0.0
+
+
+def _lat_lon(width, height):
+    """Latitude/longitude grids (radians) matching the equirectangular layout."""
+    lon = np.arange(width) * (2 * np.pi / width)
+    lat = np.pi / 2 - np.linspace(0.0, np.pi, height)
+    return np.meshgrid(lat, lon, indexing='ij')
+
+
+def _add_bands(heightmap, bands, seed):
+    """Blend latitude bands (warped by the noise itself) into a height map."""
+    h, w = heightmap.shape
+    lat, _ = _lat_lon(w, h)
+    warp = fractal_noise(w, h, seed + 1000, octaves=3, base_freq=8) - 0.5
+    stripes = 0.5 + 0.5 * np.sin(lat * bands + warp * 2.5)
+    return 0.7 * stripes + 0.3 * heightmap
+
+
+def _add_craters(heightmap, count, seed):
+    """Stamp `count` bowl-and-rim craters onto a height map.
+
+    Distances are great-circle angles, so craters keep their shape near the
+    poles despite the equirectangular stretch.
+    """
+    h, w = heightmap.shape
+    lat, lon = _lat_lon(w, h)
+    rng = np.random.default_rng(seed + 2000)
+    c_lat = np.arcsin(rng.uniform(-1, 1, count))
+    c_lon = rng.uniform(0, 2 * np.pi, count)
+    # mostly small craters with a few large basins
+    radius = 0.02 + 0.12 * rng.random(count) ** 3
+    out = heightmap.copy()
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    for clat, clon, r in zip(c_lat, c_lon, radius):
+        cosd = sin_lat * np.sin(clat) + cos_lat * np.cos(clat) * np.cos(lon - clon)
+        d = np.arccos(np.clip(cosd, -1, 1)) / r
+        near = d < 1.5
+        if not near.any():
+            continue
+        dd = d[near]
+        bowl = np.where(dd < 1, dd * dd - 1, 0.0) * 0.35
+        rim = np.exp(-((dd - 1) * 4) ** 2) * 0.15
+        out[near] += bowl + rim
+    lo, hi = out.min(), out.max()
+    return (out - lo) / (hi - lo) if hi > lo else out
+
+
+def _apply_palette(heightmap, stops):
+    """Map a [0, 1] height map through (height, rgb) stops to uint8 RGB."""
+    xs = [s[0] for s in stops]
+    rgb = np.empty(heightmap.shape + (3,), dtype=np.uint8)
+    for ch in range(3):
+        rgb[..., ch] = np.interp(heightmap, xs, [s[1][ch] for s in stops]).astype(np.uint8)
+    return rgb
+
+
+def generate_texture(planet, width=DEFAULT_TEXTURE_SIZE[0], height=DEFAULT_TEXTURE_SIZE[1]):
+    """Generate (albedo, heightmap) for `planet`.
+
+    albedo is a (height, width, 3) uint8 array; heightmap is a (height, width)
+    float16 array in [0, 1]. Output is deterministic for a given planet and size.
+    """
+    spec = PLANET_TEXTURES.get(planet, PLANET_TEXTURES['earth'])
+    seed = spec['seed']
+    hmap = fractal_noise(width, height, seed, octaves=spec['octaves'], base_freq=spec['base_freq'])
+    if spec.get('bands'):
+        hmap = _add_bands(hmap, spec['bands'], seed)
+    if spec.get('craters'):
+        hmap = _add_craters(hmap, spec['craters'], seed)
+
+    albedo = _apply_palette(hmap, spec['palette'])
+    caps = spec.get('ice_caps')
+    if caps:
+        rows = max(1, int(height * caps))
+        ragged = fractal_noise(width, height, seed + 3000, octaves=3, base_freq=8) * rows * 0.5
+        row_idx = np.arange(height)[:, None]
+        mask = (row_idx < rows - ragged) | (row_idx > height - 1 - rows + ragged)
+        albedo[mask] = (235, 240, 245)
+    return albedo, hmap.astype(np.float16)
+
+
+def _cache_path(planet, width, height, cache_dir):
+    seed = PLANET_TEXTURES.get(planet, PLANET_TEXTURES['earth'])['seed']
+    name = f"{planet}_{width}x{height}_s{seed}_v{TEXTURE_VERSION}.npz"
+    return os.path.join(cache_dir, name)
+
+
+def load_texture(planet, width=DEFAULT_TEXTURE_SIZE[0], height=DEFAULT_TEXTURE_SIZE[1], cache_dir=CACHE_DIR):
+    """Return (albedo, heightmap) for `planet`, generating and caching on a miss.
+
+    The cache is a compressed .npz per planet/size/seed/version; a corrupt or
+    unreadable cache file is simply regenerated.
+    """
+    path = _cache_path(planet, width, height, cache_dir)
+    try:
+        with np.load(path) as data:
+            return data['albedo'], data['height']
+    except Exception:
+        pass
+
+    albedo, hmap = generate_texture(planet, width, height)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + f'.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, albedo=albedo, height=hmap)
+        os.replace(tmp, path)
+    except OSError:
+        # a read-only checkout still renders, it just regenerates every time
+        pass
+    return albedo, hmap
+
+
+def sample_texture(texture, u, v):
+    """Nearest-neighbour lookup of an equirectangular map at (u, v).
+
+    `u` is longitude in [0, 2*pi] and `v` colatitude in [0, pi]; both may be
+    arrays (broadcast together). Works for (H, W) and (H, W, C) maps.
+    """
+    h, w = texture.shape[:2]
+    col = (np.asarray(u) * (w / (2 * np.pi))).astype(np.intp) % w
+    row = np.clip((np.asarray(v) * ((h - 1) / np.pi)).round().astype(np.intp), 0, h - 1)
+    return texture[row, col]
+
+
+__all__ = [
+    "value_noise",
+    "fractal_noise",
+    "generate_texture",
+    "load_texture",
+    "sample_texture",
+]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='planet_textures CLI - pre-generate procedural textures')
+    parser.add_argument('--planet', choices=sorted(PLANET_TEXTURES), help='planet to generate (default: all)')
+    parser.add_argument('--size', default='x'.join(map(str, DEFAULT_TEXTURE_SIZE)), help='texture size as WxH')
+    parser.add_argument('--preview', help='also save the albedo map as an image to this directory')
+    args = parser.parse_args()
+
+    tw, th = (int(p) for p in args.size.lower().split('x'))
+    for name in ([args.planet] if args.planet else sorted(PLANET_TEXTURES)):
+        albedo, hmap = load_texture(name, tw, th)
+        print(f"{name}: albedo {albedo.shape} {albedo.dtype}, height {hmap.shape} {hmap.dtype}")
+        if args.preview:
+            import matplotlib.pyplot as plt
+            os.makedirs(args.preview, exist_ok=True)
+            plt.imsave(os.path.join(args.preview, f"{name}_albedo.png"), albedo)
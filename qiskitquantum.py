@@ -113,7 +113,7 @@ def expectation_value(operator: Union[np.ndarray, str], state: StateLike) -> com
     if op.shape != (dim, dim):
         raise ValueError(f"Operator shape {op.shape} does not match state dimension {dim}")
 
-    return float(np.vdot(psi, op @ psi))
+    return float(np.real(np.vdot(psi, op @ psi)))
 
 
 def pauli_string_to_matrix(s: str) -> np.ndarray:
@@ -215,6 +215,86 @@ def _parse_state_arg(s: str) -> np.ndarray:
     return _to_numpy_state(np.array(vals, dtype=complex))
 
 
+def _write_atomic(path: str, text: str) -> None:
+    """Write `text` to a temp file beside `path`, then rename it into place.
+
+    Readers (e.g. the web app waiting for --out-file) never see a partial file.
+    """
+    import os
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# ops cheap enough for the web page to compute in the browser (static/qmath.js)
+SIMPLE_OPS = ("fidelity", "inner", "bloch", "expectation")
+
+
+def run_simple_op(cmd: str, state: str = None, state1: str = None, state2: str = None, pauli: str = None):
+    """Run one of SIMPLE_OPS on CLI-style string arguments; returns the JSON 'value'."""
+    if cmd == 'fidelity':
+        if not state1 or not state2:
+            raise ValueError('fidelity requires --state1 and --state2')
+        return float(state_fidelity(_parse_state_arg(state1), _parse_state_arg(state2)))
+    if cmd == 'inner':
+        if not state1 or not state2:
+            raise ValueError('inner requires --state1 and --state2')
+        val = inner_product(_parse_state_arg(state1), _parse_state_arg(state2))
+        return {'real': float(np.real(val)), 'imag': float(np.imag(val))}
+    if cmd == 'bloch':
+        if not state:
+            raise ValueError('bloch requires --state')
+        return bloch_vector(_parse_state_arg(state)).tolist()
+    if cmd == 'expectation':
+        if not state or not pauli:
+            raise ValueError('expectation requires --state and --pauli')
+        return float(np.real(expectation_value(pauli, _parse_state_arg(state))))
+    raise ValueError(f"not a simple op: {cmd}")
+
+
+def _random_state_text(rng, n_qubits: int) -> str:
+    amps = rng.normal(size=2 ** n_qubits) + 1j * rng.normal(size=2 ** n_qubits)
+    return ",".join(repr(complex(round(a.real, 6), round(a.imag, 6))) for a in amps)
+
+
+def write_test_vectors(path: str, seed: int = 7) -> int:
+    """Write SIMPLE_OPS cases with their expected values as JSON for the JS port.
+
+    static/qmath.js checks itself against this file (QMath.selfTest()).
+    Returns the number of cases written.
+    """
+    import json
+    rng = np.random.default_rng(seed)
+    predefined = ["0", "1", "+", "-", "|0>", "|1>"]
+    raw = ["1,0", "0.707+0.707j,0.707-0.707j", "(0.6+0j), 0.8j", "3,-4j", "1e-3,1", "j,1"]
+    singles = predefined + raw + [_random_state_text(rng, 1) for _ in range(4)]
+    cases = []
+    for a in singles:
+        cases.append({"op": "bloch", "state": a})
+        for p in ("X", "Y", "Z", "I"):
+            cases.append({"op": "expectation", "state": a, "pauli": p})
+    for a in singles[:8]:
+        for b in singles[4:12]:
+            cases.append({"op": "fidelity", "state1": a, "state2": b})
+            cases.append({"op": "inner", "state1": a, "state2": b})
+    for n in range(2, 7):
+        for _ in range(3):
+            a, b = _random_state_text(rng, n), _random_state_text(rng, n)
+            pauli = "".join(rng.choice(list("IXYZ"), size=n))
+            cases.append({"op": "fidelity", "state1": a, "state2": b})
+            cases.append({"op": "inner", "state1": a, "state2": b})
+            cases.append({"op": "expectation", "state": a, "pauli": pauli})
+    for case in cases:
+        case["value"] = run_simple_op(case["op"], state=case.get("state"), state1=case.get("state1"),
+                                      state2=case.get("state2"), pauli=case.get("pauli"))
+    # one case per line keeps regenerated files diffable
+    header = json.dumps({"generated_by": "qiskitquantum.write_test_vectors", "seed": seed, "tolerance": 1e-9})
+    body = ",\n".join(json.dumps(case) for case in cases)
+    _write_atomic(path, header[:-1] + ', "cases": [\n' + body + "\n]}\n")
+    return len(cases)
+
+
 if __name__ == "__main__":
     import argparse
     import json
@@ -227,12 +307,18 @@ if __name__ == "__main__":
     parser.add_argument("--pauli", help="Pauli string for expectation (e.g. ZI)")
     parser.add_argument("--nqubits", type=int, help="number of qubits for QFT")
     parser.add_argument("--out-file", help="optional file to write JSON result")
+    parser.add_argument("--write-test-vectors", metavar="PATH",
+                        help="write expected results for the browser implementation (e.g. static/qmath_vectors.json)")
     parser.add_argument("name", nargs="?", help="(optional) context name")
     parser.add_argument("age", nargs="?", help="(optional) context age")
     parser.add_argument("country", nargs="?", help="(optional) context country")
 
     args = parser.parse_args()
 
+    if args.write_test_vectors:
+        print(f"wrote {write_test_vectors(args.write_test_vectors)} cases to {args.write_test_vectors}")
+        sys.exit(0)
+
     if not args.cmd:
         # no cmd -> run demo (original behaviour)
         print("Qiskit math utilities demo — running simple examples:\n")
@@ -255,40 +341,16 @@ if __name__ == "__main__":
             print("\nQiskit not installed — functions work with NumPy statevectors.")
         sys.exit(0)
 
+    import time
     result = {"operation": args.cmd}
+    compute_start = time.perf_counter()
     try:
-        if args.cmd == 'fidelity':
-            if not args.state1 or not args.state2:
-                raise ValueError('fidelity requires --state1 and --state2')
-            psi = _parse_state_arg(args.state1)
-            phi = _parse_state_arg(args.state2)
-            val = state_fidelity(psi, phi)
-            result['value'] = float(val)
-
-        elif args.cmd == 'inner':
-            if not args.state1 or not args.state2:
-                raise ValueError('inner requires --state1 and --state2')
-            psi = _parse_state_arg(args.state1)
-            phi = _parse_state_arg(args.state2)
-            val = inner_product(psi, phi)
-            result['value'] = {'real': float(np.real(val)), 'imag': float(np.imag(val))}
-
-        elif args.cmd == 'bloch':
-            if not args.state:
-                raise ValueError('bloch requires --state')
-            psi = _parse_state_arg(args.state)
-            vec = bloch_vector(psi)
-            result['value'] = vec.tolist()
-
-        elif args.cmd == 'expectation':
-            if not args.state or not args.pauli:
-                raise ValueError('expectation requires --state and --pauli')
-            psi = _parse_state_arg(args.state)
-            val = expectation_value(args.pauli, psi)
-            result['value'] = float(val)
+        if args.cmd in SIMPLE_OPS:
+            result['value'] = run_simple_op(args.cmd, state=args.state, state1=args.state1,
+                                            state2=args.state2, pauli=args.pauli)
 
         elif args.cmd == 'qft':
-            n = args.nqubits or int(np.log2(len(_parse_state_arg(args.state)))) if args.state else None
+            n = args.nqubits or (int(np.log2(len(_parse_state_arg(args.state)))) if args.state else None)
             if n is None:
                 raise ValueError('qft requires --nqubits or a --state of power-of-two length')
             if args.state:
@@ -298,19 +360,19 @@ if __name__ == "__main__":
             out = apply_qft(psi)
             result['value'] = [complex(x) for x in out]
 
+        # compute time only (no interpreter start-up); the web app exports it as a metric
+        result['compute_ms'] = round((time.perf_counter() - compute_start) * 1000, 3)
         # attach optional context
         result['context'] = {'name': args.name, 'age': args.age, 'country': args.country}
         out_text = json.dumps(result, default=lambda o: (o.real, o.imag) if isinstance(o, complex) else str(o))
         if args.out_file:
-            with open(args.out_file, 'w', encoding='utf-8') as f:
-                f.write(out_text)
+            _write_atomic(args.out_file, out_text)
         else:
             print(out_text)
     except Exception as exc:
         err = {"error": str(exc)}
         if args.out_file:
-            with open(args.out_file, 'w', encoding='utf-8') as f:
-                f.write(json.dumps(err))
+            _write_atomic(args.out_file, json.dumps(err))
         else:
             print(json.dumps(err))
         sys.exit(2)
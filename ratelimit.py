@@ -0,0 +1,172 @@
+"""ratelimit.py — request rate limiting and CPU admission control for /launch.
+
+Provided:
+- MemoryStore: in-process state for both (token buckets and counters)
+- TokenBucketLimiter: `rate` requests per second per key with bursts of `burst`
+- AdmissionController: admits work while the estimated CPU cost of everything
+  in flight stays within a budget
+- SharedCounter: a counter in a store that may be shared by several
+  processes; each process's share is also kept under its owner key
+- Rejected: raised by AdmissionController.admit, carries retry_after seconds
+- RateLimited: a Rejected for callers that turn a limiter's wait into an error
+
+Every check is O(1): one bucket refill or one counter update under a lock.
+The limiters only talk to their store through `take()` and `add()`. A
+multi-process deployment (e.g. `python -m app serve --workers N`) can pass
+a store with the same two methods backed by shared state (`serve.py` hosts a
+MemoryStore in a shared-state process, for example) to enforce limits across
+workers instead of per worker. A shared counter outlives the workers that
+add to it, so counters that hold reservations (admission, process slots)
+also record each worker's share under an owner key. When a worker exits,
+whoever notices (serve's master) calls reclaim() for that owner and gives
+back what the worker never released.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class Rejected(Exception):
+    """Work was not admitted; retry after `retry_after` seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(Rejected):
+    """A rate limiter refused the request; retry after `retry_after` seconds."""
+
+
+def retry_after_header(seconds):
+    """Retry-After value: whole seconds, at least 1."""
+    return str(max(1, int(math.ceil(seconds))))
+
+
+class MemoryStore:
+    """Token buckets and counters in this process, bounded by `max_keys` buckets.
+
+    Buckets are kept in LRU order; the least recently used one is dropped when
+    there are more than `max_keys` (a dropped bucket is simply full again).
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, last refill time]
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, amount=1.0):
+        """Take `amount` tokens from `key`'s bucket; returns seconds to wait (0.0 = taken)."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= amount:
+                bucket[0] -= amount
+                return 0.0
+            return (amount - bucket[0]) / rate if rate > 0 else float("inf")
+
+    def add(self, key, delta):
+        """Add `delta` to counter `key` and return the new value."""
+        with self._lock:
+            value = self._counters.get(key, 0.0) + delta
+            self._counters[key] = value
+            return value
+
+
+class TokenBucketLimiter:
+    """Allow `rate` events per second per key, with bursts of up to `burst`."""
+
+    def __init__(self, store, rate, burst, prefix="rl"):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.prefix = prefix
+
+    def check(self, key, amount=1.0):
+        """Consume `amount` for `key`; returns 0.0 if allowed, else seconds to wait."""
+        return self.store.take(f"{self.prefix}:{key}", self.rate, self.burst, amount)
+
+
+class SharedCounter:
+    """Counter `key` in `store`; with an `owner`, that process's share is kept too.
+
+    The owner's share lives under "<key>:<owner>". reclaim() subtracts what
+    the owner left behind, once that process has exited holding reservations.
+    """
+
+    def __init__(self, store, key, owner=None):
+        self.store = store
+        self.key = key
+        self.owner = owner
+
+    def add(self, delta):
+        """Add `delta` and return the new total."""
+        total = self.store.add(self.key, delta)
+        if self.owner is not None:
+            self.store.add(f"{self.key}:{self.owner}", delta)
+        return total
+
+    def value(self):
+        return self.store.add(self.key, 0.0)
+
+    def reclaim(self):
+        """Give back the owner's leftover share; returns how much that was."""
+        if self.owner is None:
+            return 0.0
+        leftover = self.store.add(f"{self.key}:{self.owner}", 0.0)
+        if leftover:
+            self.store.add(f"{self.key}:{self.owner}", -leftover)
+            self.store.add(self.key, -leftover)
+        return leftover
+
+
+class AdmissionController:
+    """Bound the estimated CPU-seconds of in-flight work to `budget`.
+
+    `drain_rate` is how many CPU-seconds of work finish per wall second
+    (the CPU count by default) and is only used to suggest a Retry-After.
+    A job bigger than the whole budget is still admitted when nothing else
+    is in flight, so it is not rejected forever.
+    """
+
+    def __init__(self, store, budget, drain_rate=None, key="admission:inflight"):
+        self.budget = budget
+        self.drain_rate = drain_rate or float(os.cpu_count() or 1)
+        self.key = key
+        self._counter = SharedCounter(store, key)
+
+    def use_store(self, store, owner=None):
+        """Switch to `store` (e.g. one shared by server workers), counting this process as `owner`."""
+        self._counter = SharedCounter(store, self.key, owner)
+
+    def reclaim(self, store, owner):
+        """Give back the cost `owner` still held in `store` when it exited."""
+        return SharedCounter(store, self.key, owner).reclaim()
+
+    def admit(self, cost):
+        """Reserve `cost`; raises Rejected if that would exceed the budget."""
+        total = self._counter.add(cost)
+        # the tolerance absorbs float dust left by earlier add/release pairs
+        if total > self.budget and total - cost > 1e-6:
+            self._counter.add(-cost)
+            raise Rejected(f"server busy ({total - cost:.0f}/{self.budget:.0f} CPU-s in flight)",
+                           (total - self.budget) / self.drain_rate)
+        return cost
+
+    def release(self, cost):
+        self._counter.add(-cost)
+
+    def in_flight(self):
+        # rounded: repeated float add/subtract leaves dust like -1e-14
+        return round(self._counter.value(), 6)
@@ -0,0 +1,481 @@
+"""serve.py — production server for the Flask app (`python -m app serve`).
+
+A small pre-fork server built on werkzeug, which Flask already depends on:
+- the master imports the app and the heavy modules (numpy, qiskitquantum)
+  and warms the app's caches, then forks workers. Workers share those memory
+  pages copy-on-write instead of importing everything N times
+- every worker serves the one listening socket with a thread per request
+- the master restarts workers that die, in the slot (0..N-1) they had
+- SIGHUP: graceful reload. The master re-executes itself so new code is
+  picked up. The listening socket is kept open across the exec, so queued
+  connections are not dropped. Old workers stop accepting, finish in-flight
+  requests and exit (or are killed after --graceful-timeout)
+- SIGTERM / SIGINT: graceful stop, the same drain without a restart
+- debug mode is opt-in (--debug) and runs the single-process dev server
+
+State across workers. With --workers N > 1 the master first forks a
+shared-state process (a multiprocessing manager on a unix socket in a
+private run directory). The app names the objects it hosts in `shared` and,
+in `on_worker_start`, rebinds its globals to the proxies a worker gets, so
+limits, caps and caches hold for the whole server, not per worker. State
+that stays in a worker is routed instead: every worker also listens on its
+own unix socket, and a request for which `route(path)` returns another
+worker's slot is forwarded there with the response streamed back. The app
+puts the slot in its job ids, so /jobs/<id> polls and event streams reach
+the worker that runs the job. After a worker exits, `on_worker_exit(pid,
+shared)` runs in a short-lived child of the master to give back what that
+worker still held. The shared-state process is kept across a reload (its
+state survives; its code is not reloaded).
+
+Without os.fork (Windows) it falls back to one threaded process.
+"""
+import argparse
+import gc
+import http.client
+import importlib
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from multiprocessing.managers import BaseManager
+from urllib.parse import quote
+
+from werkzeug.serving import make_server
+
+PRELOAD_MODULES = ("numpy", "qiskitquantum")
+LISTEN_FD_ENV = "APP_SERVE_FD"
+# run dir, authkey and pid of the shared-state process, kept across a reload
+SHARED_ENV = "APP_SERVE_SHARED"
+# seconds the master waits for a new shared-state process to accept connections
+SHARED_START_TIMEOUT = 10.0
+# not passed on when a request is forwarded to another worker
+HOP_BY_HOP = frozenset((
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "trailers", "transfer-encoding", "upgrade",
+))
+# a worker that dies sooner than this after starting is restarted with a delay
+MIN_WORKER_LIFETIME = 1.0
+
+
+def parse_bind(text):
+    """'HOST:PORT' or ':PORT' -> (host, port)."""
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1"), int(port)
+
+
+def preload(warm=None):
+    """Import heavy modules, run `warm()`, and freeze the heap before forking."""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as exc:
+            print(f"serve: could not preload {name}: {exc}", file=sys.stderr)
+    if warm is not None:
+        warm()
+    # keep the gc from touching (and so un-sharing) the preloaded objects
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+def listening_socket(host, port, backlog=128):
+    """Reuse the socket handed over by a reloading master, or bind a new one."""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        return socket.socket(fileno=int(fd))
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def fork_call(fn, *args):
+    """Run fn(*args) in a forked child that exits with its result code; returns the pid."""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            fn(*args)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # skip the master's atexit handlers and finally blocks
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    return pid
+
+
+def _once(factory, made):
+    """Wrap `factory` so that every call returns the one object it made first (also added to `made`)."""
+    lock = threading.Lock()
+    mine = []
+
+    def get():
+        with lock:
+            if not mine:
+                mine.append(factory())
+                made.append(mine[0])
+            return mine[0]
+    return get
+
+
+class SharedState:
+    """Objects hosted in one process for all workers, reached through proxies.
+
+    `objects` maps a name to a factory, or to (factory, proxy type). Each
+    factory runs once, in the shared-state process, when a worker first asks
+    for the object; on SIGTERM that process calls close() on the objects that
+    have one. The run directory also holds the workers' own sockets.
+    """
+
+    def __init__(self, objects, run_dir, authkey, pid=None):
+        self.run_dir = run_dir
+        self.address = os.path.join(run_dir, "shared.sock")
+        self.authkey = authkey
+        self.pid = pid
+        self.names = list(objects)
+        self._made = []
+        self._manager_cls = type("SharedStateManager", (BaseManager,), {})
+        for name, spec in objects.items():
+            factory, proxytype = spec if isinstance(spec, tuple) else (spec, None)
+            self._manager_cls.register(name, callable=_once(factory, self._made), proxytype=proxytype)
+
+    @classmethod
+    def create(cls, objects):
+        state = cls(objects, tempfile.mkdtemp(prefix="app-serve-"), os.urandom(32))
+        state.start()
+        return state
+
+    @classmethod
+    def inherited(cls, objects):
+        """The shared state handed over by a reloading master, or None."""
+        value = os.environ.pop(SHARED_ENV, None)
+        if value is None:
+            return None
+        run_dir, authkey, pid = value.rsplit("|", 2)
+        return cls(objects, run_dir, bytes.fromhex(authkey), int(pid))
+
+    def hand_over(self):
+        os.environ[SHARED_ENV] = f"{self.run_dir}|{self.authkey.hex()}|{self.pid}"
+
+    def start(self):
+        """Fork the shared-state process and wait until it accepts connections."""
+        self.pid = fork_call(self._serve)
+        deadline = time.monotonic() + SHARED_START_TIMEOUT
+        while True:
+            try:
+                # connect() only checks the server; it leaves no connection behind
+                self._manager_cls(self.address, self.authkey).connect()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def _serve(self):
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        try:
+            # returns only through sys.exit()
+            self._manager_cls(self.address, self.authkey).get_server().serve_forever()
+        except SystemExit:
+            pass
+        for obj in self._made:
+            close = getattr(obj, "close", None)
+            if callable(close):
+                close()
+
+    def connect(self):
+        """Connect from a worker; returns {name: proxy}."""
+        manager = self._manager_cls(self.address, self.authkey)
+        manager.connect()
+        return {name: getattr(manager, name)() for name in self.names}
+
+    def worker_socket(self, slot):
+        return os.path.join(self.run_dir, f"worker-{slot}.sock")
+
+    def stop(self):
+        if self.pid is not None:
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+                os.waitpid(self.pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.pid = None
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def _stream(response, conn):
+    # read1 returns what has arrived, so event streams are passed on as they come
+    try:
+        while True:
+            chunk = response.read1(65536)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        conn.close()
+
+
+class OwnerRouter:
+    """WSGI middleware that forwards requests owned by another worker.
+
+    `route(path)` returns the slot of the worker that owns `path`, or None.
+    Owned requests for another slot go to that worker's unix socket
+    (`socket_path(slot)`); everything else is served by `app`.
+    """
+
+    def __init__(self, app, slot, workers, socket_path, route):
+        self.app = app
+        self.slot = slot
+        self.workers = workers
+        self.socket_path = socket_path
+        self.route = route
+
+    def __call__(self, environ, start_response):
+        owner = self.route(environ.get("PATH_INFO", ""))
+        # unknown slots are served here, where the app answers 404
+        if owner is None or owner == self.slot or not 0 <= owner < self.workers:
+            return self.app(environ, start_response)
+        return self.forward(owner, environ, start_response)
+
+    def forward(self, owner, environ, start_response):
+        target = environ.get("REQUEST_URI") or quote(environ.get("PATH_INFO", ""))
+        if "REQUEST_URI" not in environ and environ.get("QUERY_STRING"):
+            target += "?" + environ["QUERY_STRING"]
+        headers = {}
+        for key, value in environ.items():
+            if key.startswith("HTTP_"):
+                name = key[5:].replace("_", "-").title()
+                if name.lower() not in HOP_BY_HOP:
+                    headers[name] = value
+        for key, name in (("CONTENT_TYPE", "Content-Type"), ("CONTENT_LENGTH", "Content-Length")):
+            if environ.get(key):
+                headers[name] = environ[key]
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        body = environ["wsgi.input"].read(length) if length else None
+
+        conn = _UnixHTTPConnection(self.socket_path(owner))
+        try:
+            conn.request(environ["REQUEST_METHOD"], target, body, headers)
+            response = conn.getresponse()
+        except OSError:
+            conn.close()
+            # the owner is restarting; its jobs are gone with it
+            start_response("502 Bad Gateway", [("Content-Type", "text/plain; charset=utf-8")])
+            return [f"worker {owner} is not running\n".encode()]
+        start_response(f"{response.status} {response.reason}",
+                       [(k, v) for k, v in response.getheaders() if k.lower() not in HOP_BY_HOP])
+        return _stream(response, conn)
+
+
+def run_worker(flask_app, sock, graceful_timeout, private=None):
+    """Serve `sock` until SIGTERM, then drain in-flight requests and exit.
+
+    `private` is (unix socket path, app): a second server for requests that
+    other workers forward to this one.
+    """
+    host, port = sock.getsockname()[:2]
+    servers = [make_server(host, port, flask_app, threaded=True, fd=sock.fileno())]
+    if private is not None:
+        path, private_app = private
+        servers.append(make_server("unix://" + path, 0, private_app, threaded=True))
+    for server in servers:
+        # non-daemon request threads, so server_close() waits for them to finish
+        server.daemon_threads = False
+
+    def drain(signum, frame):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        # hard deadline for long requests (e.g. open SSE streams)
+        signal.alarm(max(1, int(graceful_timeout)))
+        for server in servers:
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, drain)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGALRM, signal.SIG_DFL)
+    for server in servers[1:]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    servers[0].serve_forever()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class Master:
+    """Forks and supervises worker processes that share one listening socket.
+
+    With more than one worker it also runs the shared-state process and
+    gives each worker a private socket (see the module docstring).
+    """
+
+    def __init__(self, flask_app, sock, workers, graceful_timeout=30.0,
+                 shared=None, on_worker_start=None, on_worker_exit=None, route=None):
+        self.flask_app = flask_app
+        self.sock = sock
+        self.num_workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.shared = shared or {}
+        self.on_worker_start = on_worker_start
+        self.on_worker_exit = on_worker_exit
+        self.route = route
+        self.state = None  # SharedState, with several workers
+        self.workers = {}  # pid -> (start time, slot)
+        self._helpers = set()  # pids of on_worker_exit children
+        self._signal = None
+
+    def spawn_worker(self, slot):
+        pid = fork_call(self._worker_main, slot)
+        self.workers[pid] = (time.monotonic(), slot)
+
+    def _worker_main(self, slot):
+        if self.state is None:
+            run_worker(self.flask_app, self.sock, self.graceful_timeout)
+            return
+        objects = self.state.connect()
+        if self.on_worker_start is not None:
+            self.on_worker_start(slot, self.num_workers, objects)
+        app = self.flask_app
+        if self.route is not None:
+            app = OwnerRouter(app, slot, self.num_workers, self.state.worker_socket, self.route)
+        run_worker(app, self.sock, self.graceful_timeout,
+                   private=(self.state.worker_socket(slot), self.flask_app))
+
+    def worker_exited(self, pid):
+        """Run on_worker_exit(pid, shared objects) in a short-lived child.
+
+        The master itself never connects to the shared-state process:
+        workers forked afterwards would inherit and share its connection.
+        """
+        if self.on_worker_exit is None:
+            return
+        self._helpers.add(fork_call(lambda: self.on_worker_exit(pid, self.state.connect())))
+
+    def reap(self):
+        """Collect exited children; returns how many of our workers died too early."""
+        early = 0
+        while True:
+            try:
+                pid, _status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return early
+            if pid == 0:
+                return early
+            if pid in self._helpers:
+                self._helpers.discard(pid)
+                continue
+            if self.state is not None and pid == self.state.pid:
+                print("serve: shared-state process exited, stopping", file=sys.stderr)
+                self.state.pid = None
+                self._on_signal(signal.SIGTERM, None)
+                continue
+            entry = self.workers.pop(pid, None)
+            # pids we did not fork are old workers from before a reload
+            if self.state is not None and self._signal is None:
+                self.worker_exited(pid)
+            if entry is not None and time.monotonic() - entry[0] < MIN_WORKER_LIFETIME:
+                early += 1
+
+    def stop_workers(self, sig=signal.SIGTERM):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+    def run(self):
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._on_signal)
+        host, port = self.sock.getsockname()[:2]
+        if self.num_workers > 1:
+            self.state = SharedState.inherited(self.shared) or SharedState.create(self.shared)
+        print(f"serve: master {os.getpid()} on http://{host}:{port} with {self.num_workers} workers",
+              file=sys.stderr)
+
+        while self._signal is None:
+            if self.reap():
+                time.sleep(MIN_WORKER_LIFETIME)
+            while len(self.workers) < self.num_workers and self._signal is None:
+                taken = {slot for _start, slot in self.workers.values()}
+                self.spawn_worker(min(set(range(self.num_workers)) - taken))
+            time.sleep(0.5)
+
+        if self._signal == signal.SIGHUP:
+            self.reload()
+        self.shutdown()
+
+    def reload(self):
+        """Drain the current workers and re-exec the master with the same socket."""
+        print(f"serve: reloading (master {os.getpid()})", file=sys.stderr)
+        self.stop_workers()
+        self.sock.set_inheritable(True)
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        if self.state is not None:
+            self.state.hand_over()
+        argv = getattr(sys, "orig_argv", None) or [sys.executable] + sys.argv
+        os.execv(sys.executable, argv)
+
+    def shutdown(self):
+        self.stop_workers()
+        deadline = time.monotonic() + self.graceful_timeout + 1
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        self.stop_workers(signal.SIGKILL)
+        self.reap()
+        if self.state is not None:
+            self.state.stop()
+        self.sock.close()
+
+    def _on_signal(self, signum, frame):
+        if self._signal is None:
+            self._signal = signum
+
+
+def main(flask_app, argv=None, warm=None, shared=None, on_worker_start=None, on_worker_exit=None, route=None):
+    """Entry point for `python -m app serve ...`; `warm()` runs once before forking.
+
+    `shared`, `on_worker_start`, `on_worker_exit` and `route` are used with
+    several workers; see the module docstring.
+    """
+    parser = argparse.ArgumentParser(prog="python -m app serve", description="serve the web app")
+    parser.add_argument("--bind", default="127.0.0.1:8000", help="HOST:PORT to listen on (default 127.0.0.1:8000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="seconds a draining worker may spend on in-flight requests")
+    parser.add_argument("--debug", action="store_true", help="single-process dev server with debugger and reloader")
+    args = parser.parse_args(argv)
+    host, port = parse_bind(args.bind)
+
+    if args.debug:
+        flask_app.run(host=host, port=port, debug=True)
+        return
+
+    preload(warm)
+    if not hasattr(os, "fork"):
+        make_server(host, port, flask_app, threaded=True).serve_forever()
+        return
+    Master(flask_app, listening_socket(host, port), max(1, args.workers), args.graceful_timeout,
+           shared=shared, on_worker_start=on_worker_start, on_worker_exit=on_worker_exit, route=route).run()
@@ -1,32 +1,41 @@
 """
 2D SNAKE GAMES
 A classic snake game with player and AI modes
+
+The game rules live in snake_core.py (no pygame); this file is the pygame
+front end: window, input, drawing and the frame loop.
 """
 
+import argparse
+import os
 import pygame
 import random
-from enum import Enum
-from collections import deque
-import os
+import time
 
-# Initialize Pygame
-pygame.init()
+from snake_core import (WINDOW_WIDTH, WINDOW_HEIGHT, GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, TOP_ROWS,
+                        Direction, OPPOSITE, SnakeSim)
+import game_startup
+import snake_ai
+import snake_replay
 
-# Constants
-WINDOW_WIDTH = 640
-WINDOW_HEIGHT = 480
+# Constants (grid geometry comes from snake_core)
 # Menu (start/title) window size — keep larger so menu looks good
 MENU_WIDTH = 800
 MENU_HEIGHT = 600
-GRID_SIZE = 20
-GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
-GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
-FPS = 10
-
-# Reserve some rows at the top for title/score (no grid there)
-TOP_ROWS = 3
-# Number of playable rows
-GRID_HEIGHT = (WINDOW_HEIGHT // GRID_SIZE) - TOP_ROWS
+# Simulation ticks per second (game speed) and rendered frames per second;
+# run() steps the game at TICK_RATE whatever the frame rate is
+TICK_RATE = 10
+FPS = 60
+# Longest frame time fed to the simulation, and most ticks run per frame,
+# so a stall (window drag, slow frame) does not make the game race to catch up
+MAX_FRAME_TIME = 0.25
+MAX_TICKS_PER_FRAME = 1000
+# Ticks jumped by the Left/Right keys when watching a replay
+REPLAY_SEEK_TICKS = 100
+# AI mode chosen from the menu keeps the original greedy controller; the
+# other snake_ai policies are only used when --ai names one
+MENU_POLICY = "greedy"
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -36,54 +45,35 @@ YELLOW = (255, 255, 0)
 BLUE = (0, 0, 255)
 
 
-def load_icon_or_create():
-    """Try to load static/snake3d.jpeg; if missing try to run generator; otherwise return a fallback Surface."""
-    base = os.path.dirname(__file__) or os.getcwd()
-    icon_path = os.path.join(base, "static", "snake3d.jpeg")
-    if not os.path.isfile(icon_path):
-        icon_path = os.path.join(os.getcwd(), "static", "snake3d.jpeg")
-
-    # Try loading existing file
-    try:
-        if os.path.isfile(icon_path):
-            icon_surf = pygame.image.load(icon_path).convert_alpha()
-            return pygame.transform.smoothscale(icon_surf, (32, 32))
-    except Exception:
-        pass
-
-    # Try to generate the placeholder using the bundled generator script
-    try:
-        import generate_snake_png
-        try:
-            generate_snake_png.main()
-            if os.path.isfile(icon_path):
-                icon_surf = pygame.image.load(icon_path).convert_alpha()
-                return pygame.transform.smoothscale(icon_surf, (32, 32))
-        except Exception:
-            pass
-    except Exception:
-        pass
-
-    # Fallback: create a simple programmatic icon (green circle)
-    surf = pygame.Surface((32, 32), pygame.SRCALPHA)
-    surf.fill((0, 0, 0, 0))
-    try:
-        pygame.draw.circle(surf, GREEN, (16, 16), 14)
-    except Exception:
-        surf.fill(GREEN)
+def draw_snake_icon(size):
+    """The snake-head icon (as generate_snake_png.py draws it), drawn with pygame"""
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    scale = size / 64
+    pygame.draw.ellipse(surf, (0, 200, 0), pygame.Rect(10 * scale, 10 * scale, 44 * scale, 44 * scale))
+    for x in (20, 36):
+        pygame.draw.ellipse(surf, WHITE, pygame.Rect(x * scale, 22 * scale, 8 * scale, 8 * scale))
+        pygame.draw.ellipse(surf, BLACK, pygame.Rect((x + 2) * scale, 24 * scale, 4 * scale, 4 * scale))
     return surf
 
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
+
+def load_icon_or_create():
+    """Window icon: static/snake3d.jpeg scaled to 32x32 (cached in .icon_cache/), else a drawn snake head"""
+    return game_startup.cached_icon("snake", game_startup.static_path("snake3d.jpeg"), draw_snake_icon)
 
 class SnakeGame:
-    def __init__(self, ai_mode=False):
+    def __init__(self, ai_mode=False, ai=None, seed=None, record=None, replay=None):
+        """`seed` fixes the first game's food (later games get seeds derived
+        from it); `record` is a path each finished game is saved as a replay
+        next to, numbered per game (game.snkr -> game-1.snkr, game-2.snkr,
+        ...; unfinished games are not saved); `replay` is a snake_replay.Replay to watch instead of playing.
+        """
+        game_startup.init_pygame()
         self.display = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Snake Game - AI Mode: {}".format("ON" if ai_mode else "OFF"))
-        # Try to set a custom window icon (load/generate/fallback)
+        if replay is not None:
+            pygame.display.set_caption("Snake Game - Replay")
+        else:
+            pygame.display.set_caption("Snake Game - AI Mode: {}".format("ON" if ai_mode else "OFF"))
+        # Try to set a custom window icon (cached/loaded/drawn)
         try:
             icon_surf = load_icon_or_create()
             pygame.display.set_icon(icon_surf)
@@ -91,40 +81,136 @@ class SnakeGame:
             pass
         self.clock = pygame.time.Clock()
         self.ai_mode = ai_mode
-        
-        self.reset()
+        # Seeds for successive games: reproducible when a seed is given
+        self._seeds = random.Random(seed) if seed is not None else None
+        self.record_path = record
+        self.recorder = None
+        self.replay = replay
+        self.paused = False
+        if replay is not None:
+            self.sim = replay.seek(0)
+        else:
+            # a new simulation starts already reset
+            self.sim = SnakeSim(seed=seed if seed is not None else snake_replay.new_seed())
+            self._start_recording()
+        self.next_direction = Direction.RIGHT
+        # (previous head, previous tail) of the last tick that moved, for interpolation
+        self._last_move = None
+        # AI policy name (see snake_ai.POLICIES); None plays MENU_POLICY
+        self.ai = ai
+        self.policy = snake_ai.make_policy(ai or MENU_POLICY, self.sim.width, self.sim.height)
+        self._build_static()
     
+    def _build_static(self):
+        """Create fonts and pre-render everything that does not change while playing"""
+        self.title_font = game_startup.font(48)
+        self.font = game_startup.font(36)
+        self.large_font = game_startup.font(72)
+        top_px = TOP_ROWS * GRID_SIZE
+        self.ui_y = max(10, top_px - 30)
+
+        # Background: grid lines in the playfield (below the top UI rows), title and mode
+        background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        background.fill(BLACK)
+        for x in range(0, WINDOW_WIDTH, GRID_SIZE):
+            pygame.draw.line(background, (40, 40, 40), (x, top_px), (x, WINDOW_HEIGHT))
+        for y in range(top_px, WINDOW_HEIGHT, GRID_SIZE):
+            pygame.draw.line(background, (40, 40, 40), (0, y), (WINDOW_WIDTH, y))
+        title_text = self.title_font.render("2D SNAKE GAMES", True, BLUE)
+        background.blit(title_text, title_text.get_rect(center=(WINDOW_WIDTH // 2, 20)))
+        if self.replay is not None:
+            mode_text = self.font.render("REPLAY", True, BLUE)
+        else:
+            mode_text = self.font.render("AI: {}".format((self.ai or "ON") if self.ai_mode else "OFF"), True, BLUE)
+        background.blit(mode_text, (WINDOW_WIDTH - mode_text.get_width() - 10, self.ui_y))
+        self.background = background
+
+        # Game over messages, centered in the playfield (below the UI area)
+        playfield_center_y = top_px + (WINDOW_HEIGHT - top_px) // 2
+        game_over_text = self.large_font.render("GAME OVER", True, RED)
+        restart_text = self.font.render("Press SPACE to restart", True, WHITE)
+        self.game_over_blits = [
+            (game_over_text, game_over_text.get_rect(center=(WINDOW_WIDTH // 2, playfield_center_y - 30))),
+            (restart_text, restart_text.get_rect(center=(WINDOW_WIDTH // 2, playfield_center_y + 30))),
+        ]
+
+        # What is on screen now, so draw() only touches what changed
+        self._painted = {}  # cell -> color
+        self._score_shown = None
+        self._score_rect = None
+        self._game_over_shown = False
+        self._full_redraw = True
+
     def setup_opengl(self):
         """Setup OpenGL settings"""
         pass
     
+    # game state is owned by the simulation; these are read-only views for drawing
+    snake = property(lambda self: self.sim.snake)
+    food = property(lambda self: self.sim.food)
+    direction = property(lambda self: self.sim.direction)
+    score = property(lambda self: self.sim.score)
+    game_over = property(lambda self: self.sim.game_over)
+    
     def reset(self):
         """Reset the game state"""
-        start_x = GRID_WIDTH // 2
-        start_y = GRID_HEIGHT // 2
-        
-        self.snake = deque([(start_x, start_y), (start_x - 1, start_y), (start_x - 2, start_y)])
-        self.food = self.spawn_food()
-        self.direction = Direction.RIGHT
+        if self.replay is not None:
+            self.seek(0)
+            return
+        self.save_recording()
+        self.sim.reset(snake_replay.new_seed(self._seeds))
+        self._start_recording()
         self.next_direction = Direction.RIGHT
-        self.score = 0
-        self.game_over = False
+        self._last_move = None
+
+    def _start_recording(self):
+        if self.record_path:
+            self.recorder = snake_replay.Recorder(self.sim.seed, self.sim.width, self.sim.height)
+
+    def save_recording(self):
+        """Save the current game as the next numbered --record file if it has ended; drop the recording either way"""
+        if self.recorder is not None and self.recorder.ticks and self.sim.game_over:
+            path = self._next_record_path()
+            self.recorder.save(path)
+            print(f"Saved replay of {self.recorder.ticks} ticks (score {self.recorder.score}) to {path}")
+        self.recorder = None
+
+    def _next_record_path(self):
+        # first unused game.snkr -> game-N.snkr, so earlier replays are never replaced
+        stem, ext = os.path.splitext(self.record_path)
+        n = 1
+        while os.path.exists(f"{stem}-{n}{ext}"):
+            n += 1
+        return f"{stem}-{n}{ext}"
+
+    def seek(self, tick):
+        """Jump to `tick` of the replay being watched"""
+        self.replay.seek(tick)
+        self._last_move = None
     
     def spawn_food(self):
         """Spawn food at a random location"""
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            if (x, y) not in self.snake:
-                return (x, y)
+        return self.sim.spawn_food()
     
     def handle_input(self):
         """Handle keyboard input"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._full_redraw = True
             
-            if event.type == pygame.KEYDOWN:
+            if event.type == pygame.KEYDOWN and self.replay is not None:
+                # Replay: Left/Right jump, Home restarts, Space pauses
+                if event.key == pygame.K_LEFT:
+                    self.seek(self.replay.tick - REPLAY_SEEK_TICKS)
+                elif event.key == pygame.K_RIGHT:
+                    self.seek(self.replay.tick + REPLAY_SEEK_TICKS)
+                elif event.key == pygame.K_HOME:
+                    self.seek(0)
+                elif event.key == pygame.K_SPACE:
+                    self.paused = not self.paused
+            elif event.type == pygame.KEYDOWN:
                 # Arrow keys and WASD controls
                 if event.key == pygame.K_UP or event.key == pygame.K_w:
                     if self.direction != Direction.DOWN:
@@ -146,157 +232,212 @@ class SnakeGame:
     
     def ai_move(self):
         """AI logic to move the snake towards food"""
-        head_x, head_y = self.snake[0]
-        food_x, food_y = self.food
-        
-        # Calculate possible moves
-        possible_moves = []
-        
-        # Check all directions
-        for direction in Direction:
-            new_x = head_x + direction.value[0]
-            new_y = head_y + direction.value[1]
-            
-            # Check if move is valid (not into wall or itself)
-            if (0 <= new_x < GRID_WIDTH and 
-                0 <= new_y < GRID_HEIGHT and 
-                (new_x, new_y) not in self.snake):
-                
-                # Calculate distance to food
-                distance = abs(new_x - food_x) + abs(new_y - food_y)
-                possible_moves.append((distance, direction))
-        
-        if possible_moves:
-            # Pick move with smallest distance (avoid comparing Direction objects)
-            _, best_direction = min(possible_moves, key=lambda t: t[0])
-            
-            # Only move if it's not opposite to current direction
-            if best_direction != self.get_opposite_direction(self.direction):
-                self.next_direction = best_direction
+        best_direction = self.policy(self.sim)
+        if best_direction is not None:
+            self.next_direction = best_direction
     
     def get_opposite_direction(self, direction):
         """Get the opposite direction"""
-        opposites = {
-            Direction.UP: Direction.DOWN,
-            Direction.DOWN: Direction.UP,
-            Direction.LEFT: Direction.RIGHT,
-            Direction.RIGHT: Direction.LEFT
-        }
-        return opposites[direction]
+        return OPPOSITE[direction]
     
     def update(self):
         """Update game state"""
-        if self.game_over:
+        previous = (self.snake[0], self.snake[-1])
+        steps = self.sim.steps
+        self.sim.step(self.next_direction)
+        self._last_move = None if self.game_over else previous
+        if self.recorder is not None and self.sim.steps != steps:
+            self.recorder.record(self.sim)
+            if self.game_over:
+                self.save_recording()
+
+    def tick(self):
+        """One simulation tick: AI decision (in AI mode) and update, or the next replay tick"""
+        if self.replay is not None:
+            previous = (self.snake[0], self.snake[-1])
+            moved = not self.paused and self.replay.step()
+            self._last_move = previous if moved and not self.game_over else None
             return
-        
-        self.direction = self.next_direction
-        
-        # Move snake
-        head_x, head_y = self.snake[0]
-        dx, dy = self.direction.value
-        new_head = (head_x + dx, head_y + dy)
-        
-        # Check collision with walls
-        if not (0 <= new_head[0] < GRID_WIDTH and 0 <= new_head[1] < GRID_HEIGHT):
-            self.game_over = True
-            return
-        
-        # Check collision with self
-        if new_head in self.snake:
-            self.game_over = True
-            return
-        
-        self.snake.appendleft(new_head)
-        
-        # Check if food is eaten
-        if new_head == self.food:
-            self.score += 10
-            self.food = self.spawn_food()
-        else:
-            self.snake.pop()
+        if self.ai_mode:
+            self.ai_move()
+        self.update()
     
-    def draw(self):
-        """Draw the game"""
-        self.display.fill(BLACK)
-        
-        # Draw grid
-        # Draw grid only in the playfield (below the top UI rows)
-        top_px = TOP_ROWS * GRID_SIZE
-        for x in range(0, WINDOW_WIDTH, GRID_SIZE):
-            pygame.draw.line(self.display, (40, 40, 40), (x, top_px), (x, WINDOW_HEIGHT))
-        for y in range(top_px, WINDOW_HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.display, (40, 40, 40), (0, y), (WINDOW_WIDTH, y))
-        
-        # Draw food
-        # Draw food (offset by top UI rows)
-        food_x, food_y = self.food
-        pygame.draw.rect(self.display, RED, (food_x * GRID_SIZE, (food_y + TOP_ROWS) * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-        
-        # Draw snake
-        for i, (x, y) in enumerate(self.snake):
-            color = GREEN if i == 0 else YELLOW  # Head is green, body is yellow
-            pygame.draw.rect(self.display, color, (x * GRID_SIZE, (y + TOP_ROWS) * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-        
-        # Draw title and UI in the reserved top area
-        title_font = pygame.font.Font(None, 48)
-        title_text = title_font.render("2D SNAKE GAMES", True, BLUE)
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 20))
-        self.display.blit(title_text, title_rect)
-
-        # Draw score and mode inside the top UI area (not over the grid)
-        font = pygame.font.Font(None, 36)
-        top_px = TOP_ROWS * GRID_SIZE
-        ui_y = max(10, top_px - 30)
-        score_text = font.render(f"Score: {self.score}", True, WHITE)
-        self.display.blit(score_text, (10, ui_y))
-
-        # Draw mode indicator on the right side of the top UI area
-        mode_text = font.render("AI: {}".format("ON" if self.ai_mode else "OFF"), True, BLUE)
-        mode_x = WINDOW_WIDTH - mode_text.get_width() - 10
-        self.display.blit(mode_text, (mode_x, ui_y))
-        
-        # Draw game over message
-        if self.game_over:
-            # Center game over messages in the playfield (below the UI area)
-            playfield_center_y = top_px + (WINDOW_HEIGHT - top_px) // 2
-            large_font = pygame.font.Font(None, 72)
-            game_over_text = large_font.render("GAME OVER", True, RED)
-            text_rect = game_over_text.get_rect(center=(WINDOW_WIDTH // 2, playfield_center_y - 30))
-            self.display.blit(game_over_text, text_rect)
-            
-            small_font = pygame.font.Font(None, 36)
-            restart_text = small_font.render("Press SPACE to restart", True, WHITE)
-            restart_rect = restart_text.get_rect(center=(WINDOW_WIDTH // 2, playfield_center_y + 30))
-            self.display.blit(restart_text, restart_rect)
-        
-        pygame.display.flip()
-    
-    def run(self):
-        """Main game loop"""
+    def cell_rect(self, cell):
+        """Screen rect of a grid cell (offset by the top UI rows)"""
+        x, y = cell
+        return pygame.Rect(x * GRID_SIZE, (y + TOP_ROWS) * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+
+    def cell_slice(self, cell, move, start, end):
+        """Part of a cell between fractions `start` and `end` along a move (dx, dy) through it"""
+        rect = self.cell_rect(cell)
+        dx, dy = move
+        a = int(GRID_SIZE * start)
+        b = int(GRID_SIZE * end)
+        if dx:
+            left = a if dx > 0 else GRID_SIZE - b
+            return pygame.Rect(rect.x + left, rect.y, b - a, GRID_SIZE)
+        top = a if dy > 0 else GRID_SIZE - b
+        return pygame.Rect(rect.x, rect.y + top, GRID_SIZE, b - a)
+
+    def draw(self, alpha=1.0):
+        """Draw the game, updating only the parts of the window that changed.
+
+        `alpha` (0..1) is how far the game is between the last tick and the
+        next one: the head is drawn sliding into its cell and the tail sliding
+        out of the cell it just left, so motion stays smooth when frames are
+        drawn more often than the game ticks.
+        """
+        if self._game_over_shown and not self.game_over:
+            # the message covered the playfield; start over after a restart
+            self._full_redraw = True
+        full = self._full_redraw
+        if full:
+            self.display.blit(self.background, (0, 0))
+            self._painted = {}
+            self._score_shown = None
+            self._score_rect = None
+            self._game_over_shown = False
+            self._full_redraw = False
+        dirty = []
+
+        # Snake (head green, body yellow) and food, as cell -> color
+        wanted = dict.fromkeys(self.snake, YELLOW)
+        wanted[self.snake[0]] = GREEN
+        if self.food is not None:
+            wanted[self.food] = RED
+        partial = {}  # cell -> (color, rect): redrawn every frame
+        if alpha < 1.0 and self._last_move is not None:
+            prev_head, prev_tail = self._last_move
+            head = self.snake[0]
+            partial[head] = (GREEN, self.cell_slice(head, (head[0] - prev_head[0], head[1] - prev_head[1]), 0.0, alpha))
+            tail = self.snake[-1]
+            if prev_tail not in wanted:
+                move = (tail[0] - prev_tail[0], tail[1] - prev_tail[1])
+                partial[prev_tail] = (YELLOW, self.cell_slice(prev_tail, move, alpha, 1.0))
+            for cell in partial:
+                wanted[cell] = None
+        painted = self._painted
+        for cell in painted:
+            if cell not in wanted:
+                rect = self.cell_rect(cell)
+                self.display.blit(self.background, rect, rect)
+                dirty.append(rect)
+        for cell, color in wanted.items():
+            if color is None:
+                rect = self.cell_rect(cell)
+                self.display.blit(self.background, rect, rect)
+                self.display.fill(*partial[cell])
+                dirty.append(rect)
+            elif painted.get(cell) != color:
+                dirty.append(self.display.fill(color, self.cell_rect(cell)))
+        self._painted = wanted
+
+        # Score, re-rendered only when it changes
+        if self.score != self._score_shown:
+            score_text = self.font.render(f"Score: {self.score}", True, WHITE)
+            rect = score_text.get_rect(topleft=(10, self.ui_y))
+            if self._score_rect is not None:
+                self.display.blit(self.background, self._score_rect, self._score_rect)
+                rect = rect.union(self._score_rect)
+            self.display.blit(score_text, (10, self.ui_y))
+            dirty.append(rect)
+            self._score_shown = self.score
+            self._score_rect = score_text.get_rect(topleft=(10, self.ui_y))
+
+        # Game over message
+        if self.game_over and not self._game_over_shown:
+            for surface, rect in self.game_over_blits:
+                dirty.append(self.display.blit(surface, rect))
+            self._game_over_shown = True
+
+        if full:
+            pygame.display.flip()
+            game_startup.first_frame()
+        elif dirty:
+            pygame.display.update(dirty)
+
+    def run(self, tick_rate=TICK_RATE, fps=FPS, turbo=0):
+        """Main game loop.
+
+        The simulation advances in fixed steps of 1/tick_rate seconds, however
+        many frames (up to `fps` per second) are drawn in between. With
+        `turbo` > 0 it instead runs `turbo` ticks per drawn frame as fast as
+        possible.
+        """
+        tick_seconds = 1.0 / tick_rate
+        accumulator = 0.0
+        previous = time.perf_counter()
         running = True
         while running:
             running = self.handle_input()
-            
-            if self.ai_mode:
-                self.ai_move()
-            
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+
+            if turbo:
+                for _ in range(turbo):
+                    self.tick()
+                self.draw()
+                self.clock.tick()
+                continue
+
+            now = time.perf_counter()
+            accumulator += min(now - previous, MAX_FRAME_TIME)
+            previous = now
+            ticks = 0
+            while accumulator >= tick_seconds and ticks < MAX_TICKS_PER_FRAME:
+                self.tick()
+                accumulator -= tick_seconds
+                ticks += 1
+            if ticks == MAX_TICKS_PER_FRAME:
+                accumulator = 0.0
+            self.draw(accumulator / tick_seconds)
+            self.clock.tick(fps)
         
+        self.save_recording()
         pygame.quit()
 
-def main():
-    """Main function to choose game mode (uses in-window menu)"""
-    ai_mode = select_mode_ui()
-    game = SnakeGame(ai_mode=ai_mode)
+def main(argv=None):
+    """Main function to choose game mode (uses in-window menu unless --ai is given)"""
+    parser = argparse.ArgumentParser(description="2D Snake Games")
+    parser.add_argument("--ai", choices=list(snake_ai.POLICIES),
+                        help="watch this AI play (skips the mode menu)")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE,
+                        help=f"game speed in ticks per second (default {TICK_RATE})")
+    parser.add_argument("--fps", type=int, default=FPS, help=f"frames drawn per second (default {FPS})")
+    parser.add_argument("--turbo", type=int, default=0, metavar="N",
+                        help="run N ticks per drawn frame, as fast as possible")
+    parser.add_argument("--seed", type=int, help="seed for food placement (reproducible games)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="save each finished game as a replay (FILE numbered per game: name-1.ext, name-2.ext, ...)")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="watch a recorded game (Left/Right jump, Home restarts, Space pauses)")
+    # /launch appends the player's name, age and country as positional
+    # arguments (as it does for tictactoe.py); they are not used here
+    args, _context = parser.parse_known_args(argv)
+    if args.tick_rate <= 0 or args.fps <= 0 or args.turbo < 0:
+        parser.error("--tick-rate and --fps must be positive and --turbo not negative")
+    if args.seed is not None and not 0 <= args.seed < 2 ** 64:
+        parser.error("--seed must be between 0 and 2**64 - 1")
+
+    if args.replay:
+        try:
+            replay = snake_replay.Replay.load(args.replay)
+        except (OSError, ValueError) as exc:
+            parser.error(f"cannot load replay: {exc}")
+        if (replay.width, replay.height) != (GRID_WIDTH, GRID_HEIGHT):
+            parser.error(f"replay is for a {replay.width}x{replay.height} grid")
+        game = SnakeGame(replay=replay)
+        game.run(tick_rate=args.tick_rate, fps=args.fps, turbo=args.turbo)
+        return
+
+    ai_mode = True if args.ai else select_mode_ui()
+    game = SnakeGame(ai_mode=ai_mode, ai=args.ai,
+                     seed=args.seed, record=args.record)
 
     print("\nControls:")
     print("- Arrow Keys or WASD to move")
     print("- SPACE to restart after game over")
     print("\nStarting game...")
 
-    game.run()
+    game.run(tick_rate=args.tick_rate, fps=args.fps, turbo=args.turbo)
 
 
 def select_mode_ui():
@@ -306,17 +447,18 @@ def select_mode_ui():
         bool: True for AI Mode, False for No AI (player control).
     """
     # Create a temporary window for menu (use MENU_WIDTH/HEIGHT so menu size differs)
+    game_startup.init_pygame()
     screen = pygame.display.set_mode((MENU_WIDTH, MENU_HEIGHT))
     pygame.display.set_caption("2D Snake Games - Select Mode")
-    # Try to set the same icon as the game window (load/generate/fallback)
+    # Try to set the same icon as the game window (cached/loaded/drawn)
     try:
         icon_surf = load_icon_or_create()
         pygame.display.set_icon(icon_surf)
     except Exception:
         pass
 
-    font = pygame.font.Font(None, 48)
-    small_font = pygame.font.Font(None, 32)
+    font = game_startup.font(48)
+    small_font = game_startup.font(32)
 
     button_w = 300
     button_h = 70
@@ -382,6 +524,7 @@ def select_mode_ui():
         screen.blit(foot, foot_rect)
 
         pygame.display.flip()
+        game_startup.first_frame()
         clock.tick(30)
 
     # Clear any pending events (mouse clicks) before starting the game
@@ -0,0 +1,344 @@
+"""snake_ai.py — pluggable Snake AI policies.
+
+A policy is a callable policy(sim) -> Direction (or None to keep going) for a
+snake_core.SnakeSim. make_policy(name, width, height) builds one:
+
+- "greedy": snake_core.greedy_policy, the original closest-to-food move
+- "astar": A* to the food, taken only if the tail is still reachable after
+  eating it; otherwise it chases its tail (or, failing that, heads for the
+  largest open area) until a safe path opens up
+- "hamiltonian": follows a fixed Hamiltonian cycle of the board, taking
+  shortcuts towards the food while they cannot cut off the tail. It cannot
+  die before the board is nearly full, but it is slower to score. Needs an
+  even width or height.
+
+Planners work on flat cell numbers (x + y * width) with neighbour lists and
+search buffers allocated once per grid size and reused every tick: "seen"
+marks are generation stamps, so nothing has to be cleared between searches.
+On the 32x21 board a decision takes well under a millisecond:
+
+    python snake_ai.py --policy astar [--games N]
+"""
+import heapq
+
+from snake_core import Direction, GRID_WIDTH, GRID_HEIGHT, SnakeSim, greedy_policy
+
+DEFAULT_POLICY = "astar"
+
+
+class PathPlanner:
+    """A* / BFS search on one grid size with reusable buffers."""
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.xs = [c % width for c in range(self.cells)]
+        self.ys = [c // width for c in range(self.cells)]
+        self.adjacent = []
+        for c in range(self.cells):
+            x, y = self.xs[c], self.ys[c]
+            self.adjacent.append([nx + ny * width for nx, ny in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+                                  if 0 <= nx < width and 0 <= ny < height])
+        # flat offset -> Direction
+        self.moves = {d.value[0] + d.value[1] * width: d for d in Direction}
+        self._blocked = [0] * self.cells  # == self._block_id when blocked
+        self._seen = [0] * self.cells  # == self._stamp when reached by the current search
+        self._dist = [0] * self.cells
+        self._parent = [0] * self.cells
+        self._queue = [0] * self.cells
+        self._start = 0
+        self._block_id = 0
+        self._stamp = 0
+
+    def cell(self, xy):
+        return xy[0] + xy[1] * self.width
+
+    def direction(self, src, dst):
+        return self.moves[dst - src]
+
+    def block(self, cells):
+        """Mark `cells` as the obstacles for the following searches."""
+        self._block_id += 1
+        block_id = self._block_id
+        blocked = self._blocked
+        for c in cells:
+            blocked[c] = block_id
+
+    def is_blocked(self, c):
+        return self._blocked[c] == self._block_id
+
+    def bfs(self, start, goal=None):
+        """Breadth-first search from `start` around the blocked cells; returns cells reached.
+
+        Stops early once `goal` is reached. Afterwards reached(c), distance(c)
+        and path(c) describe the search.
+        """
+        self._stamp += 1
+        stamp = self._stamp
+        block_id = self._block_id
+        blocked, seen, dist, parent = self._blocked, self._seen, self._dist, self._parent
+        queue, adjacent = self._queue, self.adjacent
+        seen[start] = stamp
+        dist[start] = 0
+        queue[0] = start
+        read, write = 0, 1
+        while read < write:
+            c = queue[read]
+            read += 1
+            if c == goal:
+                break
+            d = dist[c] + 1
+            for n in adjacent[c]:
+                if seen[n] != stamp and blocked[n] != block_id:
+                    seen[n] = stamp
+                    dist[n] = d
+                    parent[n] = c
+                    queue[write] = n
+                    write += 1
+        self._start = start
+        return write
+
+    def reached(self, c):
+        return self._seen[c] == self._stamp
+
+    def distance(self, c):
+        return self._dist[c]
+
+    def path(self, goal):
+        """Cells from the last search's start to `goal` (start excluded), or None if not reached."""
+        if not self.reached(goal):
+            return None
+        parent, start = self._parent, self._start
+        path = []
+        c = goal
+        while c != start:
+            path.append(c)
+            c = parent[c]
+        path.reverse()
+        return path
+
+    def astar(self, start, goal):
+        """Shortest path from `start` to `goal` as a list of cells (start excluded), or None."""
+        self._stamp += 1
+        stamp = self._stamp
+        block_id = self._block_id
+        blocked, seen, dist, parent, adjacent = self._blocked, self._seen, self._dist, self._parent, self.adjacent
+        xs, ys = self.xs, self.ys
+        gx, gy = xs[goal], ys[goal]
+        seen[start] = stamp
+        dist[start] = 0
+        self._start = start
+        # (f, -g, cell): among equal f prefer the deepest node, which keeps
+        # the open set small on an open board
+        heap = [(abs(xs[start] - gx) + abs(ys[start] - gy), 0, start)]
+        while heap:
+            _f, neg_g, c = heapq.heappop(heap)
+            if c == goal:
+                return self.path(goal)
+            g = -neg_g
+            if g > dist[c]:
+                continue
+            g += 1
+            for n in adjacent[c]:
+                if blocked[n] == block_id or (seen[n] == stamp and dist[n] <= g):
+                    continue
+                seen[n] = stamp
+                dist[n] = g
+                parent[n] = c
+                heapq.heappush(heap, (g + abs(xs[n] - gx) + abs(ys[n] - gy), -g, n))
+        return None
+
+
+class AStarPolicy:
+    """Shortest path to the food when it is safe, tail-chasing otherwise.
+
+    A safe path stays safe while it is followed (its cells were free and the
+    body only moves off cells behind the head), so it is planned once per
+    food and then replayed without searching.
+
+    While stalling the food is usually walled off, and A* would expand the
+    whole reachable area through its heap before giving up, so then a plain
+    BFS (which also yields a shortest path) is used instead.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.planner = PathPlanner(width, height)
+        self._path = []
+        self._path_key = None  # (sim, steps, food) the rest of _path is valid for
+        self._stalling = False
+
+    def __call__(self, sim):
+        planner = self.planner
+        if self._path and self._path_key == (id(sim), sim.steps, sim.food):
+            return self._follow(sim, planner.cell(sim.snake[0]))
+        self._path = []
+        width = planner.width
+        body = [x + y * width for x, y in sim.snake]
+        head = body[0]
+        # the tail is blocked too: moving onto it this tick is a collision
+        planner.block(body)
+        moves = [n for n in planner.adjacent[head] if not planner.is_blocked(n)]
+        if not moves:
+            return None
+        if sim.food is not None:
+            food = planner.cell(sim.food)
+            if self._stalling:
+                planner.bfs(head, food)
+                path = planner.path(food)
+            else:
+                path = planner.astar(head, food)
+            if path is not None and self._tail_reachable(path, body):
+                self._stalling = False
+                self._path = path[::-1]
+                return self._follow(sim, head)
+        self._stalling = True
+        return self._chase_tail(body, moves)
+
+    def _follow(self, sim, head):
+        step = self._path.pop()
+        self._path_key = (id(sim), sim.steps + 1, sim.food)
+        return self.planner.direction(head, step)
+
+    def _tail_reachable(self, path, body):
+        # the snake as it would be just after eating: the path, then the old body
+        virtual = (path[::-1] + body)[:len(body) + 1]
+        if len(virtual) >= self.planner.cells - 1:
+            return True
+        planner = self.planner
+        planner.block(virtual[:-1])
+        planner.bfs(virtual[0])
+        return planner.reached(virtual[-1])
+
+    def _chase_tail(self, body, moves):
+        """Of `moves`, one that keeps the tail reachable (furthest from it, to stall), else into the most space."""
+        planner = self.planner
+        head = body[0]
+        planner.block(body[:-1])
+        planner.bfs(body[-1])
+        safe = [n for n in moves if planner.reached(n)]
+        if safe:
+            best = max(safe, key=planner.distance)
+        else:
+            planner.block(body)
+            best = max(moves, key=planner.bfs)
+        return planner.direction(head, best)
+
+
+def hamiltonian_cycle(width, height):
+    """Cell order of a Hamiltonian cycle of the grid (flat cell numbers); ValueError if none exists."""
+    if width < 2 or height < 2 or (width % 2 and height % 2):
+        raise ValueError(f"no Hamiltonian cycle on a {width}x{height} grid")
+    if width % 2:
+        # build it on the transposed grid and swap the coordinates back
+        return [(c // height) + (c % height) * width for c in hamiltonian_cycle(height, width)]
+    # along the top row, then snake through columns right to left below it,
+    # ending in column 0 going up (width is even) back to the start
+    order = [(x, 0) for x in range(width)]
+    for i, x in enumerate(range(width - 1, -1, -1)):
+        rows = range(1, height) if i % 2 == 0 else range(height - 1, 0, -1)
+        order.extend((x, y) for y in rows)
+    return [x + y * width for x, y in order]
+
+
+class HamiltonianPolicy:
+    """Follow a Hamiltonian cycle, cutting ahead along it towards the food when safe."""
+
+    # cells kept free between the head and the tail along the cycle
+    SHORTCUT_MARGIN = 3
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.planner = PathPlanner(width, height)
+        self.cycle = hamiltonian_cycle(width, height)
+        self.order = [0] * self.planner.cells
+        for i, c in enumerate(self.cycle):
+            self.order[c] = i
+
+    def __call__(self, sim):
+        planner = self.planner
+        order = self.order
+        size = planner.cells
+        head = planner.cell(sim.snake[0])
+        length = len(sim.snake)
+        here = order[head]
+        next_cell = self.cycle[(here + 1) % size]
+        budget = 0
+        if length < size // 2 and sim.food is not None:
+            # the body lies behind the head on the cycle, so any cell before the
+            # tail (less a margin for growth) can be jumped to safely
+            tail_gap = (order[planner.cell(sim.snake[-1])] - here) % size
+            food_gap = (order[planner.cell(sim.food)] - here) % size
+            budget = min(tail_gap - self.SHORTCUT_MARGIN - 1, food_gap)
+        best, best_gap = next_cell, 1
+        if (planner.xs[next_cell], planner.ys[next_cell]) in sim.occupied:
+            # off the cycle (e.g. the start position): any free cell ahead on it
+            best, best_gap = None, 0
+            budget = size
+        if budget > 1:
+            occupied = sim.occupied
+            for n in planner.adjacent[head]:
+                gap = (order[n] - here) % size
+                if best_gap < gap <= budget and (planner.xs[n], planner.ys[n]) not in occupied:
+                    best, best_gap = n, gap
+        return None if best is None else planner.direction(head, best)
+
+
+POLICIES = {
+    "greedy": lambda width, height: greedy_policy,
+    "astar": AStarPolicy,
+    "hamiltonian": HamiltonianPolicy,
+}
+
+
+def make_policy(name=DEFAULT_POLICY, width=GRID_WIDTH, height=GRID_HEIGHT):
+    """Policy callable `name` (a key of POLICIES) for a width x height grid."""
+    try:
+        factory = POLICIES[name]
+    except KeyError:
+        raise ValueError(f"unknown policy {name!r} (choose from {', '.join(POLICIES)})")
+    return factory(width, height)
+
+
+def evaluate(name=DEFAULT_POLICY, games=10, seed=0, max_steps=100000):
+    """Play `games` games with policy `name`; returns score and per-decision timing stats."""
+    import random
+    import statistics
+    import time
+
+    sim = SnakeSim(rng=random.Random(seed))
+    policy = make_policy(name, sim.width, sim.height)
+    scores = []
+    timings = []
+    for _ in range(games):
+        sim.reset()
+        while not sim.game_over and sim.steps < max_steps:
+            start = time.perf_counter()
+            action = policy(sim)
+            timings.append(time.perf_counter() - start)
+            sim.step(action)
+        scores.append(sim.score)
+    timings.sort()
+    return {
+        "policy": name,
+        "games": games,
+        "mean_score": statistics.mean(scores),
+        "max_score": max(scores),
+        "decisions": len(timings),
+        "mean_ms": 1000 * statistics.mean(timings),
+        "p99_ms": 1000 * timings[int(0.99 * (len(timings) - 1))],
+        "max_ms": 1000 * timings[-1],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="snake_ai - evaluate a Snake AI policy headless")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default=DEFAULT_POLICY)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    r = evaluate(args.policy, args.games, args.seed)
+    print(f"{r['policy']}: mean score {r['mean_score']:.0f} (max {r['max_score']}) over {r['games']} games; "
+          f"{r['decisions']} decisions, mean {r['mean_ms']:.3f} ms, p99 {r['p99_ms']:.3f} ms, max {r['max_ms']:.3f} ms")
@@ -0,0 +1,205 @@
+"""snake_batch.py — N Snake games stepped together with NumPy.
+
+Provided:
+- DIRECTIONS / DELTAS / OPPOSITE_INDEX: the Direction enum as action indices
+- BatchSnakeEnv: N games as arrays, step(actions) for all of them at once,
+  automatic reset of finished games and observation tensors
+
+The rules are the same as snake_core.SnakeSim (same start position, reversals
+ignored, moving into the current tail cell is a collision), and the grid size
+and Direction come from snake_core, so results are comparable. Only food
+placement differs, because it uses NumPy's generator instead of `random`.
+
+State per game (N games, H x W grid, cells numbered y * W + x):
+- grid      (N, H, W) uint8, 1 where the snake is
+- body      (N, H * W) ring buffer of body cells; body[i, head_ptr[i]] is the
+            head and the tail is `length - 1` entries behind it
+- food      (N,) cell index, -1 when the board is full
+- direction (N,) index into DIRECTIONS
+
+    python snake_batch.py --bench [--games N] [--steps T]
+"""
+import numpy as np
+
+from snake_core import (Direction, OPPOSITE, GRID_WIDTH, GRID_HEIGHT, FOOD_SCORE,
+                        REWARD_FOOD, REWARD_DEATH)
+
+DIRECTIONS = tuple(Direction)
+DELTAS = np.array([d.value for d in DIRECTIONS], dtype=np.int64)
+OPPOSITE_INDEX = np.array([DIRECTIONS.index(OPPOSITE[d]) for d in DIRECTIONS], dtype=np.int64)
+RIGHT = DIRECTIONS.index(Direction.RIGHT)
+
+# death codes in step() infos; DEATH_NAMES matches SnakeSim.death
+DEATH_NONE = 0
+DEATH_WALL = 1
+DEATH_SELF = 2
+DEATH_NAMES = (None, "wall", "self")
+
+# observation channels
+OBS_BODY = 0
+OBS_HEAD = 1
+OBS_FOOD = 2
+OBS_CHANNELS = 3
+
+
+class BatchSnakeEnv:
+    """`num_games` independent Snake games advanced in lock-step.
+
+    step(actions) takes one action per game (an index into DIRECTIONS, or -1
+    to keep going) and returns (obs, rewards, dones, infos). Games that end
+    are reset straight away, so `obs` already shows their new start; their
+    final score, length and death cause are in `infos` (valid where done).
+
+    Observations are (N, 3, H, W) float32 planes: body, head, food. They are
+    written into one preallocated buffer, so copy them if you keep them
+    across steps.
+    """
+
+    def __init__(self, num_games, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+        self.num_games = num_games
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+
+        self.grid = np.zeros((num_games, height, width), dtype=np.uint8)
+        self._grid_flat = self.grid.reshape(num_games, self.cells)
+        self.body = np.zeros((num_games, self.cells), dtype=np.int64)
+        self.head_ptr = np.zeros(num_games, dtype=np.int64)
+        self.length = np.zeros(num_games, dtype=np.int64)
+        self.food = np.full(num_games, -1, dtype=np.int64)
+        self.direction = np.zeros(num_games, dtype=np.int64)
+        self.score = np.zeros(num_games, dtype=np.int64)
+        self.steps = np.zeros(num_games, dtype=np.int64)
+        self.obs = np.zeros((num_games, OBS_CHANNELS, height, width), dtype=np.float32)
+        self._obs_flat = self.obs.reshape(num_games, OBS_CHANNELS, self.cells)
+        self._rows = np.arange(num_games)
+
+        start_x = width // 2
+        start_y = height // 2
+        # tail first, so the head ends up at body[:, 2]
+        self._start = np.array([start_y * width + start_x - 2,
+                                start_y * width + start_x - 1,
+                                start_y * width + start_x], dtype=np.int64)
+
+    def reset(self, mask=None):
+        """Reset all games (or those where `mask` is True); returns observations."""
+        rows = self._rows if mask is None else np.flatnonzero(mask)
+        if len(rows):
+            self.grid[rows] = 0
+            self.body[rows, :3] = self._start
+            self._grid_flat[rows[:, None], self._start] = 1
+            self.head_ptr[rows] = 2
+            self.length[rows] = 3
+            self.direction[rows] = RIGHT
+            self.score[rows] = 0
+            self.steps[rows] = 0
+            self._spawn_food(rows)
+        return self.observe()
+
+    def _spawn_food(self, rows):
+        # one uniform pick among each game's free cells: the r-th free cell is
+        # where the running count of free cells first exceeds r
+        free = self._grid_flat[rows] == 0
+        counts = free.sum(axis=1)
+        picks = (self.rng.random(len(rows)) * counts).astype(np.int64)
+        cells = np.argmax(np.cumsum(free, axis=1) > picks[:, None], axis=1)
+        self.food[rows] = np.where(counts > 0, cells, -1)
+
+    def heads(self):
+        """(N,) head cell index of every game."""
+        return self.body[self._rows, self.head_ptr]
+
+    def tails(self):
+        """(N,) tail cell index of every game."""
+        return self.body[self._rows, (self.head_ptr - self.length + 1) % self.cells]
+
+    def step(self, actions=None):
+        """Advance every game one tick; returns (obs, rewards, dones, infos)."""
+        rows = self._rows
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            turn = (actions >= 0) & (actions != OPPOSITE_INDEX[self.direction])
+            self.direction = np.where(turn, actions, self.direction)
+
+        head = self.heads()
+        delta = DELTAS[self.direction]
+        new_x = head % self.width + delta[:, 0]
+        new_y = head // self.width + delta[:, 1]
+        wall = (new_x < 0) | (new_x >= self.width) | (new_y < 0) | (new_y >= self.height)
+        new_head = np.where(wall, 0, new_y * self.width + new_x)
+        # the tail has not moved yet, so running into it is a collision too
+        hit_self = ~wall & (self._grid_flat[rows, new_head] != 0)
+        dones = wall | hit_self
+        alive = ~dones
+        eat = alive & (new_head == self.food)
+        self.steps += 1
+
+        move = np.flatnonzero(alive & ~eat)
+        self._grid_flat[move, self.tails()[move]] = 0
+        moved = np.flatnonzero(alive)
+        self.head_ptr[moved] = (self.head_ptr[moved] + 1) % self.cells
+        self.body[moved, self.head_ptr[moved]] = new_head[moved]
+        self._grid_flat[moved, new_head[moved]] = 1
+        eaten = np.flatnonzero(eat)
+        if len(eaten):
+            self.length[eaten] += 1
+            self.score[eaten] += FOOD_SCORE
+            self._spawn_food(eaten)
+
+        rewards = np.where(eat, REWARD_FOOD, np.where(dones, REWARD_DEATH, 0.0)).astype(np.float32)
+        death = np.where(wall, DEATH_WALL, np.where(hit_self, DEATH_SELF, DEATH_NONE))
+        infos = {"score": self.score.copy(), "length": self.length.copy(),
+                 "steps": self.steps.copy(), "death": death}
+        if dones.any():
+            self.reset(dones)
+        else:
+            self.observe()
+        return self.obs, rewards, dones, infos
+
+    def observe(self):
+        """Fill and return the (N, 3, H, W) observation buffer."""
+        obs = self._obs_flat
+        obs[:, OBS_BODY] = self._grid_flat
+        obs[:, OBS_HEAD:] = 0
+        obs[self._rows, OBS_HEAD, self.heads()] = 1.0
+        has_food = np.flatnonzero(self.food >= 0)
+        obs[has_food, OBS_FOOD, self.food[has_food]] = 1.0
+        return self.obs
+
+    def snake_cells(self, i):
+        """Body of game `i` as a list of (x, y), head first (as SnakeSim.snake)."""
+        idx = (self.head_ptr[i] - np.arange(self.length[i])) % self.cells
+        return [(int(c) % self.width, int(c) // self.width) for c in self.body[i, idx]]
+
+
+def benchmark(num_games=1024, steps=1000, seed=0):
+    """Step `num_games` games with random actions; returns (game steps/sec, games finished)."""
+    import time
+
+    env = BatchSnakeEnv(num_games, seed=seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(-1, len(DIRECTIONS), size=(steps, num_games))
+    finished = 0
+    start = time.perf_counter()
+    for t in range(steps):
+        _obs, _rewards, dones, _infos = env.step(actions[t])
+        finished += int(dones.sum())
+    return num_games * steps / (time.perf_counter() - start), finished
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="snake_batch - vectorized Snake games")
+    parser.add_argument("--bench", action="store_true", help="measure game steps per second")
+    parser.add_argument("--games", type=int, default=1024, help="games stepped together")
+    parser.add_argument("--steps", type=int, default=1000, help="ticks to run for --bench")
+    args = parser.parse_args()
+
+    if args.bench:
+        rate, games = benchmark(args.games, args.steps)
+        print(f"{rate:,.0f} game steps/s ({games} games finished, {args.games} in parallel)")
+    else:
+        parser.print_help()
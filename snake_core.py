@@ -0,0 +1,230 @@
+"""snake_core.py — display-free Snake simulation used by snake.py.
+
+Provided:
+- grid constants (GRID_WIDTH, GRID_HEIGHT, ...) and the Direction enum
+- SnakeSim: game state plus step(action) -> (reward, done), with an
+  optional per-game seed and snapshot()/restore() of the full state
+- greedy_policy(sim): the original "closest to food" AI move
+
+Nothing here imports pygame, so games can run server-side, in tests, or
+much faster than real time:
+
+    python snake_core.py --bench [--steps N]
+"""
+import random
+from collections import deque
+from enum import Enum
+
+# Window/grid geometry shared with the pygame front end
+WINDOW_WIDTH = 640
+WINDOW_HEIGHT = 480
+GRID_SIZE = 20
+# Reserve some rows at the top for title/score (no grid there)
+TOP_ROWS = 3
+GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
+# Number of playable rows
+GRID_HEIGHT = (WINDOW_HEIGHT // GRID_SIZE) - TOP_ROWS
+
+FOOD_SCORE = 10
+# step() rewards
+REWARD_FOOD = 1.0
+REWARD_DEATH = -1.0
+
+
+class Direction(Enum):
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+
+
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
+
+class SnakeSim:
+    """One game of Snake on a `width` x `height` grid.
+
+    `snake` is a deque of (x, y) cells, head first. step(action) turns to
+    `action` (a Direction; None or a reversal keeps the current heading),
+    moves one cell and returns (reward, done). After a death `game_over` is
+    True, `death` is "wall" or "self", and step() does nothing until reset().
+
+    Alongside the deque, `occupied` is the set of snake cells and `free_cells`
+    lists every other cell (with `_free_index` mapping cell -> position), so
+    collision checks and food spawning are O(1) however long the snake gets.
+    `food` is None once the snake fills the whole board.
+
+    Food placement is the only randomness. Pass `seed` (or reset(seed)) to
+    give the game its own random.Random, so the same seed and the same moves
+    always replay the same game; `rng` can supply any other generator.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, rng=None, seed=None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        if seed is not None:
+            rng = random.Random(seed)
+        self.rng = rng if rng is not None else random
+        start_x = width // 2
+        start_y = height // 2
+        self._start = ((start_x, start_y), (start_x - 1, start_y), (start_x - 2, start_y))
+        # reset() copies these instead of rebuilding them cell by cell
+        self._start_free = [(x, y) for y in range(height) for x in range(width)
+                            if (x, y) not in self._start]
+        self._start_index = {cell: i for i, cell in enumerate(self._start_free)}
+        self.reset()
+
+    def reset(self, seed=None):
+        """Reset the game state (reseeding this game's generator if `seed` is given)"""
+        if seed is not None:
+            self.seed = seed
+            self.rng = random.Random(seed)
+        self.snake = deque(self._start)
+        self.occupied = set(self._start)
+        self.free_cells = self._start_free.copy()
+        self._free_index = self._start_index.copy()
+        self.direction = Direction.RIGHT
+        self.score = 0
+        self.steps = 0
+        self.game_over = False
+        self.death = None
+        self.food = self.spawn_food()
+
+    def snapshot(self):
+        """Everything needed to continue this game exactly; see restore()."""
+        rng_state = self.rng.getstate() if isinstance(self.rng, random.Random) else None
+        return (tuple(self.snake), self.direction, self.score, self.steps, self.game_over,
+                self.death, self.food, tuple(self.free_cells), rng_state)
+
+    def restore(self, state):
+        """Return to a snapshot() of a game on the same size grid."""
+        snake, self.direction, self.score, self.steps, self.game_over, self.death, self.food, free, rng_state = state
+        self.snake = deque(snake)
+        self.occupied = set(snake)
+        # the free list order decides where food spawns, so it is restored as is
+        self.free_cells = list(free)
+        self._free_index = {cell: i for i, cell in enumerate(self.free_cells)}
+        if rng_state is not None:
+            if not isinstance(self.rng, random.Random):
+                self.rng = random.Random()
+            self.rng.setstate(rng_state)
+
+    def spawn_food(self):
+        """Spawn food at a random free cell (one pick, no retries); None if the board is full"""
+        if not self.free_cells:
+            return None
+        return self.free_cells[self.rng.randrange(len(self.free_cells))]
+
+    def is_free(self, cell):
+        """True if `cell` is on the grid and not part of the snake."""
+        x, y = cell
+        return 0 <= x < self.width and 0 <= y < self.height and cell not in self.occupied
+
+    def _take_free(self, cell):
+        # swap-remove `cell` from free_cells in O(1)
+        i = self._free_index.pop(cell)
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[i] = last
+            self._free_index[last] = i
+
+    def _add_free(self, cell):
+        self._free_index[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+    def step(self, action=None):
+        """Advance one tick; returns (reward, done)."""
+        if self.game_over:
+            return 0.0, True
+        if action is not None and action is not OPPOSITE[self.direction]:
+            self.direction = action
+
+        head_x, head_y = self.snake[0]
+        dx, dy = self.direction.value
+        new_head = (head_x + dx, head_y + dy)
+        self.steps += 1
+
+        # Check collision with walls
+        if not (0 <= new_head[0] < self.width and 0 <= new_head[1] < self.height):
+            self.game_over = True
+            self.death = "wall"
+            return REWARD_DEATH, True
+        # Check collision with self (the tail has not moved yet)
+        if new_head in self.occupied:
+            self.game_over = True
+            self.death = "self"
+            return REWARD_DEATH, True
+
+        self.snake.appendleft(new_head)
+        self.occupied.add(new_head)
+        self._take_free(new_head)
+        # Check if food is eaten
+        if new_head == self.food:
+            self.score += FOOD_SCORE
+            self.food = self.spawn_food()
+            return REWARD_FOOD, False
+        tail = self.snake.pop()
+        self.occupied.discard(tail)
+        self._add_free(tail)
+        return 0.0, False
+
+
+def greedy_policy(sim):
+    """Move to the free neighbour closest (Manhattan) to the food.
+
+    Returns a Direction, or None to keep going when no neighbour is free or
+    the best one would reverse the snake.
+    """
+    if sim.food is None:
+        return None
+    head_x, head_y = sim.snake[0]
+    food_x, food_y = sim.food
+    best = None
+    for direction in Direction:
+        new_x = head_x + direction.value[0]
+        new_y = head_y + direction.value[1]
+        if sim.is_free((new_x, new_y)):
+            distance = abs(new_x - food_x) + abs(new_y - food_y)
+            # strict < keeps the first of equally good moves, as min() did
+            if best is None or distance < best[0]:
+                best = (distance, direction)
+    if best is None or best[1] is OPPOSITE[sim.direction]:
+        return None
+    return best[1]
+
+
+def benchmark(steps=200000, policy=greedy_policy):
+    """Run headless games for `steps` ticks; returns (steps/sec, games finished)."""
+    import time
+
+    sim = SnakeSim()
+    games = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        _reward, done = sim.step(policy(sim) if policy else None)
+        if done:
+            games += 1
+            sim.reset()
+    return steps / (time.perf_counter() - start), games
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="snake_core - headless Snake simulation")
+    parser.add_argument("--bench", action="store_true", help="measure headless steps per second")
+    parser.add_argument("--steps", type=int, default=200000, help="ticks to run for --bench")
+    parser.add_argument("--no-ai", action="store_true", help="benchmark bare step() without the greedy AI")
+    args = parser.parse_args()
+
+    if args.bench:
+        rate, games = benchmark(args.steps, None if args.no_ai else greedy_policy)
+        print(f"{rate:,.0f} steps/s ({games} games finished in {args.steps} steps)")
+    else:
+        parser.print_help()
@@ -0,0 +1,456 @@
+"""snake_env.py — Gym-style Snake environment for training learned policies.
+
+Provided:
+- SnakeEnv: reset(seed) -> (obs, info) and step(action) -> (obs, reward,
+  terminated, truncated, info) on a configurable width x height grid
+- SyncVectorEnv: N envs stepped in this process
+- SubprocVectorEnv: N envs split over worker processes that read actions
+  from, and write observations/rewards into, shared memory
+
+Observation encodings (`obs=`):
+- "grid":     (3, H, W) float32 one-hot planes: body, head, food
+- "features": (14,) float32 vector, see FEATURES
+- "ego":      (2, V, V) float32 view of `view` x `view` cells centred on the
+              head and turned so the snake always faces up: obstacles
+              (body and walls), food
+
+Actions are indices into snake_batch.DIRECTIONS (a reversal is ignored, as
+in SnakeSim). Observations are written in place into one preallocated
+buffer per env (the vector envs pass each env a slice of their own batch
+buffer), so reading them never copies; copy them if you keep them across
+steps. The grid and ego encodings are updated incrementally (head, tail and
+food cells) rather than rebuilt every step.
+
+If gymnasium is installed SnakeEnv is a gymnasium.Env with observation and
+action spaces; otherwise it has the same methods without the base class.
+
+    python snake_env.py --bench [--obs grid|features|ego] [--envs N] [--workers W]
+"""
+import numpy as np
+
+from snake_core import GRID_WIDTH, GRID_HEIGHT, SnakeSim
+from snake_batch import DIRECTIONS, DEATH_NAMES
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+    HAS_GYM = True
+except ImportError:
+    gymnasium = None
+    HAS_GYM = False
+
+ENCODINGS = ("grid", "features", "ego")
+FEATURES = (
+    "danger_ahead", "danger_left", "danger_right",
+    "dir_up", "dir_down", "dir_left", "dir_right",
+    "food_up", "food_down", "food_left", "food_right",
+    "food_dx", "food_dy", "length",
+)
+DEATH_CODES = {name: code for code, name in enumerate(DEATH_NAMES)}
+
+
+def observation_shape(obs, width, height, view):
+    if obs == "grid":
+        return (3, height, width)
+    if obs == "features":
+        return (len(FEATURES),)
+    if obs == "ego":
+        return (2, view, view)
+    raise ValueError(f"unknown observation encoding {obs!r} (choose from {', '.join(ENCODINGS)})")
+
+
+class SnakeEnv(gymnasium.Env if HAS_GYM else object):
+    """One Snake game with the Gymnasium reset/step API.
+
+    An episode is truncated after `max_steps` ticks, or after `max_idle`
+    ticks without eating (default: one per grid cell), so a policy that
+    circles forever still ends. `out`, if given, is the float32 array of
+    observation_shape(...) the observations are written into.
+    """
+
+    metadata = {"render_modes": ["ansi"]}
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, obs="grid", view=11,
+                 max_steps=None, max_idle=None, seed=None, out=None):
+        if width < 4 or height < 2:
+            raise ValueError("the grid must be at least 4 x 2")
+        if view < 3 or view % 2 == 0:
+            raise ValueError("view must be an odd number >= 3")
+        self.width = width
+        self.height = height
+        self.encoding = obs
+        self.view = view
+        self.max_steps = max_steps
+        self.max_idle = max_idle or width * height
+        self.sim = SnakeSim(width, height, seed=seed)
+        shape = observation_shape(obs, width, height, view)
+        if out is None:
+            out = np.zeros(shape, dtype=np.float32)
+        elif out.shape != shape or out.dtype != np.float32:
+            raise ValueError(f"out must be a float32 array of shape {shape}")
+        self.obs = out
+        self._idle = 0
+
+        if obs == "ego":
+            # padded maps, so every view cell around any head is in range
+            pad = view // 2
+            self._pad = pad
+            self._pw = width + 2 * pad
+            self._walls = np.ones((height + 2 * pad, self._pw), dtype=np.float32)
+            self._walls[pad:pad + height, pad:pad + width] = 0
+            self._blocked = self._walls.copy()
+            self._food_map = np.zeros_like(self._walls)
+            # flat offsets of each view cell from the head, per heading: row 0
+            # is ahead, the right-hand columns are to the snake's right
+            rows, cols = np.mgrid[0:view, 0:view]
+            ahead = pad - rows
+            right = cols - pad
+            self._view_offsets = []
+            for d in DIRECTIONS:
+                fx, fy = d.value
+                rx, ry = -fy, fx
+                dx = ahead * fx + right * rx
+                dy = ahead * fy + right * ry
+                self._view_offsets.append((dy * self._pw + dx).astype(np.intp))
+
+        if HAS_GYM:
+            self.observation_space = spaces.Box(-1.0, 1.0, shape, dtype=np.float32)
+            self.action_space = spaces.Discrete(len(DIRECTIONS))
+
+    def reset(self, seed=None, options=None):
+        """Start a new episode (reseeding food placement if `seed` is given)."""
+        self.sim.reset(seed)
+        self._idle = 0
+        self._write_full()
+        return self.obs, self._info()
+
+    def step(self, action):
+        sim = self.sim
+        prev_head, prev_tail, prev_food = sim.snake[0], sim.snake[-1], sim.food
+        reward, terminated = sim.step(None if action is None else DIRECTIONS[int(action)])
+        if not terminated:
+            self._write_move(prev_head, prev_tail, prev_food, ate=reward > 0)
+        self._idle = 0 if reward > 0 else self._idle + 1
+        truncated = not terminated and (self._idle >= self.max_idle or
+                                        (self.max_steps is not None and sim.steps >= self.max_steps))
+        return self.obs, reward, terminated, truncated, self._info()
+
+    def _info(self):
+        return {"score": self.sim.score, "steps": self.sim.steps, "death": self.sim.death}
+
+    def render(self):
+        """The board as text: H head, o body, * food."""
+        rows = [["."] * self.width for _ in range(self.height)]
+        for x, y in self.sim.snake:
+            rows[y][x] = "o"
+        hx, hy = self.sim.snake[0]
+        rows[hy][hx] = "H"
+        if self.sim.food is not None:
+            fx, fy = self.sim.food
+            rows[fy][fx] = "*"
+        return "\n".join("".join(row) for row in rows)
+
+    # observation writers -------------------------------------------------
+
+    def _write_full(self):
+        sim = self.sim
+        if self.encoding == "grid":
+            obs = self.obs
+            obs[:] = 0
+            for x, y in sim.snake:
+                obs[0, y, x] = 1.0
+            hx, hy = sim.snake[0]
+            obs[1, hy, hx] = 1.0
+            if sim.food is not None:
+                obs[2, sim.food[1], sim.food[0]] = 1.0
+        elif self.encoding == "ego":
+            pad = self._pad
+            np.copyto(self._blocked, self._walls)
+            self._food_map[:] = 0
+            for x, y in sim.snake:
+                self._blocked[y + pad, x + pad] = 1.0
+            if sim.food is not None:
+                self._food_map[sim.food[1] + pad, sim.food[0] + pad] = 1.0
+            self._write_ego()
+        else:
+            self._write_features()
+
+    def _write_move(self, prev_head, prev_tail, prev_food, ate):
+        # only the head, the vacated tail and the food cells changed
+        sim = self.sim
+        head = sim.snake[0]
+        if self.encoding == "grid":
+            obs = self.obs
+            obs[0, head[1], head[0]] = 1.0
+            obs[1, prev_head[1], prev_head[0]] = 0.0
+            obs[1, head[1], head[0]] = 1.0
+            if not ate:
+                obs[0, prev_tail[1], prev_tail[0]] = 0.0
+            elif prev_food is not None:
+                obs[2, prev_food[1], prev_food[0]] = 0.0
+                if sim.food is not None:
+                    obs[2, sim.food[1], sim.food[0]] = 1.0
+        elif self.encoding == "ego":
+            pad = self._pad
+            self._blocked[head[1] + pad, head[0] + pad] = 1.0
+            if not ate:
+                self._blocked[prev_tail[1] + pad, prev_tail[0] + pad] = 0.0
+            elif prev_food is not None:
+                self._food_map[prev_food[1] + pad, prev_food[0] + pad] = 0.0
+                if sim.food is not None:
+                    self._food_map[sim.food[1] + pad, sim.food[0] + pad] = 1.0
+            self._write_ego()
+        else:
+            self._write_features()
+
+    def _write_ego(self):
+        sim = self.sim
+        hx, hy = sim.snake[0]
+        centre = (hy + self._pad) * self._pw + hx + self._pad
+        index = self._view_offsets[DIRECTIONS.index(sim.direction)] + centre
+        np.take(self._blocked, index, out=self.obs[0])
+        np.take(self._food_map, index, out=self.obs[1])
+
+    def _write_features(self):
+        sim = self.sim
+        obs = self.obs
+        hx, hy = sim.snake[0]
+        fx, fy = sim.direction.value
+        # ahead, left (counter-clockwise) and right of the current heading
+        for i, (dx, dy) in enumerate(((fx, fy), (fy, -fx), (-fy, fx))):
+            obs[i] = 0.0 if sim.is_free((hx + dx, hy + dy)) else 1.0
+        for i, d in enumerate(DIRECTIONS):
+            obs[3 + i] = 1.0 if sim.direction is d else 0.0
+        if sim.food is None:
+            obs[7:13] = 0.0
+        else:
+            food_x, food_y = sim.food
+            obs[7] = 1.0 if food_y < hy else 0.0
+            obs[8] = 1.0 if food_y > hy else 0.0
+            obs[9] = 1.0 if food_x < hx else 0.0
+            obs[10] = 1.0 if food_x > hx else 0.0
+            obs[11] = (food_x - hx) / self.width
+            obs[12] = (food_y - hy) / self.height
+        obs[13] = len(sim.snake) / (self.width * self.height)
+
+
+class SyncVectorEnv:
+    """`num_envs` SnakeEnvs stepped one after another, with automatic reset.
+
+    step(actions) returns (obs, rewards, terminated, truncated, infos) as
+    arrays over the envs. `obs` is one (num_envs, ...) buffer every env
+    writes into directly. An env that finishes is reset straight away, so
+    its row already shows the next episode; infos["score"], ["steps"] and
+    ["death"] (codes, see DEATH_CODES) describe the episode that just ended.
+    """
+
+    def __init__(self, num_envs, **env_kwargs):
+        width = env_kwargs.get("width", GRID_WIDTH)
+        height = env_kwargs.get("height", GRID_HEIGHT)
+        shape = observation_shape(env_kwargs.get("obs", "grid"), width, height, env_kwargs.get("view", 11))
+        self.num_envs = num_envs
+        self.obs = np.zeros((num_envs,) + shape, dtype=np.float32)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.death = np.zeros(num_envs, dtype=np.int8)
+        self.envs = [SnakeEnv(out=self.obs[i], **env_kwargs) for i in range(num_envs)]
+
+    def reset(self, seed=None):
+        _reset_envs(self.envs, 0, seed)
+        return self.obs, {}
+
+    def step(self, actions):
+        _step_envs(self.envs, 0, actions, self.rewards, self.terminated, self.truncated,
+                   self.score, self.steps, self.death)
+        return self.obs, self.rewards, self.terminated, self.truncated, \
+            {"score": self.score, "steps": self.steps, "death": self.death}
+
+    def close(self):
+        pass
+
+
+def _reset_envs(envs, first, seed):
+    for i, env in enumerate(envs):
+        env.reset(None if seed is None else seed + first + i)
+
+
+def _step_envs(envs, first, actions, rewards, terminated, truncated, score, steps, death):
+    # envs[i] is row first + i of the shared arrays
+    for i, env in enumerate(envs):
+        row = first + i
+        _obs, rewards[row], terminated[row], truncated[row], info = env.step(actions[row])
+        score[row] = info["score"]
+        steps[row] = info["steps"]
+        death[row] = DEATH_CODES[info["death"]]
+        if terminated[row] or truncated[row]:
+            env.reset()
+
+
+def _subproc_worker(conn, specs, first, count, env_kwargs):
+    from multiprocessing import shared_memory
+
+    blocks = {}
+    arrays = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        # workers share the parent's resource tracker, which already knows
+        # about (and the parent unlinks) every block
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks[name] = shm
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    envs = [SnakeEnv(out=arrays["obs"][first + i], **env_kwargs) for i in range(count)]
+    try:
+        while True:
+            command, arg = conn.recv()
+            if command == "step":
+                _step_envs(envs, first, arrays["actions"], arrays["rewards"], arrays["terminated"],
+                           arrays["truncated"], arrays["score"], arrays["steps"], arrays["death"])
+            elif command == "reset":
+                _reset_envs(envs, first, arg)
+            elif command == "close":
+                break
+            conn.send(None)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        envs = arrays = None
+        for shm in blocks.values():
+            shm.close()
+
+
+class SubprocVectorEnv(SyncVectorEnv):
+    """Like SyncVectorEnv, with the envs split over `num_workers` processes.
+
+    Actions, observations, rewards and the episode arrays live in shared
+    memory: step() writes the actions, sends each worker a one-word command
+    and returns views of the arrays the workers filled in, so no
+    observation is ever pickled or copied between processes.
+    """
+
+    def __init__(self, num_envs, num_workers=None, context=None, **env_kwargs):
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        width = env_kwargs.get("width", GRID_WIDTH)
+        height = env_kwargs.get("height", GRID_HEIGHT)
+        shape = observation_shape(env_kwargs.get("obs", "grid"), width, height, env_kwargs.get("view", 11))
+        SnakeEnv(**env_kwargs)  # validate the arguments here rather than in every worker
+        self.num_envs = num_envs
+        layout = {
+            "obs": ((num_envs,) + shape, np.float32),
+            "actions": ((num_envs,), np.int64),
+            "rewards": ((num_envs,), np.float32),
+            "terminated": ((num_envs,), bool),
+            "truncated": ((num_envs,), bool),
+            "score": ((num_envs,), np.int64),
+            "steps": ((num_envs,), np.int64),
+            "death": ((num_envs,), np.int8),
+        }
+        self._blocks = []
+        specs = {}
+        for name, (arr_shape, dtype) in layout.items():
+            size = max(1, int(np.prod(arr_shape)) * np.dtype(dtype).itemsize)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks.append(shm)
+            setattr(self, name, np.ndarray(arr_shape, dtype=dtype, buffer=shm.buf))
+            specs[name] = (shm.name, arr_shape, dtype)
+
+        ctx = context or multiprocessing.get_context()
+        num_workers = max(1, min(num_workers or 2, num_envs))
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._conns = []
+        self._procs = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_subproc_worker, args=(child, specs, int(lo), int(hi - lo), env_kwargs),
+                               daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self.envs = None
+        self._closed = False
+
+    def _command(self, command, arg=None):
+        for conn in self._conns:
+            conn.send((command, arg))
+        for conn in self._conns:
+            conn.recv()
+
+    def reset(self, seed=None):
+        self._command("reset", seed)
+        return self.obs, {}
+
+    def step(self, actions):
+        self.actions[:] = actions
+        self._command("step")
+        return self.obs, self.rewards, self.terminated, self.truncated, \
+            {"score": self.score, "steps": self.steps, "death": self.death}
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except OSError:
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for name in ("obs", "actions", "rewards", "terminated", "truncated", "score", "steps", "death"):
+            setattr(self, name, None)
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def benchmark(obs="grid", num_envs=8, workers=0, steps=2000, seed=0):
+    """Random-action env steps per second; workers=0 uses SyncVectorEnv."""
+    import time
+
+    venv = SubprocVectorEnv(num_envs, workers, obs=obs) if workers else SyncVectorEnv(num_envs, obs=obs)
+    try:
+        venv.reset(seed)
+        actions = np.random.default_rng(seed).integers(0, len(DIRECTIONS), size=(steps, num_envs))
+        start = time.perf_counter()
+        for t in range(steps):
+            venv.step(actions[t])
+        return num_envs * steps / (time.perf_counter() - start)
+    finally:
+        venv.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="snake_env - Gym-style Snake environment")
+    parser.add_argument("--bench", action="store_true", help="measure env steps per second")
+    parser.add_argument("--obs", choices=ENCODINGS, default="grid")
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=0, help="subprocess workers (0 = in-process)")
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.bench:
+        rate = benchmark(args.obs, args.envs, args.workers, args.steps)
+        kind = f"{args.workers} workers" if args.workers else "in-process"
+        print(f"{rate:,.0f} env steps/s ({args.obs}, {args.envs} envs, {kind})")
+    else:
+        parser.print_help()
@@ -0,0 +1,150 @@
+"""snake_replay.py — compact, deterministic Snake replays.
+
+A game is fully determined by its seed (see SnakeSim(seed=...)) and the
+direction the snake moved on each tick, so that is all a replay stores:
+
+    header  struct "<4sBHHQII": b"SNKR", version, width, height, seed,
+            ticks, final score
+    moves   2 bits per tick (an index into DIRECTIONS), four ticks per byte,
+            first tick in the lowest bits
+
+A 10,000-tick game is about 2.5 KB.
+
+Provided:
+- Recorder: collects the moves of a game as it is played; save(path)
+- Replay: loads a replay and re-simulates it. seek(tick) restores the nearest
+  keyframe (a SnakeSim.snapshot() taken every KEYFRAME_INTERVAL ticks while
+  loading) and steps forward from there, so any tick is reached in at most
+  KEYFRAME_INTERVAL steps.
+
+    python snake_replay.py FILE [--tick N]    # summary, or the state at tick N
+"""
+import random
+import struct
+
+from snake_core import Direction, SnakeSim
+
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHQII")
+DIRECTIONS = tuple(Direction)
+DIRECTION_CODES = {d: i for i, d in enumerate(DIRECTIONS)}
+KEYFRAME_INTERVAL = 256
+
+
+def new_seed(rng=None):
+    """A random 64-bit game seed."""
+    return (rng or random.SystemRandom()).getrandbits(64)
+
+
+class Recorder:
+    """Moves of one game as it is played, packed as they arrive."""
+
+    def __init__(self, seed, width, height):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.ticks = 0
+        self.score = 0
+        self.moves = bytearray()
+
+    def record(self, sim):
+        """Record the tick `sim` just made (call after each step() that moved or died)."""
+        if self.ticks & 3 == 0:
+            self.moves.append(0)
+        self.moves[-1] |= DIRECTION_CODES[sim.direction] << ((self.ticks & 3) << 1)
+        self.ticks += 1
+        self.score = sim.score
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, self.width, self.height, self.seed,
+                           self.ticks, self.score) + bytes(self.moves)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    """A recorded game that can be stepped through or jumped around in."""
+
+    def __init__(self, data):
+        if len(data) < HEADER.size:
+            raise ValueError("not a Snake replay (too short)")
+        magic, version, self.width, self.height, self.seed, self.ticks, self.score = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Snake replay (bad magic)")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        self.moves = bytes(data[HEADER.size:])
+        if len(self.moves) != (self.ticks + 3) // 4:
+            raise ValueError("replay is truncated")
+        self.sim = SnakeSim(self.width, self.height, seed=self.seed)
+        self.keyframes = []
+        self._build_keyframes()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def move(self, tick):
+        """Direction the snake moved on tick `tick` (0-based)."""
+        return DIRECTIONS[(self.moves[tick >> 2] >> ((tick & 3) << 1)) & 3]
+
+    @property
+    def tick(self):
+        """Ticks played so far in `sim`."""
+        return self.sim.steps
+
+    def _build_keyframes(self):
+        # one pass over the game, keeping a snapshot every KEYFRAME_INTERVAL ticks
+        sim = self.sim
+        sim.reset(self.seed)
+        for tick in range(self.ticks):
+            if tick % KEYFRAME_INTERVAL == 0:
+                self.keyframes.append(sim.snapshot())
+            if sim.game_over:
+                raise ValueError(f"replay continues after the game ended at tick {tick}")
+            sim.step(self.move(tick))
+        if sim.score != self.score:
+            raise ValueError(f"replay diverged: score {sim.score}, recorded {self.score}")
+
+    def step(self):
+        """Play the next tick; returns False at the end of the replay."""
+        if self.sim.steps >= self.ticks:
+            return False
+        self.sim.step(self.move(self.sim.steps))
+        return True
+
+    def seek(self, tick):
+        """Put `sim` in the state after `tick` ticks (clamped to the replay)."""
+        tick = max(0, min(tick, self.ticks))
+        if not self.keyframes:
+            self.sim.reset(self.seed)
+        else:
+            index = min(tick // KEYFRAME_INTERVAL, len(self.keyframes) - 1)
+            # keep going from the current state when it is between the keyframe and `tick`
+            if not index * KEYFRAME_INTERVAL <= self.sim.steps <= tick:
+                self.sim.restore(self.keyframes[index])
+        while self.sim.steps < tick:
+            self.sim.step(self.move(self.sim.steps))
+        return self.sim
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="snake_replay - inspect a Snake replay file")
+    parser.add_argument("file")
+    parser.add_argument("--tick", type=int, help="print the game state after this many ticks")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.file)
+    print(f"{args.file}: {replay.width}x{replay.height} seed {replay.seed}, "
+          f"{replay.ticks} ticks, score {replay.score}, death {replay.sim.death}")
+    if args.tick is not None:
+        sim = replay.seek(args.tick)
+        print(f"tick {sim.steps}: score {sim.score}, length {len(sim.snake)}, "
+              f"head {sim.snake[0]}, food {sim.food}, direction {sim.direction.name}")
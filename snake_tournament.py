@@ -0,0 +1,196 @@
+"""snake_tournament.py — headless AI tournament and benchmark for Snake policies.
+
+Every policy plays the same K seeded games (seed, seed + 1, ...) in a
+process pool, so scores are directly comparable and runs are repeatable.
+The report has, per policy:
+- mean / median score and steps per game, wins (board filled)
+- how games ended: "wall", "self", "won" (board filled; the game stops
+  there) or "timeout" when --max-steps ran out
+- per-tick decision latency percentiles (from a log-bucket histogram, so
+  workers only send back bucket counts)
+- games per CPU-second spent in that policy's games, and overall games/sec
+
+    python snake_tournament.py --policies greedy astar hamiltonian --games 50 \\
+        --output report.json [--baseline baseline.json]
+
+With --baseline the report is compared against an earlier one and the exit
+status is 1 if a policy's mean score dropped, or its p99 latency rose, by
+more than --tolerance (latency changes under LATENCY_NOISE_MS are ignored). Nothing here imports pygame.
+"""
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from snake_core import SnakeSim
+import snake_ai
+
+# Latency histogram: bucket i counts decisions taking up to LATENCY_BOUNDS_US[i]
+# microseconds (25% apart, 1 us .. ~1 s); the last bucket is everything slower
+LATENCY_BOUNDS_US = [1.25 ** i for i in range(63)]
+PERCENTILES = (50, 90, 99, 99.9)
+# p99 changes smaller than this are timer noise, never a regression
+LATENCY_NOISE_MS = 0.05
+
+
+def play_game(policy_name, seed, max_steps):
+    """Play one seeded game; returns its result dict (with a latency histogram)."""
+    sim = SnakeSim(seed=seed)
+    policy = snake_ai.make_policy(policy_name, sim.width, sim.height)
+    histogram = [0] * (len(LATENCY_BOUNDS_US) + 1)
+    top = len(LATENCY_BOUNDS_US)
+    log_base = math.log(1.25)
+    clock = time.perf_counter
+    started = clock()
+    # a full board has no food left: the game is won and stops there
+    while not sim.game_over and sim.food is not None and sim.steps < max_steps:
+        t0 = clock()
+        action = policy(sim)
+        us = (clock() - t0) * 1e6
+        # bucket = ceil(log_1.25(us)), the first bound >= us
+        histogram[0 if us <= 1.0 else min(top, math.ceil(math.log(us) / log_base))] += 1
+        sim.step(action)
+    return {
+        "policy": policy_name,
+        "seed": seed,
+        "score": sim.score,
+        "steps": sim.steps,
+        "death": sim.death or ("won" if sim.food is None else "timeout"),
+        "won": sim.food is None,
+        "seconds": clock() - started,
+        "latency_histogram": histogram,
+    }
+
+
+def _play(args):
+    return play_game(*args)
+
+
+def percentile_ms(histogram, q):
+    """Upper bound (ms) of the bucket holding the q-th percentile decision."""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q / 100.0 * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= rank and count:
+            bound = LATENCY_BOUNDS_US[i] if i < len(LATENCY_BOUNDS_US) else float("inf")
+            return round(bound / 1000.0, 4)
+    return None
+
+
+def summarize(policy_name, results):
+    scores = [r["score"] for r in results]
+    steps = [r["steps"] for r in results]
+    histogram = [sum(col) for col in zip(*(r["latency_histogram"] for r in results))]
+    seconds = sum(r["seconds"] for r in results)
+    return {
+        "games": len(results),
+        "mean_score": round(statistics.mean(scores), 2),
+        "median_score": statistics.median(scores),
+        "max_score": max(scores),
+        "mean_steps": round(statistics.mean(steps), 1),
+        "median_steps": statistics.median(steps),
+        "wins": sum(r["won"] for r in results),
+        "deaths": dict(Counter(r["death"] for r in results)),
+        "decisions": sum(histogram),
+        "latency_ms": {f"p{q:g}": percentile_ms(histogram, q) for q in PERCENTILES},
+        "games_per_cpu_second": round(len(results) / seconds, 3) if seconds else None,
+    }
+
+
+def run_tournament(policies, games=20, seed=0, max_steps=100000, workers=None):
+    """Play `games` seeded games per policy in a process pool; returns the report dict."""
+    for name in policies:
+        if name not in snake_ai.POLICIES:
+            raise ValueError(f"unknown policy {name!r} (choose from {', '.join(snake_ai.POLICIES)})")
+    tasks = [(name, seed + i, max_steps) for name in policies for i in range(games)]
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_play(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    wall = time.perf_counter() - started
+    by_policy = {name: [r for r in results if r["policy"] == name] for name in policies}
+    return {
+        "config": {"policies": list(policies), "games": games, "seed": seed,
+                   "max_steps": max_steps, "workers": workers},
+        "wall_seconds": round(wall, 3),
+        "games_per_second": round(len(tasks) / wall, 3) if wall else None,
+        "policies": {name: summarize(name, rs) for name, rs in by_policy.items()},
+    }
+
+
+def compare(report, baseline, tolerance=0.05):
+    """Lines describing changes against `baseline`, and whether any is a regression."""
+    lines = []
+    regressed = False
+    for name, now in report["policies"].items():
+        before = baseline.get("policies", {}).get(name)
+        if before is None:
+            lines.append(f"{name}: not in baseline")
+            continue
+        old_score, new_score = before["mean_score"], now["mean_score"]
+        old_p99, new_p99 = before["latency_ms"].get("p99"), now["latency_ms"].get("p99")
+        flags = []
+        if new_score < old_score * (1 - tolerance):
+            flags.append("SCORE REGRESSION")
+        if old_p99 and new_p99 and new_p99 > old_p99 * (1 + tolerance) and new_p99 - old_p99 > LATENCY_NOISE_MS:
+            flags.append("LATENCY REGRESSION")
+        regressed = regressed or bool(flags)
+        lines.append(f"{name}: mean score {old_score} -> {new_score}, p99 {old_p99} -> {new_p99} ms"
+                     + (f"  [{', '.join(flags)}]" if flags else ""))
+    old_config = baseline.get("config", {})
+    changed = [k for k in ("seed", "games", "max_steps") if old_config.get(k) != report["config"][k]]
+    if changed:
+        lines.append(f"note: baseline used a different {', '.join(changed)}; scores are not comparable")
+    return lines, regressed
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="snake_tournament - compare Snake AI policies headless")
+    parser.add_argument("--policies", nargs="+", default=list(snake_ai.POLICIES), choices=list(snake_ai.POLICIES))
+    parser.add_argument("--games", type=int, default=20, help="games per policy")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-steps", type=int, default=100000, help="ticks before a game counts as a timeout")
+    parser.add_argument("--workers", type=int, help="processes (default: CPU count)")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="relative change counted as a regression (default 0.05)")
+    args = parser.parse_args(argv)
+    if args.games < 1 or args.max_steps < 1:
+        parser.error("--games and --max-steps must be positive")
+
+    report = run_tournament(args.policies, args.games, args.seed, args.max_steps, args.workers)
+    for name, r in report["policies"].items():
+        lat = r["latency_ms"]
+        print(f"{name:12} score mean {r['mean_score']:8.1f} median {r['median_score']:7}  "
+              f"steps {r['mean_steps']:9.1f}  wins {r['wins']}/{r['games']}  deaths {r['deaths']}  "
+              f"latency p50 {lat['p50']} p99 {lat['p99']} ms")
+    print(f"{report['config']['games'] * len(args.policies)} games in {report['wall_seconds']} s "
+          f"({report['games_per_second']} games/s, {report['config']['workers']} workers)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, regressed = compare(report, baseline, args.tolerance)
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+function onGameChange(){
+  const sel = document.getElementById('gameSelect').value;
+  document.getElementById('qiskitSection').style.display = (sel === 'qiskit_math') ? 'block' : 'none';
+  document.getElementById('planet3dSection').style.display = (sel === 'planet3d') ? 'block' : 'none';
+}
+function onQOpChange(){
+  const op = document.getElementById('q_op').value;
+  document.getElementById('state2Block').style.display = (op === 'fidelity' || op === 'inner') ? 'block' : 'none';
+  document.getElementById('pauliBlock').style.display = (op === 'expectation') ? 'block' : 'none';
+  document.getElementById('qftBlock').style.display = (op === 'qft') ? 'block' : 'none';
+}
+function onStateTypeChange(idx){
+  const type = document.getElementById('q_state'+idx+'_type').value;
+  document.getElementById('q_state'+idx+'_predef').style.display = (type === 'predefined') ? 'block' : 'none';
+  document.getElementById('q_state'+idx+'_raw').style.display = (type === 'raw') ? 'block' : 'none';
+}
+
+// Planet preview helpers
+function onPlanetChange(){
+  const sel = document.getElementById('planet_type');
+  const planet = sel ? sel.value : 'earth';
+  const preview = document.getElementById('planetPreview');
+  // thumbs carry the fingerprinted preview URLs from the asset manifest
+  const thumb = document.querySelector('.thumb[data-planet="' + planet + '"]');
+  if(preview && thumb){ preview.src = thumb.dataset.preview; preview.srcset = thumb.dataset.preview2x + ' 2x'; }
+  // highlight selected thumb
+  document.querySelectorAll('.thumb').forEach(t => t.style.boxShadow = (t.dataset.planet === planet) ? '0 0 0 3px rgba(10,161,255,0.15)' : '');
+}
+function selectPlanetFromThumb(p){
+  const sel = document.getElementById('planet_type');
+  if(sel) sel.value = p; onPlanetChange();
+}
+
+// initialize visibility based on server-rendered values
+try{ onGameChange(); onQOpChange(); onStateTypeChange(1); onStateTypeChange(2); onPlanetChange(); }catch(e){}
+
+async function launchExternal(){
+  try{
+    const gameEl = document.getElementById('payload_game');
+    const gameKeyEl = document.getElementById('payload_game_key');
+    const nameEl = document.getElementById('payload_name');
+    const ageEl = document.getElementById('payload_age');
+    const countryEl = document.getElementById('payload_country');
+
+    if(!gameEl){ alert('No submission data found. Please submit the form first.'); return; }
+
+    const payload = {
+      game: (gameKeyEl && gameKeyEl.value) ? gameKeyEl.value : (gameEl.value || 'tictactoe'),
+      name: nameEl ? nameEl.value : '',
+      age: ageEl ? ageEl.value : '',
+      country: countryEl ? countryEl.value : ''
+    };
+
+    // qiskit-specific fields (if present)
+    const qop = document.getElementById('payload_q_op');
+    if(qop && qop.value){
+      payload.q_op = qop.value;
+      payload.q_state1_type = document.getElementById('payload_q_state1_type').value;
+      payload.q_state1_pre = document.getElementById('payload_q_state1_pre').value;
+      payload.q_state1_raw_val = document.getElementById('payload_q_state1_raw_val').value;
+      payload.q_state2_type = document.getElementById('payload_q_state2_type').value;
+      payload.q_state2_pre = document.getElementById('payload_q_state2_pre').value;
+      payload.q_state2_raw_val = document.getElementById('payload_q_state2_raw_val').value;
+      payload.q_pauli = document.getElementById('payload_q_pauli').value;
+      payload.q_nqubits = document.getElementById('payload_q_nqubits').value;
+      payload.q_state_raw_for_qft = document.getElementById('payload_q_state_raw_for_qft').value;
+      payload.q_outfile = document.getElementById('q_outfile') ? document.getElementById('q_outfile').value : '';
+    }
+
+    // planet3d-specific fields (if present)
+    const ptype = document.getElementById('payload_planet_type');
+    if(ptype && ptype.value){
+      payload.planet_type = ptype.value;
+      payload.planet_rotation = document.getElementById('payload_planet_rotation').value;
+      payload.planet_save = document.getElementById('payload_planet_save').value;
+      payload.planet_outfile = document.getElementById('payload_planet_outfile').value;
+    }
+
+    // small qiskit ops are answered in the browser (static/qmath.js); only
+    // QFT, larger states or requested result files go to the server
+    const local = window.QMath ? window.QMath.computeLaunch(payload) : null;
+    if(local){
+      showJobStatus((gameEl.value || payload.game) + ' result: <code>' + escapeHtml(JSON.stringify(local.value)) + '</code>');
+      return;
+    }
+
+    const res = await fetch('/launch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload)
+    });
+    const body = await res.json();
+    if(body.ok){
+      const label = gameEl ? gameEl.value : payload.game;
+      showJobStatus(label + ' queued…');
+      if(body.job_id) watchJob(body.job_id, label);
+    } else {
+      alert('Launch failed: ' + (body.error || 'unknown'));
+    }
+  }catch(e){ alert('Request failed: ' + e.message); }
+}
+
+// Launch jobs run in the background; follow them over Server-Sent Events
+// (falling back to polling /jobs/<id> where EventSource is unavailable).
+function showJobStatus(html){
+  let el = document.getElementById('jobStatus');
+  if(!el){
+    const info = document.getElementById('submittedInfo');
+    if(!info) return;
+    el = document.createElement('div');
+    el.id = 'jobStatus';
+    el.style.marginTop = '8px';
+    info.appendChild(el);
+  }
+  el.innerHTML = html;
+}
+function escapeHtml(text){
+  return String(text).replace(/[&<>"']/g, c => ({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c]));
+}
+// `saved` and `error` can echo user input (the requested file name), so every
+// value is escaped before it goes into innerHTML
+function onJobUpdate(job, label){
+  label = escapeHtml(label);
+  if(job.status === 'done'){
+    const saved = job.result && job.result.saved;
+    const output = job.result && job.result.output;
+    if(output && !saved){
+      const text = output.error ? 'error: ' + output.error : JSON.stringify(output.value);
+      showJobStatus(label + ' result: <code>' + escapeHtml(text) + '</code>');
+      return true;
+    }
+    showJobStatus(saved
+      ? label + ' finished: <a style="color:#7dd3fc" href="' + escapeHtml('/' + saved.split('/').map(encodeURIComponent).join('/')) + '" target="_blank">' + escapeHtml(saved) + '</a>'
+      : label + ' launched (check your desktop).');
+    return true;
+  }
+  if(job.status === 'failed'){
+    showJobStatus(label + ' failed: ' + escapeHtml(job.error || 'unknown error'));
+    return true;
+  }
+  showJobStatus(label + ' ' + escapeHtml(job.status) + '…');
+  return false;
+}
+function watchJob(id, label){
+  if(window.EventSource){
+    const es = new EventSource('/jobs/' + id + '/events');
+    es.addEventListener('status', ev => { if(onJobUpdate(JSON.parse(ev.data), label)) es.close(); });
+    es.onerror = () => es.close();
+    return;
+  }
+  const poll = async () => {
+    const res = await fetch('/jobs/' + id);
+    if(!res.ok) return;
+    const body = await res.json();
+    if(!onJobUpdate(body.job, label)) setTimeout(poll, 1000);
+  };
+  poll();
+}
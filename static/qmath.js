@@ -0,0 +1,167 @@
+// qmath.js — browser port of the cheap qiskitquantum ops (fidelity, inner,
+// bloch, expectation) for small states, so the page can answer them without a
+// round trip. Anything else (QFT, big states, unparsable input, or a result
+// file requested with q_outfile) returns null and goes to the server.
+//
+// Results match qiskitquantum.run_simple_op(); QMath.selfTest() checks this
+// against static/qmath_vectors.json, which is generated by
+//   python qiskitquantum.py --write-test-vectors static/qmath_vectors.json
+// Open the page with ?qmath-selftest to run it and see the outcome in the console.
+(function(){
+  'use strict';
+
+  const MAX_LOCAL_QUBITS = 6;
+  const MAX_LOCAL_DIM = 1 << MAX_LOCAL_QUBITS;
+  const NUM = /^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$/;
+
+  // complex numbers are [re, im] pairs
+  function cmul(a, b){ return [a[0] * b[0] - a[1] * b[1], a[0] * b[1] + a[1] * b[0]]; }
+  function conj(a){ return [a[0], -a[1]]; }
+
+  function parseNumber(text){
+    return NUM.test(text) ? Number(text) : NaN;
+  }
+
+  // Python complex() syntax: "1", "-2.5", "0.5j", "j", "1+2j", "(3-4j)", "1e-3-2j"
+  function parseComplex(text){
+    let s = text.trim();
+    if(s.startsWith('(') && s.endsWith(')')) s = s.slice(1, -1).trim();
+    if(!/[jJ]$/.test(s)){
+      const re = parseNumber(s);
+      return isNaN(re) ? null : [re, 0];
+    }
+    const body = s.slice(0, -1);
+    // split at the last sign that is not the sign of an exponent
+    let split = -1;
+    for(let i = body.length - 1; i > 0; i--){
+      if((body[i] === '+' || body[i] === '-') && !/[eE]/.test(body[i - 1])){ split = i; break; }
+    }
+    const reText = split > 0 ? body.slice(0, split) : '';
+    let imText = split > 0 ? body.slice(split) : body;
+    if(imText === '' || imText === '+' || imText === '-') imText += '1';
+    const re = reText === '' ? 0 : parseNumber(reText);
+    const im = parseNumber(imText);
+    return (isNaN(re) || isNaN(im)) ? null : [re, im];
+  }
+
+  // Mirrors qiskitquantum._parse_state_arg + _to_numpy_state (normalised).
+  function parseState(text){
+    const s = (text || '').trim();
+    const r = Math.SQRT1_2;
+    if(s === '0' || s === '|0>') return [[1, 0], [0, 0]];
+    if(s === '1' || s === '|1>') return [[0, 0], [1, 0]];
+    if(s === '+') return [[r, 0], [r, 0]];
+    if(s === '-') return [[r, 0], [-r, 0]];
+    const parts = s.split(',').map(p => p.trim()).filter(p => p);
+    if(!parts.length || parts.length > MAX_LOCAL_DIM) return null;
+    const amps = [];
+    for(const p of parts){
+      const c = parseComplex(p);
+      if(c === null) return null;
+      amps.push(c);
+    }
+    // same scaled 2-norm as numpy.linalg.norm, so tiny/huge amplitudes normalise alike
+    const norm = Math.hypot(...amps.map(a => Math.hypot(a[0], a[1])));
+    if(!(norm > 0) || !isFinite(norm)) return null;
+    return amps.map(a => [a[0] / norm, a[1] / norm]);
+  }
+
+  // <a|b>
+  function vdot(a, b){
+    let re = 0, im = 0;
+    for(let i = 0; i < a.length; i++){
+      const p = cmul(conj(a[i]), b[i]);
+      re += p[0]; im += p[1];
+    }
+    return [re, im];
+  }
+
+  // Re <psi|P|psi> for a Pauli string, left-most character on the most
+  // significant qubit, without building the 2^n x 2^n matrix.
+  function pauliExpectation(pauli, psi){
+    const n = pauli.length;
+    if((1 << n) !== psi.length) return null;
+    let flip = 0;
+    for(let q = 0; q < n; q++){
+      if('XY'.includes(pauli[n - 1 - q])) flip |= 1 << q;
+    }
+    let re = 0;
+    for(let j = 0; j < psi.length; j++){
+      // P|j> = phase * |j ^ flip>
+      let phase = [1, 0];
+      for(let q = 0; q < n; q++){
+        const ch = pauli[n - 1 - q];
+        const bit = (j >> q) & 1;
+        if(ch === 'Z' && bit) phase = [-phase[0], -phase[1]];
+        else if(ch === 'Y') phase = cmul(phase, bit ? [0, -1] : [0, 1]);
+      }
+      re += cmul(conj(psi[j ^ flip]), cmul(phase, psi[j]))[0];
+    }
+    return re;
+  }
+
+  // Same arguments and 'value' shape as qiskitquantum.run_simple_op(); null = ask the server.
+  function runSimpleOp(op, args){
+    if(op === 'fidelity' || op === 'inner'){
+      const a = parseState(args.state1), b = parseState(args.state2);
+      if(!a || !b || a.length !== b.length) return null;
+      const ip = vdot(a, b);
+      return op === 'fidelity' ? ip[0] * ip[0] + ip[1] * ip[1] : {real: ip[0], imag: ip[1]};
+    }
+    if(op === 'bloch'){
+      const psi = parseState(args.state);
+      if(!psi || psi.length !== 2) return null;
+      return ['X', 'Y', 'Z'].map(p => pauliExpectation(p, psi));
+    }
+    if(op === 'expectation'){
+      const psi = parseState(args.state);
+      const pauli = (args.pauli || '').toUpperCase();
+      if(!psi || !pauli || !/^[IXYZ]+$/.test(pauli)) return null;
+      return pauliExpectation(pauli, psi);
+    }
+    return null;
+  }
+
+  // Local result for a /launch payload, or null when the server should run it.
+  function computeLaunch(payload){
+    if(payload.game !== 'qiskit_math' || payload.q_outfile) return null;
+    const state = prefix => (payload[prefix + '_type'] || 'predefined') === 'predefined'
+      ? (payload[prefix + '_pre'] || '0') : (payload[prefix + '_raw_val'] || '');
+    const op = payload.q_op || 'fidelity';
+    let args;
+    if(op === 'fidelity' || op === 'inner') args = {state1: state('q_state1'), state2: state('q_state2')};
+    else if(op === 'bloch') args = {state: state('q_state1')};
+    else if(op === 'expectation') args = {state: state('q_state1'), pauli: payload.q_pauli || 'Z'};
+    else return null;
+    const value = runSimpleOp(op, args);
+    return value === null ? null : {operation: op, value: value};
+  }
+
+  function close(expected, actual, tol){
+    if(Array.isArray(expected)) return Array.isArray(actual) && expected.length === actual.length
+      && expected.every((e, i) => close(e, actual[i], tol));
+    if(expected !== null && typeof expected === 'object') return actual !== null && typeof actual === 'object'
+      && Object.keys(expected).every(k => close(expected[k], actual[k], tol));
+    return typeof actual === 'number' && Math.abs(expected - actual) <= tol;
+  }
+
+  // Compare against the Python-generated vectors; resolves to {passed, failed: [...]}.
+  async function selfTest(url){
+    const res = await fetch(url || '/static/qmath_vectors.json');
+    const data = await res.json();
+    const failed = [];
+    for(const c of data.cases){
+      const got = runSimpleOp(c.op, c);
+      if(!close(c.value, got, data.tolerance)) failed.push({case: c, got: got});
+    }
+    return {passed: data.cases.length - failed.length, failed: failed};
+  }
+
+  const QMath = {MAX_LOCAL_QUBITS, parseComplex, parseState, runSimpleOp, computeLaunch, selfTest};
+  if(typeof module !== 'undefined' && module.exports) module.exports = QMath;
+  else window.QMath = QMath;
+
+  if(typeof window !== 'undefined' && /[?&]qmath-selftest\b/.test(window.location.search)){
+    selfTest().then(r => console.log('qmath self-test:', r.passed, 'passed,', r.failed.length, 'failed', r.failed));
+  }
+})();
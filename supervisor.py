@@ -0,0 +1,229 @@
+"""supervisor.py — tracks the child processes started by /launch.
+
+ProcessSupervisor:
+- caps how many children of each type (game) may run at once; spawn() can
+  wait for a slot instead of failing
+- applies per-type CPU-time and address-space rlimits to the child (Linux)
+- reaps exited children from a background thread so none are left as zombies
+- reports live children (pid, type, runtime, RSS) for the /processes view
+- share(): counts live children per type in a store shared by several
+  processes (server workers), so the caps hold across all of them;
+  reclaim() frees the slots of a sharing process that exited
+"""
+import os
+import subprocess
+import threading
+import time
+
+from ratelimit import SharedCounter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class CapacityError(RuntimeError):
+    """Raised when a process type already has its maximum number of children."""
+
+
+def _read_rss(pid):
+    """Resident set size of `pid` in bytes (Linux /proc), or None if unknown."""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _apply_rlimits(pid, cpu_seconds, memory_bytes):
+    """Set rlimits on the running child `pid` from the parent.
+
+    preexec_fn is not safe in a process with threads (the child can deadlock
+    between fork and exec), so the limits are applied with prlimit() right
+    after the child starts; its first instants run unlimited.
+    """
+    try:
+        if cpu_seconds:
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+        if memory_bytes:
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    except ProcessLookupError:
+        pass  # already exited
+
+
+class ProcessSupervisor:
+    """Spawn, cap, limit and reap child processes by type.
+
+    `max_per_type` maps type -> max live children (others use `default_max`).
+    `limits` maps type -> {"cpu_seconds": n, "memory_bytes": n}; a missing or
+    falsy value leaves that limit unset. `on_exit(record)` callbacks run on the
+    reaper thread once a child has exited; record["returncode"] is set.
+    """
+
+    def __init__(self, max_per_type=None, default_max=4, limits=None, reap_interval=0.5):
+        self.max_per_type = dict(max_per_type or {})
+        self.default_max = default_max
+        self.limits = dict(limits or {})
+        self.reap_interval = reap_interval
+        self._children = {}
+        self._lock = threading.Lock()
+        # notified (under _lock) whenever a child is reaped
+        self._slot_freed = threading.Condition(self._lock)
+        self._on_exit = []
+        self._reaper = None
+        # set by share(): (store, owner) and type -> SharedCounter of live children
+        self._shared = None
+        self._counters = {}
+
+    def add_exit_callback(self, fn):
+        self._on_exit.append(fn)
+
+    def share(self, store, owner):
+        """Enforce the caps across every process that shares `store`.
+
+        Live children are counted in `store` under `owner` (see
+        ratelimit.SharedCounter) instead of only in this process.
+        """
+        with self._lock:
+            self._shared = (store, owner)
+            self._counters = {}
+
+    @staticmethod
+    def reclaim(store, owner, kinds):
+        """Free the slots of `kinds` that `owner` still held in `store` when it exited."""
+        for kind in kinds:
+            SharedCounter(store, f"procs:{kind}", owner).reclaim()
+
+    def _counter(self, kind):
+        # caller holds the lock
+        counter = self._counters.get(kind)
+        if counter is None:
+            store, owner = self._shared
+            counter = self._counters[kind] = SharedCounter(store, f"procs:{kind}", owner)
+        return counter
+
+    def _live(self, kind):
+        # caller holds the lock
+        if self._shared is not None:
+            return int(round(self._counter(kind).value()))
+        return sum(1 for rec in self._children.values() if rec["type"] == kind)
+
+    def capacity_left(self, kind):
+        # children that exited since the last reaper pass should not count
+        self.reap()
+        limit = self.max_per_type.get(kind, self.default_max)
+        with self._lock:
+            live = self._live(kind)
+        return max(0, limit - live)
+
+    def spawn(self, kind, args, tag=None, wait=0, **popen_kwargs):
+        """Start `args` as a child of type `kind` and track it.
+
+        `tag` is stored on the record (e.g. the job id) and handed back to
+        exit callbacks. If `kind` is at its cap, waits up to `wait` seconds for
+        a child of that type to exit, then raises CapacityError. The check and the
+        registration happen under one lock, so concurrent spawns cannot overshoot.
+        """
+        limit = self.max_per_type.get(kind, self.default_max)
+        lim = self.limits.get(kind, {})
+        limited = hasattr(resource, "prlimit") and (lim.get("cpu_seconds") or lim.get("memory_bytes"))
+        deadline = time.monotonic() + wait
+
+        while True:
+            self.reap()
+            with self._lock:
+                if self._shared is not None:
+                    # reserve the slot first: other processes count against the same cap
+                    live = int(round(self._counter(kind).add(1))) - 1
+                    if live >= limit:
+                        self._counter(kind).add(-1)
+                else:
+                    live = self._live(kind)
+                if live < limit:
+                    try:
+                        proc = subprocess.Popen(args, **popen_kwargs)
+                    except BaseException:
+                        if self._shared is not None:
+                            self._counter(kind).add(-1)
+                        raise
+                    if limited:
+                        _apply_rlimits(proc.pid, lim.get("cpu_seconds"), lim.get("memory_bytes"))
+                    self._children[proc.pid] = {
+                        "pid": proc.pid,
+                        "type": kind,
+                        "args": list(args),
+                        "started": time.time(),
+                        "tag": tag,
+                        "proc": proc,
+                    }
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CapacityError(f"too many {kind} processes running ({live}/{limit})")
+                # woken by reap(); the timeout also polls in case no reaper is running
+                self._slot_freed.wait(min(remaining, self.reap_interval))
+        self._ensure_reaper()
+        return proc
+
+    def snapshot(self):
+        """Return live children as JSON-friendly dicts, oldest first."""
+        now = time.time()
+        with self._lock:
+            records = sorted(self._children.values(), key=lambda r: r["started"])
+        return [{
+            "pid": rec["pid"],
+            "type": rec["type"],
+            "runtime": round(now - rec["started"], 1),
+            "rss_bytes": _read_rss(rec["pid"]),
+        } for rec in records]
+
+    def counts(self):
+        """Return {type: live child count}."""
+        out = {}
+        with self._lock:
+            for rec in self._children.values():
+                out[rec["type"]] = out.get(rec["type"], 0) + 1
+        return out
+
+    def reap(self):
+        """Collect exited children once; returns the records that were reaped."""
+        with self._lock:
+            records = list(self._children.values())
+        done = []
+        for rec in records:
+            code = rec["proc"].poll()
+            if code is None:
+                continue
+            with self._lock:
+                # another caller (spawn, capacity_left or the reaper thread)
+                # may have reaped it first; only the one that removes it reports
+                if self._children.get(rec["pid"]) is not rec:
+                    continue
+                del self._children[rec["pid"]]
+                if self._shared is not None:
+                    self._counter(rec["type"]).add(-1)
+                self._slot_freed.notify_all()
+            rec = dict(rec, returncode=code, finished=time.time())
+            done.append(rec)
+            for fn in self._on_exit:
+                try:
+                    fn(rec)
+                except Exception:
+                    pass
+        return done
+
+    def _ensure_reaper(self):
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name="child-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(self.reap_interval)
+            self.reap()
@@ -2,7 +2,8 @@ import pygame
 import sys
 from pygame import Rect
 import argparse
-import os
+
+import game_startup
 
 
 def draw_gradient(surface, color_top, color_bottom):
@@ -20,23 +21,18 @@ def draw_gradient(surface, color_top, color_bottom):
 
 class TicTacToe:
     def __init__(self, size=600, player_name=None, age=None, country=None):
-        pygame.init()
+        # only the display and font modules are used
+        game_startup.init_pygame()
 
         # create window first (ensures icon change takes effect on Windows)
         self.size = size
         self.screen = pygame.display.set_mode((size, size))
 
         # load icon from the project's static folder and set it as the window icon
+        # (a small square 32x32 icon works well on Windows; kept scaled in .icon_cache/)
         try:
-            base = os.path.dirname(__file__) or os.getcwd()
-            icon_path = os.path.join(base, "static", "images.png")
-            if not os.path.isfile(icon_path):
-                # fallback to cwd/static/images.png
-                icon_path = os.path.join(os.getcwd(), "static", "images.png")
-            if os.path.isfile(icon_path):
-                icon_surf = pygame.image.load(icon_path).convert_alpha()
-                # ensure a small square icon (32x32) which works well on Windows
-                icon_surf = pygame.transform.smoothscale(icon_surf, (32, 32))
+            icon_surf = game_startup.cached_icon("tictactoe", game_startup.static_path("images.png"))
+            if icon_surf is not None:
                 pygame.display.set_icon(icon_surf)
         except Exception:
             # ignore icon errors
@@ -63,9 +59,11 @@ class TicTacToe:
         self.x_color = (255, 105, 180)  # pink
         self.o_color = (129, 236, 236)  # mint
 
-        pygame.font.init()
-        self.title_font = pygame.font.SysFont('Segoe UI', 36, bold=True)
-        self.info_font = pygame.font.SysFont('Arial', 18)
+        # pygame's bundled font (bold title): no system font lookup at start-up
+        self.title_font = game_startup.font(48, bold=True)
+        self.info_font = game_startup.font(24)
+        # background surface, built on first draw
+        self.background = None
 
         # Game state: 0 empty, 1 X, 2 O
         self.board = [[0] * 3 for _ in range(3)]
@@ -79,23 +77,21 @@ class TicTacToe:
         self.winner = 0
 
     def draw_background(self):
-        # load and draw Chrysanthemum.jpg as background
+        if self.background is None:
+            self.background = self.load_background()
+        self.screen.blit(self.background, (0, 0))
+
+    def load_background(self):
+        """Chrysanthemum.jpg scaled to the window, or a gradient if it cannot be loaded."""
+        surface = pygame.Surface((self.size, self.size)).convert()
         try:
-            base = os.path.dirname(__file__) or os.getcwd()
-            bg_path = os.path.join(base, "static", "Chrysanthemum.jpg")
-            if not os.path.isfile(bg_path):
-                # fallback to cwd/static/Chrysanthemum.jpg
-                bg_path = os.path.join(os.getcwd(), "static", "Chrysanthemum.jpg")
-            if os.path.isfile(bg_path):
-                bg_surf = pygame.image.load(bg_path).convert()
-                bg_surf = pygame.transform.scale(bg_surf, (self.size, self.size))
-                self.screen.blit(bg_surf, (0, 0))
-            else:
-                # fallback to gradient if image not found
-                draw_gradient(self.screen, self.bg_top, self.bg_bottom)
+            bg_path = game_startup.static_path("Chrysanthemum.jpg")
+            bg_surf = pygame.image.load(bg_path).convert()
+            surface.blit(pygame.transform.scale(bg_surf, (self.size, self.size)), (0, 0))
         except Exception:
-            # fallback to gradient on load error
-            draw_gradient(self.screen, self.bg_top, self.bg_bottom)
+            # fallback to gradient if the image is missing or fails to load
+            draw_gradient(surface, self.bg_top, self.bg_bottom)
+        return surface
 
     def draw_ui(self):
         # Title (centered)
@@ -213,6 +209,7 @@ class TicTacToe:
             self.draw_ui()
 
             pygame.display.flip()
+            game_startup.first_frame()
             self.clock.tick(60)
 
         pygame.quit()